@@ -8,9 +8,11 @@ class UserSerializer(serializers.ModelSerializer):
         read_only_fields = ['date_joined', 'last_login']
 
 class AppListingSerializer(serializers.ModelSerializer):
+    """Reads stored funding counters; pair with AppListing.objects.with_funding_summary()"""
     developer = UserSerializer(read_only=True)
-    current_funding = serializers.SerializerMethodField()
-    funding_progress = serializers.SerializerMethodField()
+    current_funding = serializers.DecimalField(
+        source='raised_amount', max_digits=12, decimal_places=2, read_only=True
+    )
     company_valuation = serializers.SerializerMethodField()
     retained_shares = serializers.SerializerMethodField()
     
@@ -19,21 +21,20 @@ class AppListingSerializer(serializers.ModelSerializer):
         fields = [
             'id', 'name', 'description', 'ai_features', 'developer',
             'funding_goal', 'price_per_percentage', 'available_percentage', 'equity_percentage',
-            'current_funding', 'funding_progress',
+            'current_funding', 'funding_progress', 'investor_count',
             'company_valuation', 'retained_shares', 'status',
             'created_at', 'updated_at', 'github_url', 'demo_url'
         ]
     
-    def get_current_funding(self, obj):
-        return obj.get_funded_amount()
-    
-    def get_funding_progress(self, obj):
-        return obj.get_funding_progress()
-    
     def get_company_valuation(self, obj):
+        # Annotated by with_funding_summary(); computed for listings loaded otherwise
+        if hasattr(obj, 'company_valuation'):
+            return obj.company_valuation
         return obj.get_company_valuation()
     
     def get_retained_shares(self, obj):
+        if hasattr(obj, 'retained_shares'):
+            return obj.retained_shares
         return obj.get_retained_shares()
 
 class InvestmentSerializer(serializers.ModelSerializer):
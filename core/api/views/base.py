@@ -9,6 +9,7 @@ from ..serializers import (
     InvestmentSerializer
 )
 from ...models import User, AppListing, Investment
+from ...pagination import KeysetPagination
 
 class BaseViewSet(viewsets.ModelViewSet):
     """
@@ -41,8 +42,9 @@ class AppListingViewSet(BaseViewSet):
     """
     API endpoint for app listings
     """
-    queryset = AppListing.objects.all()
+    queryset = AppListing.objects.with_funding_summary()
     serializer_class = AppListingSerializer
+    pagination_class = KeysetPagination
     
     @swagger_auto_schema(
         operation_description="Get featured apps",
@@ -58,8 +60,9 @@ class InvestmentViewSet(BaseViewSet):
     """
     API endpoint for investments
     """
-    queryset = Investment.objects.all()
+    queryset = Investment.objects.select_related('app__developer', 'investor')
     serializer_class = InvestmentSerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         return self.queryset.filter(investor=self.request.user) 
\ No newline at end of file
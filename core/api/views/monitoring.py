@@ -3,8 +3,9 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from rest_framework.permissions import IsAdminUser
 from django.utils import timezone
-from django.db.models import Avg, Count
-from ...models import APIRequest, APIError
+from django.db.models import Sum
+from datetime import timedelta
+from ...models import APIError, APIRequestRollup
 from ..serializers import APIRequestSerializer, APIErrorSerializer
 import logging
 from core.decorators.rate_limit import rate_limit
@@ -16,6 +17,7 @@ from core.services.blog_generator import BlogGenerator
 from rest_framework.decorators import api_view, permission_classes
 from rest_framework.permissions import IsAuthenticated
 from core.services.monitoring import SystemMetricsService
+from core.services.monitoring.api_telemetry import api_telemetry
 
 logger = logging.getLogger('core.api.monitoring')
 
@@ -27,41 +29,54 @@ class APIMonitoringViewSet(viewsets.ViewSet):
         """Get API usage statistics"""
         now = timezone.now()
         last_24h = now - timedelta(hours=24)
+        rollups = APIRequestRollup.objects.all()
+        recent = api_telemetry.summarize(rollups.filter(bucket__gte=last_24h))
         
         stats = {
-            'total_requests': APIRequest.objects.count(),
-            'recent_requests': APIRequest.objects.filter(timestamp__gte=last_24h).count(),
-            'error_rate': self._calculate_error_rate(),
-            'average_response_time': self._calculate_avg_response_time(),
-            'endpoint_usage': self._get_endpoint_usage(),
-            'recent_errors': self._get_recent_errors()
+            'total_requests': self._count_requests(rollups),
+            'recent_requests': recent['requests'],
+            'error_rate': self._calculate_error_rate(rollups),
+            'average_response_time': self._calculate_avg_response_time(rollups),
+            'recent_response_times': {
+                'p50': recent['p50_response_time'],
+                'p95': recent['p95_response_time'],
+                'p99': recent['p99_response_time'],
+            },
+            'endpoint_usage': self._get_endpoint_usage(rollups),
+            'recent_errors': APIErrorSerializer(self._get_recent_errors(), many=True).data
         }
         
         return Response(stats)
 
-    def _calculate_error_rate(self):
+    def _count_requests(self, rollups):
+        return rollups.aggregate(total=Sum('request_count'))['total'] or 0
+
+    def _calculate_error_rate(self, rollups):
         """Calculate API error rate"""
-        total = APIRequest.objects.count()
-        if total == 0:
+        totals = rollups.aggregate(requests=Sum('request_count'), errors=Sum('error_count'))
+        if not totals['requests']:
             return 0
-        errors = APIError.objects.count()
-        return (errors / total) * 100
+        return (totals['errors'] / totals['requests']) * 100
 
-    def _calculate_avg_response_time(self):
+    def _calculate_avg_response_time(self, rollups):
         """Calculate average API response time"""
-        return APIRequest.objects.aggregate(
-            avg_time=Avg('response_time')
-        )['avg_time'] or 0
+        totals = rollups.aggregate(
+            requests=Sum('request_count'),
+            response_time=Sum('total_response_time')
+        )
+        if not totals['requests']:
+            return 0
+        return totals['response_time'] / totals['requests']
 
-    def _get_endpoint_usage(self):
+    def _get_endpoint_usage(self, rollups):
         """Get endpoint usage statistics"""
-        return APIRequest.objects.values('endpoint').annotate(
-            count=Count('id')
-        ).order_by('-count')
+        return list(rollups.values('endpoint').annotate(
+            count=Sum('request_count')
+        ).order_by('-count'))
 
     def _get_recent_errors(self):
         """Get recent API errors"""
-        return APIError.objects.order_by('-timestamp')[:10] 
+        return APIError.objects.select_related('request__user').order_by('-timestamp')[:10]
 
 @api_view(['GET'])
 @permission_classes([IsAuthenticated])
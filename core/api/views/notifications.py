@@ -3,6 +3,7 @@ from rest_framework.decorators import action
 from rest_framework.response import Response
 from ..serializers import NotificationSerializer
 from ...models import Notification
+from ...pagination import KeysetPagination
 from django.utils import timezone
 
 class NotificationViewSet(viewsets.ModelViewSet):
@@ -10,6 +11,7 @@ class NotificationViewSet(viewsets.ModelViewSet):
     API endpoint for managing notifications
     """
     serializer_class = NotificationSerializer
+    pagination_class = KeysetPagination
     
     def get_queryset(self):
         """Filter notifications for the current user"""
@@ -1,5 +1,4 @@
-from .utils import get_exchange_rate, convert_currency
-from forex_python.converter import CurrencyRates
+from .services.exchange_rates import ExchangeRateService
 import logging
 from django.conf import settings
 from .models import ProjectRequest, DeveloperPaymentInfo
@@ -10,9 +9,11 @@ def currency_context(request):
     """Add currency information to the context."""
     try:
         user_currency = 'NGN'  # Default to NGN
+        rates = ExchangeRateService.get_snapshot(request)
         return {
             'user_currency': user_currency,
             'currency_symbol': '₦',
+            'exchange_rates': rates,
         }
     except Exception as e:
         logger.error(f"Error in currency_context: {e}")
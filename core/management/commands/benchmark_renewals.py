@@ -0,0 +1,62 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management.base import BaseCommand
+from core.services.subscription_renewal import RenewalJob, StubPaymentGateway, SubscriptionRenewalRunner
+import time
+import uuid
+
+User = get_user_model()
+
+class Command(BaseCommand):
+    help = 'Measure subscription renewal throughput against a local stub payment gateway'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--count',
+            type=int,
+            default=200,
+            help='Number of renewals to run'
+        )
+        parser.add_argument(
+            '--latency',
+            type=float,
+            default=0.1,
+            help='Seconds the stub gateway takes per call'
+        )
+        parser.add_argument(
+            '--failure-rate',
+            type=float,
+            default=0.0,
+            help='Share of stub gateway calls that fail'
+        )
+        parser.add_argument(
+            '--workers',
+            default='1,4,8,16',
+            help='Comma-separated worker counts to compare'
+        )
+
+    def handle(self, *args, **options):
+        for workers in [int(value) for value in options['workers'].split(',')]:
+            gateway = StubPaymentGateway(
+                latency=options['latency'],
+                failure_rate=options['failure_rate'],
+                seed=workers
+            )
+            runner = SubscriptionRenewalRunner(gateway=gateway, max_workers=workers, backoff=0)
+            # Unsaved users and fresh references; nothing touches the database
+            run_id = uuid.uuid4().hex[:8]
+            jobs = [
+                RenewalJob(i, User(id=i, email=f'user{i}@example.com'), 'DEV_PRO', 5000, f'bench_{run_id}_{i}')
+                for i in range(options['count'])
+            ]
+
+            started = time.monotonic()
+            results = runner.charge_all(jobs)
+            elapsed = time.monotonic() - started
+            cache.delete_many([runner.CLAIM_KEY.format(reference=job.reference) for job in jobs])
+
+            renewed = sum(1 for _, result in results if result and result.get('success'))
+            self.stdout.write(
+                f'{workers:>3} workers: {len(jobs)} renewals ({renewed} paid, {gateway.calls} gateway calls) '
+                f'in {elapsed:.2f}s, {len(jobs) / elapsed:.1f}/s'
+            )
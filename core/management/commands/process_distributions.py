@@ -5,14 +5,36 @@ from django.utils import timezone
 class Command(BaseCommand):
     help = 'Process pending revenue distributions'
 
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--batched',
+            action='store_true',
+            help='Use bulk inserts, for apps with very large cap tables'
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=RevenueDistributionService.DISTRIBUTION_CHUNK_SIZE,
+            help='Distribution rows per INSERT in batched mode'
+        )
+
     def handle(self, *args, **options):
         service = RevenueDistributionService()
         self.stdout.write(f'Starting distribution processing at {timezone.now()}')
-        
+
         try:
-            service.schedule_distributions()
+            results = service.schedule_distributions(
+                batched=options['batched'],
+                chunk_size=options['chunk_size']
+            )
+            for metrics in results:
+                self.stdout.write(
+                    f"Revenue {metrics['revenue_id']}: {metrics['shareholders']} shareholders "
+                    f"in {metrics['elapsed_seconds']:.3f}s "
+                    f"({metrics['shareholders_per_second']:.0f} shareholders/s)"
+                )
             self.stdout.write(self.style.SUCCESS('Successfully processed distributions'))
         except Exception as e:
             self.stdout.write(
                 self.style.ERROR(f'Error processing distributions: {str(e)}')
-            ) 
\ No newline at end of file
+            )
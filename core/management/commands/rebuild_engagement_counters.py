@@ -0,0 +1,31 @@
+from django.core.management.base import BaseCommand
+from core.models import AppListing, AppEngagementCounter
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Rebuild the per-app engagement counters from vote and comment rows'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--app',
+            type=int,
+            help='Only rebuild the counters for the app listing with this ID'
+        )
+
+    def handle(self, *args, **options):
+        apps = AppListing.objects.order_by('pk')
+        if options['app']:
+            apps = apps.filter(pk=options['app'])
+
+        rebuilt = 0
+        for app in apps.iterator():
+            try:
+                AppEngagementCounter.rebuild(app)
+                rebuilt += 1
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error rebuilding counters for app {app.id}: {str(e)}'))
+                logger.error(f'Error rebuilding engagement counters for app {app.id}: {str(e)}')
+
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt engagement counters for {rebuilt} apps.'))
@@ -0,0 +1,54 @@
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from core.models import AppListing
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Recalculate denormalized funding counters on app listings and repair any drift'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--app',
+            type=int,
+            help='Only reconcile the app listing with this ID'
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Report drift without writing corrected values'
+        )
+
+    def handle(self, *args, **options):
+        apps = AppListing.objects.order_by('pk')
+        if options['app']:
+            apps = apps.filter(pk=options['app'])
+
+        checked = 0
+        repaired = 0
+        for app_id in apps.values_list('pk', flat=True).iterator():
+            checked += 1
+            try:
+                with transaction.atomic():
+                    app = AppListing.objects.select_for_update().get(pk=app_id)
+                    stored = (app.raised_amount, app.investor_count, app.funding_progress)
+                    if not app.refresh_funding_counters(commit=not options['dry_run']):
+                        continue
+
+                repaired += 1
+                message = (
+                    f'App {app.id} ({app.name}): raised {stored[0]} -> {app.raised_amount}, '
+                    f'investors {stored[1]} -> {app.investor_count}, '
+                    f'progress {stored[2]} -> {app.funding_progress}'
+                )
+                self.stdout.write(self.style.WARNING(message))
+                logger.warning(f'Funding counter drift: {message}')
+            except Exception as e:
+                self.stdout.write(self.style.ERROR(f'Error reconciling app {app_id}: {str(e)}'))
+                logger.error(f'Error reconciling funding counters for app {app_id}: {str(e)}')
+
+        action = 'would be repaired' if options['dry_run'] else 'repaired'
+        self.stdout.write(self.style.SUCCESS(
+            f'Checked {checked} apps, {repaired} {action}.'
+        ))
@@ -0,0 +1,20 @@
+from django.core.management.base import BaseCommand
+from core.services.revenue.rollup import RevenueRollupService
+
+class Command(BaseCommand):
+    help = 'Roll up revenue for closed months into RevenueMonthlyRollup'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--rebuild',
+            action='store_true',
+            help='Discard existing rollups and rebuild every closed month'
+        )
+
+    def handle(self, *args, **options):
+        try:
+            stored = RevenueRollupService.build_rollups(rebuild=options['rebuild'])
+            self.stdout.write(self.style.SUCCESS(f'Stored {stored} revenue rollup rows'))
+        except Exception as e:
+            self.stdout.write(self.style.ERROR(f'Error rolling up revenue: {str(e)}'))
+            raise
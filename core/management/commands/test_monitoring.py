@@ -1,5 +1,6 @@
 from django.core.management.base import BaseCommand
 from core.services.monitoring import SystemMetricsService
+from core.services.monitoring.histogram import metrics_aggregator
 from django.core.cache import cache
 import time
 
@@ -12,7 +13,6 @@ class Command(BaseCommand):
         self.stdout.write('Testing monitoring system...')
         
         # Clear existing metrics
-        cache.delete('response_times')
         cache.delete('error_count')
         cache.delete('request_count')
         
@@ -22,9 +22,7 @@ class Command(BaseCommand):
             cache.set('request_count', i + 1, timeout=3600)
             
             # Simulate response times (between 0.1 and 0.5 seconds)
-            response_times = cache.get('response_times', [])
-            response_times.append(0.1 + (i * 0.05))
-            cache.set('response_times', response_times, timeout=3600)
+            metrics_aggregator.record_request('GET /test/', 0.1 + (i * 0.05))
             
             # Simulate some errors
             if i % 3 == 0:  # Every third request fails
@@ -0,0 +1,43 @@
+from django.core.management.base import BaseCommand, CommandError
+from core.services.escrow_ledger import EscrowLedger
+import logging
+
+logger = logging.getLogger(__name__)
+
+class Command(BaseCommand):
+    help = 'Check escrow balance snapshots and the escrow ledger against the escrow transactions'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--app',
+            type=int,
+            help='Only verify the app listing with this ID'
+        )
+        parser.add_argument(
+            '--repair',
+            action='store_true',
+            help='Drop wrong snapshots and append correcting ledger entries'
+        )
+
+    def handle(self, *args, **options):
+        app_ids = [options['app']] if options['app'] else None
+        problems = EscrowLedger.verify(app_ids, repair=options['repair'])
+
+        for problem in problems:
+            if problem['kind'] == 'snapshot':
+                subject = f"App {problem['app_id']} snapshot {problem['snapshot_id']}"
+            else:
+                subject = f"App {problem['app_id']} ledger"
+            message = (
+                f"{subject}: received {problem['actual'][0]} (expected {problem['expected'][0]}), "
+                f"released {problem['actual'][1]} (expected {problem['expected'][1]})"
+            )
+            self.stdout.write(self.style.WARNING(message))
+            logger.warning(f'Escrow ledger drift: {message}')
+
+        if not problems:
+            self.stdout.write(self.style.SUCCESS('Escrow snapshots and ledger match the escrow transactions.'))
+        elif options['repair']:
+            self.stdout.write(self.style.SUCCESS(f'Repaired {len(problems)} discrepancies.'))
+        else:
+            raise CommandError(f'Found {len(problems)} escrow ledger discrepancies; rerun with --repair to fix them.')
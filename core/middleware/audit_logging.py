@@ -5,6 +5,7 @@ from datetime import datetime
 from django.utils import timezone
 from django.conf import settings
 from django.db import models
+from ..services.audit import audit_sink
 
 logger = logging.getLogger('core.audit')
 
@@ -37,9 +38,22 @@ class AuditLog(models.Model):
             models.Index(fields=['endpoint', 'method']),
         ]
 
+# Headers whose values would leak credentials into the audit log
+REDACTED_HEADERS = {'authorization', 'cookie', 'x-csrftoken', 'x-api-key'}
+
 class AuditLoggingMiddleware:
+    """Record every request in the audit log.
+
+    Entries are handed to the batched audit sink; event types listed in
+    AUDIT_LOG_SYNC_EVENT_TYPES are written before the response is returned.
+    """
+
     def __init__(self, get_response):
         self.get_response = get_response
+        self.sync_event_types = set(getattr(
+            settings, 'AUDIT_LOG_SYNC_EVENT_TYPES',
+            [AuditLog.EventType.AUTH, AuditLog.EventType.ADMIN, AuditLog.EventType.SECURITY]
+        ))
 
     def __call__(self, request):
         # Generate unique request ID
@@ -69,8 +83,8 @@ class AuditLoggingMiddleware:
             if not user_id and hasattr(request, 'user'):
                 user_id = request.user.id if request.user.is_authenticated else None
             
-            # Create audit log entry
-            AuditLog.objects.create(
+            # Queue audit log entry
+            entry = AuditLog(
                 event_type=event_type,
                 user_id=user_id,
                 ip_address=self._get_client_ip(request),
@@ -83,10 +97,12 @@ class AuditLoggingMiddleware:
                 additional_data={
                     'duration_ms': (timezone.now() - start_time).total_seconds() * 1000,
                     'request_id': request.audit_id,
-                    'headers': dict(request.headers),
+                    'requested_at': start_time.isoformat(),
+                    'headers': self._extract_headers(request),
                     'query_params': dict(request.GET),
                 }
             )
+            audit_sink.submit(entry, sync=event_type in self.sync_event_types)
             
         except Exception as e:
             logger.error(f"Error in audit logging: {str(e)}")
@@ -119,6 +135,13 @@ class AuditLoggingMiddleware:
         except Exception:
             return None
     
+    def _extract_headers(self, request):
+        """Copy request headers with credential values redacted"""
+        return {
+            name: '[REDACTED]' if name.lower() in REDACTED_HEADERS else value
+            for name, value in request.headers.items()
+        }
+    
     def _sanitize_sensitive_data(self, data):
         """Remove sensitive information from request data"""
         sensitive_fields = {'password', 'token', 'secret', 'credit_card', 'api_key'}
@@ -1,55 +1,78 @@
 from django.utils.deprecation import MiddlewareMixin
-import requests
 from django.core.cache import cache
 from redis.exceptions import ConnectionError as RedisConnectionError
 from django_redis.exceptions import ConnectionInterrupted
+from ..services.geoip import get_ip_country_table
+import logging
+
+logger = logging.getLogger(__name__)
+
+DEFAULT_CURRENCY = 'NGN'
+IP_CURRENCY_CACHE_TIMEOUT = 86400  # 24 hours
+IP_LOOKUP_PENDING_TIMEOUT = 300
+
+
+def currency_for_country(country_code):
+    """Set NGN for Nigeria, USD for others"""
+    return 'NGN' if country_code == 'NG' else 'USD'
+
 
 class CurrencyMiddleware(MiddlewareMixin):
+    """Resolve the visitor's currency without waiting on the network.
+
+    The offline IP table is checked first, then the cache of earlier
+    provider lookups. Unknown IPs get NGN straight away and are resolved
+    by the resolve_ip_currency task for later requests.
+    """
+
     def process_request(self, request):
         # Skip for admin URLs
         if request.path.startswith('/admin/'):
             return None
-            
+
         # During development or if there's a Redis error, use NGN
         if request.META.get('SERVER_NAME') in ['localhost', '127.0.0.1']:
-            request.currency = 'NGN'
+            request.currency = DEFAULT_CURRENCY
             return None
-            
-        # Check cache first
+
         client_ip = self.get_client_ip(request)
+        if not client_ip:
+            request.currency = DEFAULT_CURRENCY
+            return None
+
+        country_code = get_ip_country_table().lookup(client_ip)
+        if country_code:
+            request.currency = currency_for_country(country_code)
+            return None
+
         cache_key = f'currency_for_ip_{client_ip}'
-        
         try:
             currency = cache.get(cache_key)
         except (RedisConnectionError, ConnectionInterrupted):
             # If Redis is not available, default to NGN
-            request.currency = 'NGN'
+            request.currency = DEFAULT_CURRENCY
             return None
-        
+
         if currency is None:
-            try:
-                # Use a free IP geolocation service
-                response = requests.get(f'https://ipapi.co/{client_ip}/json/')
-                data = response.json()
-                
-                # Set NGN for Nigeria, USD for others
-                currency = 'NGN' if data.get('country_code') == 'NG' else 'USD'
-                
-                try:
-                    # Try to cache for 24 hours
-                    cache.set(cache_key, currency, 86400)
-                except (RedisConnectionError, ConnectionInterrupted):
-                    # If Redis is not available, just continue without caching
-                    pass
-            except Exception:
-                # Default to NGN in case of any error
-                currency = 'NGN'
-        
+            currency = DEFAULT_CURRENCY
+            self.schedule_lookup(client_ip)
+
         request.currency = currency
         return None
-    
+
+    def schedule_lookup(self, client_ip):
+        """Queue a provider lookup for the IP unless one is already pending"""
+        try:
+            if not cache.add(f'currency_lookup_pending_{client_ip}', True, IP_LOOKUP_PENDING_TIMEOUT):
+                return
+            from ..tasks import resolve_ip_currency
+            resolve_ip_currency.delay(client_ip)
+        except Exception as e:
+            # A missing broker or cache must never fail the request
+            logger.warning(f"Could not queue currency lookup for {client_ip}: {e}")
+
     def get_client_ip(self, request):
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
-            return x_forwarded_for.split(',')[0]
-        return request.META.get('REMOTE_ADDR') 
\ No newline at end of file
+            return x_forwarded_for.split(',')[0].strip()
+        return request.META.get('REMOTE_ADDR')
@@ -22,11 +22,11 @@ class InputSanitizationMiddleware:
         try:
             # Sanitize query parameters
             if request.GET:
-                self._sanitize_querydict(request.GET)
+                request.GET = self._sanitize_querydict(request.GET.copy())
 
             # Sanitize POST data
             if request.POST:
-                self._sanitize_querydict(request.POST)
+                request.POST = self._sanitize_querydict(request.POST.copy())
 
             # Sanitize JSON data
             if request.content_type == 'application/json':
@@ -64,6 +64,7 @@ class InputSanitizationMiddleware:
             values = query_dict.getlist(key)
             sanitized_values = [self._sanitize_string(value) for value in values]
             query_dict.setlist(key, sanitized_values)
+        return query_dict
 
     def _sanitize_json(self, data):
         """Recursively sanitize JSON data"""
@@ -1,32 +1,59 @@
-from django.core.cache import cache
 from ..utils import error_response
+from ..services.rate_limiter import rate_limiter, RateLimitPolicy
 from django.http import HttpResponse
 from django.conf import settings
-import time
 
 class HttpResponseTooManyRequests(HttpResponse):
     status_code = 429
 
+DEFAULT_RATE_LIMITS = {
+    'DEFAULT': {'calls': 100, 'period': 60},  # 100 calls per minute
+    'API': {'calls': 60, 'period': 60},       # 60 calls per minute for API
+    'MONITORING': {'calls': 30, 'period': 60}  # 30 calls per minute for monitoring
+}
+
+DEFAULT_RATE_LIMIT_ROUTES = [
+    ('/api/', 'API'),
+    ('/monitoring/', 'MONITORING'),
+]
+
 class RateLimitMiddleware:
     def __init__(self, get_response):
         self.get_response = get_response
-        # Default rate limits
-        self.rate_limits = getattr(settings, 'RATE_LIMITS', {
-            'DEFAULT': {'calls': 100, 'period': 60},  # 100 calls per minute
-            'API': {'calls': 60, 'period': 60},       # 60 calls per minute for API
-            'MONITORING': {'calls': 30, 'period': 60}  # 30 calls per minute for monitoring
-        })
+        rate_limits = getattr(settings, 'RATE_LIMITS', DEFAULT_RATE_LIMITS)
+        self.policies = {
+            name: RateLimitPolicy.from_config(config)
+            for name, config in rate_limits.items()
+        }
+        # Longest prefix first, so specific routes override broader ones
+        self.routes = sorted(
+            getattr(settings, 'RATE_LIMIT_ROUTES', DEFAULT_RATE_LIMIT_ROUTES),
+            key=lambda route: len(route[0]),
+            reverse=True
+        )
 
     def __call__(self, request):
-        if self._should_rate_limit(request):
-            rate_limit_key = self._get_rate_limit_key(request)
-            if not self._check_rate_limit(rate_limit_key, request):
-                return HttpResponseTooManyRequests(
-                    "Rate limit exceeded. Please try again later.",
-                    content_type="text/plain"
-                )
-        
-        return self.get_response(request)
+        policy_name = self._get_policy_name(request)
+        if policy_name is None or not self._should_rate_limit(request):
+            return self.get_response(request)
+
+        policy = self.policies.get(policy_name) or self.policies['DEFAULT']
+        result = rate_limiter.hit(self._get_rate_limit_key(request, policy_name), policy)
+        if not result.allowed:
+            response = HttpResponseTooManyRequests(
+                "Rate limit exceeded. Please try again later.",
+                content_type="text/plain"
+            )
+        else:
+            response = self.get_response(request)
+        return result.apply_headers(response)
+
+    def _get_policy_name(self, request):
+        """Get the name of the policy for the request path, if any"""
+        for prefix, policy_name in self.routes:
+            if request.path.startswith(prefix):
+                return policy_name
+        return None
 
     def _should_rate_limit(self, request):
         """Determine if request should be rate limited"""
@@ -34,70 +61,17 @@ class RateLimitMiddleware:
         if hasattr(request, 'user') and request.user.is_authenticated:
             if request.user.role == 'ADMIN':
                 return False
+        return True
 
-        # Rate limit API and monitoring endpoints
-        if request.path.startswith('/api/') or request.path.startswith('/monitoring/'):
-            return True
-
-        return False
-
-    def _get_rate_limit_key(self, request):
+    def _get_rate_limit_key(self, request, policy_name):
         """Generate cache key for rate limiting"""
-        # Use IP address and path prefix for key
+        # Use IP address and policy name for key
         ip = self._get_client_ip(request)
-        if request.path.startswith('/api/'):
-            prefix = 'API'
-        elif request.path.startswith('/monitoring/'):
-            prefix = 'MONITORING'
-        else:
-            prefix = 'DEFAULT'
-        
-        return f"rate_limit:{prefix}:{ip}"
-
-    def _check_rate_limit(self, key, request):
-        """Check if request is within rate limits"""
-        # Determine which rate limit to apply
-        if request.path.startswith('/api/'):
-            limit = self.rate_limits['API']
-        elif request.path.startswith('/monitoring/'):
-            limit = self.rate_limits['MONITORING']
-        else:
-            limit = self.rate_limits['DEFAULT']
-
-        # Get current window from cache
-        window = cache.get(key)
-        current_time = time.time()
-
-        if window is None:
-            # First request in this window
-            window = {
-                'start_time': current_time,
-                'count': 1
-            }
-            cache.set(key, window, limit['period'])
-            return True
-
-        if current_time - window['start_time'] >= limit['period']:
-            # Window has expired, start new window
-            window = {
-                'start_time': current_time,
-                'count': 1
-            }
-            cache.set(key, window, limit['period'])
-            return True
-
-        # Check if we're within the limit
-        if window['count'] >= limit['calls']:
-            return False
-
-        # Increment the counter
-        window['count'] += 1
-        cache.set(key, window, limit['period'])
-        return True
+        return f"rate_limit:{policy_name}:{ip}"
 
     def _get_client_ip(self, request):
         """Get client IP address"""
         x_forwarded_for = request.META.get('HTTP_X_FORWARDED_FOR')
         if x_forwarded_for:
             return x_forwarded_for.split(',')[0]
-        return request.META.get('REMOTE_ADDR') 
\ No newline at end of file
+        return request.META.get('REMOTE_ADDR')
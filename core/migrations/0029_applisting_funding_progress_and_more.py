@@ -0,0 +1,51 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:23
+
+from decimal import Decimal
+from django.db import migrations, models
+from django.db.models import Count, Sum
+
+
+def populate_funding_counters(apps, schema_editor):
+    AppListing = apps.get_model('core', 'AppListing')
+    Investment = apps.get_model('core', 'Investment')
+    totals = Investment.objects.values('app_id').annotate(
+        raised=Sum('amount_paid'),
+        investors=Count('investor', distinct=True)
+    )
+    for row in totals:
+        app = AppListing.objects.get(pk=row['app_id'])
+        raised = row['raised'] or Decimal('0.00')
+        progress = Decimal('0.00')
+        if app.funding_goal:
+            progress = (raised / app.funding_goal * 100).quantize(Decimal('0.01'))
+        AppListing.objects.filter(pk=app.pk).update(
+            raised_amount=raised,
+            investor_count=row['investors'],
+            funding_progress=progress
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0028_notification_severity_alter_notification_link_and_more'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='applisting',
+            name='funding_progress',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Raised amount as a percentage of the funding goal', max_digits=7),
+        ),
+        migrations.AddField(
+            model_name='applisting',
+            name='investor_count',
+            field=models.PositiveIntegerField(default=0, help_text='Number of unique investors'),
+        ),
+        migrations.AddField(
+            model_name='applisting',
+            name='raised_amount',
+            field=models.DecimalField(decimal_places=2, default=Decimal('0.00'), help_text='Total amount raised from investments', max_digits=12),
+        ),
+        migrations.RunPython(populate_funding_counters, migrations.RunPython.noop),
+    ]
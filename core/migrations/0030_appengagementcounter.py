@@ -0,0 +1,61 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:29
+
+import django.db.models.deletion
+from datetime import timedelta
+from django.db import migrations, models
+from django.utils import timezone
+
+
+def populate_engagement_counters(apps, schema_editor):
+    AppListing = apps.get_model('core', 'AppListing')
+    AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+    CommunityVote = apps.get_model('core', 'CommunityVote')
+    AppComment = apps.get_model('core', 'AppComment')
+    window_start = timezone.localdate() - timedelta(days=6)
+
+    for app in AppListing.objects.all().iterator():
+        votes = CommunityVote.objects.filter(app=app)
+        recent_votes = {}
+        for created_at in votes.filter(
+            created_at__date__gte=window_start
+        ).values_list('created_at', flat=True):
+            day = timezone.localdate(created_at).isoformat()
+            recent_votes[day] = recent_votes.get(day, 0) + 1
+
+        user_comments = AppComment.objects.filter(app=app, is_system_generated=False)
+        AppEngagementCounter.objects.create(
+            app=app,
+            likes=votes.filter(vote_type='LIKE').count(),
+            upvotes=votes.filter(vote_type='UPVOTE').count(),
+            system_likes=votes.filter(vote_type='LIKE', is_system_generated=True).count(),
+            system_upvotes=votes.filter(vote_type='UPVOTE', is_system_generated=True).count(),
+            comments=user_comments.count() + AppComment.objects.filter(
+                parent__in=user_comments
+            ).count(),
+            recent_votes=recent_votes
+        )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0029_applisting_funding_progress_and_more'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AppEngagementCounter',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('likes', models.PositiveIntegerField(default=0)),
+                ('upvotes', models.PositiveIntegerField(default=0)),
+                ('system_likes', models.PositiveIntegerField(default=0, help_text='Likes from system-generated vote rows')),
+                ('system_upvotes', models.PositiveIntegerField(default=0, help_text='Upvotes from system-generated vote rows')),
+                ('comments', models.PositiveIntegerField(default=0, help_text='User comments plus replies to user comments')),
+                ('recent_votes', models.JSONField(blank=True, default=dict, help_text='Votes per day (ISO date) for the rolling trending window')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('app', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='engagement_counter', to='core.applisting')),
+            ],
+        ),
+        migrations.RunPython(populate_engagement_counters, migrations.RunPython.noop),
+    ]
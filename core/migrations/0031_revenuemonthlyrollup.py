@@ -0,0 +1,33 @@
+# Generated by Django 5.1.4 on 2026-10-18 14:39
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0030_appengagementcounter'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RevenueMonthlyRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('month', models.DateField(help_text='First day of the rolled-up month')),
+                ('currency', models.CharField(max_length=3)),
+                ('total_amount', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('revenue_count', models.PositiveIntegerField(default=0)),
+                ('customer_count', models.PositiveIntegerField(default=0)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='revenue_rollups', to='core.applisting')),
+            ],
+            options={
+                'ordering': ['-month'],
+                'indexes': [models.Index(fields=['month'], name='core_revenu_month_df4f18_idx')],
+                'unique_together': {('app', 'month', 'currency')},
+            },
+        ),
+    ]
@@ -0,0 +1,35 @@
+# Generated by Django 5.1.4 on 2026-10-18 15:11
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0031_revenuemonthlyrollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='APIRequestRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('bucket', models.DateTimeField(help_text='Start of the minute covered')),
+                ('endpoint', models.CharField(max_length=255)),
+                ('method', models.CharField(max_length=10)),
+                ('request_count', models.PositiveIntegerField(default=0)),
+                ('error_count', models.PositiveIntegerField(default=0, help_text='Requests that raised or returned a 5xx status')),
+                ('total_response_time', models.FloatField(default=0)),
+                ('max_response_time', models.FloatField(default=0)),
+                ('status_counts', models.JSONField(default=dict)),
+                ('latency_histogram', models.JSONField(default=dict, help_text='Request counts per LatencyHistogram bucket')),
+            ],
+            options={
+                'verbose_name': 'API Request Rollup',
+                'verbose_name_plural': 'API Request Rollups',
+                'ordering': ['-bucket'],
+                'indexes': [models.Index(fields=['bucket'], name='core_apireq_bucket_0e9e99_idx')],
+                'unique_together': {('bucket', 'endpoint', 'method')},
+            },
+        ),
+    ]
@@ -0,0 +1,69 @@
+# Generated by Django 5.1.4 on 2026-10-18 17:02
+
+import django.db.models.deletion
+from decimal import Decimal
+from django.db import migrations, models
+
+
+def open_escrow_ledger(apps, schema_editor):
+    """One opening entry per app with the totals of its existing transactions"""
+    EscrowTransaction = apps.get_model('core', 'EscrowTransaction')
+    EscrowLedgerEntry = apps.get_model('core', 'EscrowLedgerEntry')
+    totals = {}
+    for kind, types in (('received', ['DEPOSIT']), ('released', ['RELEASE', 'MILESTONE_RELEASE'])):
+        rows = EscrowTransaction.objects.filter(
+            status='COMPLETED',
+            transaction_type__in=types
+        ).order_by().values('app').annotate(total=models.Sum('amount'))
+        for row in rows:
+            totals.setdefault(row['app'], {})[kind] = row['total']
+
+    EscrowLedgerEntry.objects.bulk_create([
+        EscrowLedgerEntry(
+            app_id=app_id,
+            received=app_totals.get('received') or Decimal('0.00'),
+            released=app_totals.get('released') or Decimal('0.00')
+        )
+        for app_id, app_totals in totals.items()
+    ], batch_size=1000)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0033_devicetoken'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='EscrowBalanceSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('last_entry_id', models.BigIntegerField(help_text='Last EscrowLedgerEntry included in the totals')),
+                ('total_received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('total_released', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='escrow_snapshots', to='core.applisting')),
+            ],
+            options={
+                'ordering': ['-id'],
+                'indexes': [models.Index(fields=['app', '-id'], name='core_escrow_app_id_58bd25_idx')],
+            },
+        ),
+        migrations.CreateModel(
+            name='EscrowLedgerEntry',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('escrow_transaction_id', models.BigIntegerField(blank=True, help_text='Transaction that caused the change; empty for bulk, opening and correcting entries', null=True)),
+                ('received', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('released', models.DecimalField(decimal_places=2, default=Decimal('0.00'), max_digits=15)),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('app', models.ForeignKey(on_delete=django.db.models.deletion.CASCADE, related_name='escrow_ledger_entries', to='core.applisting')),
+            ],
+            options={
+                'ordering': ['id'],
+                'indexes': [models.Index(fields=['app', 'id'], name='core_escrow_app_id_962f59_idx')],
+            },
+        ),
+        migrations.RunPython(open_escrow_ledger, migrations.RunPython.noop),
+    ]
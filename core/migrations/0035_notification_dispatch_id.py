@@ -0,0 +1,18 @@
+# Generated by Django 5.1.4 on 2026-10-18 18:15
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0034_escrowledgerentry_escrowbalancesnapshot'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='notification',
+            name='dispatch_id',
+            field=models.UUIDField(blank=True, db_index=True, editable=False, help_text='Bulk dispatch chunk that created the notification', null=True),
+        ),
+    ]
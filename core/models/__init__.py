@@ -1,5 +1,5 @@
 from .base import *
-from .api import APIRequest, APIError
+from .api import APIRequest, APIError, APIRequestRollup
 from .user_activity import UserActivity
 from .moderation import Report, ContentModeration, ModerationLog
 from .security import SecurityAuditLog
@@ -12,12 +12,16 @@ from .release import Release
 from .payment_info import DeveloperPaymentInfo
 from .project_request import ProjectRequest
 from .subscription import Subscription, SubscriptionFeatureUsage, SubscriptionPlan
+from .engagement import AppEngagementCounter
+from .revenue_rollup import RevenueMonthlyRollup
+from .device_token import DeviceToken
+from .escrow_ledger import EscrowLedgerEntry, EscrowBalanceSnapshot
 
 __all__ = [
     'User', 'AppListing', 'Investment', 'AIAssessment', 'PitchDeck',
     'Blog', 'BlogCategory', 'Report', 'ContentModeration',
     'ProjectMilestone', 'Deliverable', 'ProjectUpdate', 'ProjectTag', 'AppTag',
-    'APIRequest', 'APIError', 'UserActivity', 'ModerationLog',
+    'APIRequest', 'APIError', 'APIRequestRollup', 'UserActivity', 'ModerationLog',
     'SecurityAuditLog', 'BusinessRule', 'LegalDocument', 'UserAgreement',
     'EscrowRelease', 'Transaction',
     'Dispute', 'DisputeEvidence', 'DisputeComment',
@@ -30,4 +34,8 @@ __all__ = [
     'InvestmentAgreement',
     'Subscription', 'SubscriptionFeatureUsage', 'SubscriptionPlan',
     'ReleaseRequest',
+    'AppEngagementCounter',
+    'RevenueMonthlyRollup',
+    'DeviceToken',
+    'EscrowLedgerEntry', 'EscrowBalanceSnapshot',
 ] 
\ No newline at end of file
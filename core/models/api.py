@@ -35,4 +35,43 @@ class APIError(models.Model):
         verbose_name_plural = 'API Errors'
 
     def __str__(self):
-        return f"{self.error_type} at {self.timestamp}" 
\ No newline at end of file
+        return f"{self.error_type} at {self.timestamp}"
+
+
+class APIRequestRollup(models.Model):
+    """Per-minute API traffic totals for one endpoint and method.
+
+    Written by the API telemetry collector so dashboards read one row per
+    endpoint per minute instead of scanning raw APIRequest rows.
+    """
+    bucket = models.DateTimeField(help_text="Start of the minute covered")
+    endpoint = models.CharField(max_length=255)
+    method = models.CharField(max_length=10)
+    request_count = models.PositiveIntegerField(default=0)
+    error_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Requests that raised or returned a 5xx status"
+    )
+    total_response_time = models.FloatField(default=0)  # in milliseconds
+    max_response_time = models.FloatField(default=0)  # in milliseconds
+    status_counts = models.JSONField(default=dict)
+    latency_histogram = models.JSONField(
+        default=dict,
+        help_text="Request counts per LatencyHistogram bucket"
+    )
+
+    class Meta:
+        ordering = ['-bucket']
+        unique_together = ('bucket', 'endpoint', 'method')
+        indexes = [
+            models.Index(fields=['bucket']),
+        ]
+        verbose_name = 'API Request Rollup'
+        verbose_name_plural = 'API Request Rollups'
+
+    def __str__(self):
+        return f"{self.method} {self.endpoint} @ {self.bucket:%Y-%m-%d %H:%M}"
+
+    @property
+    def average_response_time(self):
+        return self.total_response_time / self.request_count if self.request_count else 0
@@ -12,7 +12,8 @@ from django.core.validators import FileExtensionValidator
 from core.services.pdf_analyzer import PDFAnalyzer
 from core.services.ai_analyzer import AIAnalyzer
 from .mixins import UserSecurityMixin, TwoFactorMixin
-from django.db.models import Sum, Count, Q, F, Value, Avg
+from .engagement import AppEngagementCounter
+from django.db.models import Sum, Count, Q, F, Value, Avg, OuterRef, Subquery
 from django.db.models.functions import Coalesce
 import pyotp
 import qrcode
@@ -177,6 +178,64 @@ class User(AbstractUser, UserSecurityMixin, TwoFactorMixin):
         verbose_name_plural = 'Users' 
 
 
+class AppListingQuerySet(models.QuerySet):
+    def with_funding_summary(self):
+        """Listings with their developer and derived funding figures in one query.
+        
+        Raised amount, investor count and progress are already stored on
+        the listing; valuation and retained shares are computed by the
+        database so serializers need no per-row work.
+        """
+        decimal_output = models.DecimalField(max_digits=20, decimal_places=2)
+        return self.select_related('developer').annotate(
+            company_valuation=models.Case(
+                models.When(
+                    available_percentage__gt=0,
+                    then=models.ExpressionWrapper(
+                        F('funding_goal') * Value(Decimal('100.0')) / F('available_percentage'),
+                        output_field=decimal_output
+                    )
+                ),
+                default=None,
+                output_field=decimal_output
+            ),
+            retained_shares=models.ExpressionWrapper(
+                Value(Decimal('100.00')) - F('available_percentage'),
+                output_field=decimal_output
+            )
+        )
+
+    def with_escrow_totals(self):
+        """Listings annotated with escrow_received and escrow_released.
+        
+        Each total is the app's latest EscrowBalanceSnapshot plus the
+        ledger entries written after it, so the cost does not grow with
+        the app's escrow transaction history.
+        """
+        from .escrow_ledger import EscrowBalanceSnapshot, EscrowLedgerEntry
+
+        decimal_output = models.DecimalField(max_digits=15, decimal_places=2)
+        zero = Value(Decimal('0.00'), output_field=decimal_output)
+        snapshot = EscrowBalanceSnapshot.objects.filter(app=OuterRef('pk')).order_by('-id')
+
+        def total(snapshot_field, entry_field):
+            since_snapshot = EscrowLedgerEntry.objects.filter(
+                app=OuterRef('pk'),
+                id__gt=OuterRef('escrow_snapshot_entry')
+            ).order_by().values('app').annotate(total=Sum(entry_field)).values('total')
+            return models.ExpressionWrapper(
+                Coalesce(Subquery(snapshot.values(snapshot_field)[:1]), zero) +
+                Coalesce(Subquery(since_snapshot), zero),
+                output_field=decimal_output
+            )
+
+        return self.annotate(
+            escrow_snapshot_entry=Coalesce(Subquery(snapshot.values('last_entry_id')[:1]), Value(0))
+        ).annotate(
+            escrow_received=total('total_received', 'received'),
+            escrow_released=total('total_released', 'released')
+        )
+
 # App Listing Model
 class AppListing(models.Model):
     class Status(models.TextChoices):
@@ -395,6 +454,25 @@ class AppListing(models.Model):
         help_text="Total percentage of company equity (not just what's offered for funding)"
     )
     
+    # Denormalized funding counters (maintained by Investment.save and the
+    # investment post_delete signal, repaired by reconcile_funding_counters)
+    raised_amount = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Total amount raised from investments"
+    )
+    investor_count = models.PositiveIntegerField(
+        default=0,
+        help_text="Number of unique investors"
+    )
+    funding_progress = models.DecimalField(
+        max_digits=7,
+        decimal_places=2,
+        default=Decimal('0.00'),
+        help_text="Raised amount as a percentage of the funding goal"
+    )
+    
     # Lock-in Period
     lock_in_period = models.IntegerField(
         default=180,  # 6 months in days
@@ -551,40 +629,99 @@ class AppListing(models.Model):
         except Exception as e:
             logger.error(f"Error handling funding completion: {str(e)}")
 
+    # Written only with F() updates (Investment.save, the investment
+    # post_delete signal, refresh_funding_counters)
+    COUNTER_FIELDS = ('raised_amount', 'investor_count')
+
     def save(self, *args, **kwargs):
         """Save the app listing with proper locking and validation."""
-        if self.pk:  # Only get existing instance if we're updating
-            with transaction.atomic():
-                app = AppListing.objects.select_for_update().get(pk=self.pk)
-                
-                # Update fields that need special handling
-                if app.status != self.status and self.status == self.Status.FUNDED:
-                    self.handle_funding_completion()
-                
-                # Update remaining percentage if needed
-                if app.available_percentage != self.available_percentage:
-                    self.remaining_percentage = self.available_percentage
-        else:
+        if not self.pk:
             # For new instances, set remaining percentage equal to available percentage
             self.remaining_percentage = self.available_percentage
             
             # Calculate price per percentage for new listings
             if self.funding_goal and self.available_percentage:
                 self.price_per_percentage = self.funding_goal / self.available_percentage
+            
+            self.funding_progress = self.calculate_funding_progress()
+            super().save(*args, **kwargs)
+            return
         
-        super().save(*args, **kwargs)
+        with transaction.atomic():
+            app = AppListing.objects.select_for_update().get(pk=self.pk)
+            
+            # Update fields that need special handling
+            if app.status != self.status and self.status == self.Status.FUNDED:
+                self.handle_funding_completion()
+            
+            # Update remaining percentage if needed
+            if app.available_percentage != self.available_percentage:
+                self.remaining_percentage = self.available_percentage
+            
+            # This instance may predate the latest counter updates; take the
+            # stored counters and leave them out of full saves
+            update_fields = kwargs.get('update_fields')
+            for field in self.COUNTER_FIELDS:
+                if update_fields is None or field not in update_fields:
+                    setattr(self, field, getattr(app, field))
+            if update_fields is None:
+                kwargs['update_fields'] = [
+                    field.name for field in self._meta.concrete_fields
+                    if not field.primary_key and field.name not in self.COUNTER_FIELDS
+                ]
+            
+            # Keep progress in step with the funding goal, which can be edited
+            self.funding_progress = self.calculate_funding_progress()
+            if update_fields is not None and 'raised_amount' in update_fields:
+                kwargs['update_fields'] = set(update_fields) | {'funding_progress'}
+            
+            # For post_save receivers that only care about some fields
+            self._changed_fields = {
+                field.name for field in self._meta.concrete_fields
+                if getattr(app, field.attname) != getattr(self, field.attname)
+            }
+            super().save(*args, **kwargs)
+    
+    def calculate_funding_progress(self):
+        """Calculate funding progress from the stored raised amount."""
+        if not self.funding_goal:
+            return Decimal('0.00')
+        return (Decimal(self.raised_amount or 0) / self.funding_goal * 100).quantize(Decimal('0.01'))
+    
+    def refresh_funding_counters(self, commit=True):
+        """Recalculate the denormalized funding counters from investments.
+        
+        Returns True if any of the stored counters changed.
+        """
+        totals = Investment.objects.filter(app=self).aggregate(
+            raised=Coalesce(Sum('amount_paid'), Decimal('0.00')),
+            investors=Count('investor', distinct=True)
+        )
+        changed = (
+            self.raised_amount != totals['raised'] or
+            self.investor_count != totals['investors']
+        )
+        self.raised_amount = totals['raised']
+        self.investor_count = totals['investors']
+        progress = self.calculate_funding_progress()
+        changed = changed or self.funding_progress != progress
+        self.funding_progress = progress
+        
+        if commit and changed:
+            AppListing.objects.filter(pk=self.pk).update(
+                raised_amount=self.raised_amount,
+                investor_count=self.investor_count,
+                funding_progress=self.funding_progress
+            )
+        return changed
     
     def get_funded_amount(self):
         """Get total amount funded in listing currency."""
-        return self.investment_set.aggregate(
-            total=models.Sum('amount_paid')
-        )['total'] or 0
+        return self.raised_amount
     
     def get_funding_progress(self):
-        """Calculate funding progress as a percentage"""
-        if self.funding_goal == 0:
-            return Decimal('0.00')
-        return (self.get_raised_amount() / self.funding_goal * 100).quantize(Decimal('0.01'))
+        """Get funding progress as a percentage"""
+        return self.funding_progress
         
     def is_fully_funded(self):
         """Check if the app has reached its funding goal."""
@@ -595,10 +732,8 @@ class AppListing(models.Model):
         return self.get_raised_amount() >= self.funding_goal
     
     def get_raised_amount(self):
-        """Calculate total amount raised"""
-        return Investment.objects.filter(app=self).aggregate(
-            total=Coalesce(Sum('amount_paid'), Decimal('0.00'))
-        )['total']
+        """Get total amount raised"""
+        return self.raised_amount
     
     def get_remaining_amount(self):
         """Calculate remaining amount needed"""
@@ -611,6 +746,10 @@ class AppListing(models.Model):
             return (self.funding_goal / self.available_percentage) * Decimal('100.0')
         return None
     
+    def get_retained_shares(self):
+        """Percentage of the company the developer keeps after this round."""
+        return Decimal('100.00') - self.available_percentage
+    
     def get_current_exchange_rate(self):
         """Fetch current NGN exchange rate from API."""
         # TODO: Implement exchange rate API integration
@@ -676,24 +815,29 @@ class AppListing(models.Model):
 
     def get_investor_count(self):
         """Get the count of unique investors for this app."""
-        return self.investment_set.values('investor').distinct().count()
+        return self.investor_count
+
+    @property
+    def engagement(self):
+        """Get the engagement counter record, rebuilding it if missing."""
+        try:
+            return self.engagement_counter
+        except AppEngagementCounter.DoesNotExist:
+            self.engagement_counter = AppEngagementCounter.rebuild(self)
+            return self.engagement_counter
 
     @property
     def upvote_count(self):
-        return self.community_votes.filter(vote_type=CommunityVote.VoteType.UPVOTE).count()
+        return self.engagement.upvotes
     
     @property
     def like_count(self):
-        return self.community_votes.filter(vote_type=CommunityVote.VoteType.LIKE).count()
+        return self.engagement.likes
     
     @property
     def comment_count(self):
         """Get total number of comments and replies."""
-        base_comments = self.comments.filter(is_system_generated=False).count()
-        replies = self.comments.filter(is_system_generated=False).aggregate(
-            reply_count=Count('replies')
-        )['reply_count'] or 0
-        return base_comments + replies + (self.system_comment_count or 0)
+        return self.engagement.comments + (self.system_comment_count or 0)
     
     @property
     def is_trending(self):
@@ -704,11 +848,8 @@ class AppListing(models.Model):
         if self.manual_trending:
             return True
             
-        # Check automatic trending criteria
-        recent_votes = self.community_votes.filter(
-            created_at__gte=timezone.now() - timezone.timedelta(days=7)
-        ).count()
-        return recent_votes >= settings.TRENDING_VOTE_THRESHOLD
+        # Check automatic trending criteria against the rolling vote window
+        return self.engagement.get_recent_vote_count() >= settings.TRENDING_VOTE_THRESHOLD
 
     def set_trending_status(self, is_trending):
         """
@@ -765,48 +906,37 @@ class AppListing(models.Model):
             self.project_status = self.Status.FUNDED
             self.save(update_fields=['status', 'project_status'])
 
+    def _escrow_totals(self):
+        if hasattr(self, 'escrow_received'):
+            return self.escrow_received, self.escrow_released
+        totals = AppListing.objects.filter(pk=self.pk).with_escrow_totals().values(
+            'escrow_received', 'escrow_released'
+        ).first() or {}
+        return totals.get('escrow_received') or Decimal('0'), totals.get('escrow_released') or Decimal('0')
+
     @property
     def total_received(self):
-        """Calculate total amount received in escrow."""
-        return EscrowTransaction.objects.filter(
-            app=self,
-            transaction_type=EscrowTransaction.Type.DEPOSIT,
-            status='COMPLETED'
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0')
+        """Total amount received in escrow, from the escrow ledger."""
+        return self._escrow_totals()[0]
 
     @property
     def total_released(self):
-        """Calculate total amount released from escrow."""
-        return EscrowTransaction.objects.filter(
-            app=self,
-            transaction_type__in=[
-                EscrowTransaction.Type.RELEASE,
-                EscrowTransaction.Type.MILESTONE_RELEASE
-            ],
-            status='COMPLETED'
-        ).aggregate(total=models.Sum('amount'))['total'] or Decimal('0')
+        """Total amount released from escrow, from the escrow ledger."""
+        return self._escrow_totals()[1]
 
     def get_total_likes(self):
         """Get total number of likes including both user and system generated."""
-        return self.community_votes.filter(
-            vote_type=CommunityVote.VoteType.LIKE,
-            is_system_generated=False
-        ).count() + self.system_like_count
+        engagement = self.engagement
+        return engagement.likes - engagement.system_likes + self.system_like_count
     
     def get_total_upvotes(self):
         """Get total number of upvotes including both user and system generated."""
-        return self.community_votes.filter(
-            vote_type=CommunityVote.VoteType.UPVOTE,
-            is_system_generated=False
-        ).count() + self.system_upvote_count
+        engagement = self.engagement
+        return engagement.upvotes - engagement.system_upvotes + self.system_upvote_count
 
     def get_total_comments(self):
         """Get total number of comments including both user and system generated."""
-        base_comments = self.comments.filter(is_system_generated=False).count()
-        replies = self.comments.filter(is_system_generated=False).aggregate(
-            reply_count=Count('replies')
-        )['reply_count'] or 0
-        return base_comments + replies + self.system_comment_count
+        return self.engagement.comments + self.system_comment_count
 
     @property
     def engagement_score(self):
@@ -839,6 +969,8 @@ class AppListing(models.Model):
         
         return round(weighted_score, 1)
 
+    objects = AppListingQuerySet.as_manager()
+
     class Meta:
         ordering = ['-created_at']
         indexes = [
@@ -882,6 +1014,11 @@ class Investment(models.Model):
                 if total_invested + self.percentage_bought > app.available_percentage:
                     raise ValueError(f"Cannot invest more than the remaining percentage ({app.remaining_percentage}%)")
                 
+                is_new_investor = not Investment.objects.filter(
+                    app=app,
+                    investor=self.investor
+                ).exists()
+                
                 # Save the investment first
                 super().save(*args, **kwargs)
                 
@@ -899,14 +1036,22 @@ class Investment(models.Model):
                     user=self.investor,
                     app=app,
                     amount=self.amount_paid,
-                    transaction_type=Transaction.Type.INVESTMENT,
-                    status=Transaction.Status.COMPLETED
+                    transaction_type='INVESTMENT',
+                    status='COMPLETED'
                 )
                 
                 # Calculate new remaining percentage
                 new_remaining = app.available_percentage - (total_invested + self.percentage_bought)
                 app.remaining_percentage = new_remaining
                 
+                # Update denormalized funding counters in the database, so a
+                # full save of another copy of the listing cannot revert them;
+                # progress is derived from them in AppListing.save()
+                AppListing.objects.filter(pk=app.pk).update(
+                    raised_amount=F('raised_amount') + self.amount_paid,
+                    investor_count=F('investor_count') + (1 if is_new_investor else 0)
+                )
+                
                 # Update app status if fully funded
                 if new_remaining <= Decimal('0'):
                     app.status = AppListing.Status.FUNDED
@@ -1115,6 +1260,13 @@ class Notification(models.Model):
     is_read = models.BooleanField(default=False)
     created_at = models.DateTimeField(auto_now_add=True)
     severity = models.CharField(max_length=10, choices=Severity.choices, default=Severity.LOW)
+    dispatch_id = models.UUIDField(
+        null=True,
+        blank=True,
+        editable=False,
+        db_index=True,
+        help_text="Bulk dispatch chunk that created the notification"
+    )
     
     class Meta:
         ordering = ['-created_at']
@@ -0,0 +1,40 @@
+from django.db import models
+from django.conf import settings
+
+
+class DeviceToken(models.Model):
+    """A Firebase Cloud Messaging registration token for one of a user's devices.
+
+    Users can have any number of tokens. Tokens that FCM reports as
+    unregistered or invalid are deleted by the push delivery service.
+    """
+
+    class Platform(models.TextChoices):
+        ANDROID = 'ANDROID', 'Android'
+        IOS = 'IOS', 'iOS'
+        WEB = 'WEB', 'Web'
+
+    user = models.ForeignKey(
+        settings.AUTH_USER_MODEL,
+        on_delete=models.CASCADE,
+        related_name='device_tokens'
+    )
+    token = models.CharField(max_length=255, unique=True)
+    platform = models.CharField(max_length=10, choices=Platform.choices, default=Platform.WEB)
+    created_at = models.DateTimeField(auto_now_add=True)
+    last_seen_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        ordering = ['-last_seen_at']
+
+    def __str__(self):
+        return f"{self.user_id} - {self.get_platform_display()}"
+
+    @classmethod
+    def register(cls, user, token, platform=Platform.WEB):
+        """Attach a token to a user, moving it over if another account had it"""
+        device_token, _ = cls.objects.update_or_create(
+            token=token,
+            defaults={'user': user, 'platform': platform}
+        )
+        return device_token
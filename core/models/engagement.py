@@ -0,0 +1,156 @@
+from datetime import timedelta
+from django.db import models, transaction
+from django.utils import timezone
+
+# Number of days of vote buckets kept for the trending check
+TRENDING_WINDOW_DAYS = 7
+
+
+class AppEngagementCounter(models.Model):
+    """Per-app counter cache for community votes and comments.
+
+    Kept in step by the CommunityVote/AppComment signals so that listing
+    pages can read engagement metrics without counting related rows.
+    """
+
+    app = models.OneToOneField(
+        'AppListing',
+        on_delete=models.CASCADE,
+        related_name='engagement_counter'
+    )
+    likes = models.PositiveIntegerField(default=0)
+    upvotes = models.PositiveIntegerField(default=0)
+    system_likes = models.PositiveIntegerField(
+        default=0,
+        help_text="Likes from system-generated vote rows"
+    )
+    system_upvotes = models.PositiveIntegerField(
+        default=0,
+        help_text="Upvotes from system-generated vote rows"
+    )
+    comments = models.PositiveIntegerField(
+        default=0,
+        help_text="User comments plus replies to user comments"
+    )
+    recent_votes = models.JSONField(
+        default=dict,
+        blank=True,
+        help_text="Votes per day (ISO date) for the rolling trending window"
+    )
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'core'
+
+    def __str__(self):
+        return f"Engagement counters for app {self.app_id}"
+
+    @staticmethod
+    def _window_start(now=None):
+        return timezone.localdate(now) - timedelta(days=TRENDING_WINDOW_DAYS - 1)
+
+    def _prune(self, now=None):
+        window_start = self._window_start(now).isoformat()
+        self.recent_votes = {
+            day: count for day, count in self.recent_votes.items()
+            if day >= window_start and count > 0
+        }
+
+    def get_recent_vote_count(self, now=None):
+        """Number of votes cast within the rolling trending window."""
+        window_start = self._window_start(now).isoformat()
+        return sum(
+            count for day, count in self.recent_votes.items()
+            if day >= window_start
+        )
+
+    @staticmethod
+    def comment_weight(comment):
+        """How much a comment contributes to the comment counter.
+
+        Matches AppListing.get_total_comments(): a user comment counts
+        once, and a reply to a user comment counts once more.
+        """
+        weight = 0 if comment.is_system_generated else 1
+        if comment.parent_id:
+            parent_is_system = type(comment).objects.filter(
+                pk=comment.parent_id
+            ).values_list('is_system_generated', flat=True).first()
+            if parent_is_system is False:
+                weight += 1
+        return weight
+
+    @classmethod
+    def _locked(cls, app_id, create):
+        # Deletions never create a counter: during a cascading app delete the
+        # counter row may already be gone and must not be recreated.
+        if create:
+            cls.objects.get_or_create(app_id=app_id)
+        return cls.objects.select_for_update().filter(app_id=app_id).first()
+
+    @classmethod
+    def record_vote(cls, vote, delta):
+        """Apply a vote creation (+1) or deletion (-1) to the counters."""
+        from .base import CommunityVote
+
+        is_like = vote.vote_type == CommunityVote.VoteType.LIKE
+        with transaction.atomic():
+            counter = cls._locked(vote.app_id, create=delta > 0)
+            if counter is None:
+                return None
+            field = 'likes' if is_like else 'upvotes'
+            setattr(counter, field, max(getattr(counter, field) + delta, 0))
+            if vote.is_system_generated:
+                field = 'system_likes' if is_like else 'system_upvotes'
+                setattr(counter, field, max(getattr(counter, field) + delta, 0))
+
+            day = timezone.localdate(vote.created_at or timezone.now()).isoformat()
+            counter.recent_votes[day] = counter.recent_votes.get(day, 0) + delta
+            counter._prune()
+            counter.save()
+        return counter
+
+    @classmethod
+    def record_comment(cls, app_id, weight):
+        """Apply a comment creation or deletion weight to the counters."""
+        if not weight:
+            return None
+        with transaction.atomic():
+            counter = cls._locked(app_id, create=weight > 0)
+            if counter is None:
+                return None
+            counter.comments = max(counter.comments + weight, 0)
+            counter.save(update_fields=['comments', 'updated_at'])
+        return counter
+
+    @classmethod
+    def rebuild(cls, app):
+        """Recalculate the counters for an app from the vote and comment rows."""
+        from .base import CommunityVote, AppComment
+
+        votes = CommunityVote.objects.filter(app=app)
+        window_start = cls._window_start()
+        recent_votes = {}
+        for created_at in votes.filter(
+            created_at__date__gte=window_start
+        ).values_list('created_at', flat=True):
+            day = timezone.localdate(created_at).isoformat()
+            recent_votes[day] = recent_votes.get(day, 0) + 1
+
+        user_comments = AppComment.objects.filter(app=app, is_system_generated=False)
+        counts = {
+            'likes': votes.filter(vote_type=CommunityVote.VoteType.LIKE).count(),
+            'upvotes': votes.filter(vote_type=CommunityVote.VoteType.UPVOTE).count(),
+            'system_likes': votes.filter(
+                vote_type=CommunityVote.VoteType.LIKE, is_system_generated=True
+            ).count(),
+            'system_upvotes': votes.filter(
+                vote_type=CommunityVote.VoteType.UPVOTE, is_system_generated=True
+            ).count(),
+            'comments': user_comments.count() + AppComment.objects.filter(
+                parent__in=user_comments
+            ).count(),
+            'recent_votes': recent_votes,
+        }
+        counter, _ = cls.objects.update_or_create(app=app, defaults=counts)
+        return counter
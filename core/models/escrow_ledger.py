@@ -0,0 +1,64 @@
+from decimal import Decimal
+from django.db import models
+
+
+class EscrowLedgerEntry(models.Model):
+    """Append-only change in an app's escrow totals.
+
+    One row is written whenever an EscrowTransaction starts or stops
+    counting towards total_received (completed deposits) or
+    total_released (completed releases), with the signed difference.
+    Rows are never updated; corrections are new rows.
+    """
+
+    app = models.ForeignKey(
+        'AppListing',
+        on_delete=models.CASCADE,
+        related_name='escrow_ledger_entries'
+    )
+    escrow_transaction_id = models.BigIntegerField(
+        null=True,
+        blank=True,
+        help_text="Transaction that caused the change; empty for bulk, opening and correcting entries"
+    )
+    received = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    released = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'core'
+        ordering = ['id']
+        indexes = [
+            models.Index(fields=['app', 'id']),
+        ]
+
+    def __str__(self):
+        return f"{self.app_id} #{self.id}: received {self.received}, released {self.released}"
+
+
+class EscrowBalanceSnapshot(models.Model):
+    """An app's escrow totals as of a ledger entry.
+
+    Built by EscrowLedger.snapshot so a balance read sums only the ledger
+    entries written after the latest snapshot.
+    """
+
+    app = models.ForeignKey(
+        'AppListing',
+        on_delete=models.CASCADE,
+        related_name='escrow_snapshots'
+    )
+    last_entry_id = models.BigIntegerField(help_text="Last EscrowLedgerEntry included in the totals")
+    total_received = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    total_released = models.DecimalField(max_digits=15, decimal_places=2, default=Decimal('0.00'))
+    created_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        app_label = 'core'
+        ordering = ['-id']
+        indexes = [
+            models.Index(fields=['app', '-id']),
+        ]
+
+    def __str__(self):
+        return f"{self.app_id} @{self.last_entry_id}: received {self.total_received}, released {self.total_released}"
@@ -9,7 +9,12 @@ from django.contrib import messages
 from django.core.mail import send_mail
 from django.conf import settings
 from .escrow import EscrowRelease
-from .base import AppListing
+from .base import AppListing, EscrowTransaction
+import logging
+
+logger = logging.getLogger(__name__)
+
+RELEASE_CHUNK_SIZE = 1000  # Deposits released per transaction
 
 class ProjectMilestone(models.Model):
     class Status(models.TextChoices):
@@ -48,15 +53,7 @@ class ProjectMilestone(models.Model):
         self.progress = 100
         self.save()
 
-        # Find associated escrow transactions and process releases
-        escrow_transactions = self.app.escrowtransaction_set.filter(
-            transaction_type='DEPOSIT',
-            status='COMPLETED'
-        )
-        
-        for transaction in escrow_transactions:
-            transaction.process_milestone_release(self)
-        
+        self.release_escrow()
         return True
 
     def calculate_remaining_funds(self):
@@ -153,39 +150,98 @@ class ProjectMilestone(models.Model):
             
         return True, "Ready for fund release"
 
-    def process_batch_release(self):
+    def process_batch_release(self, chunk_size=RELEASE_CHUNK_SIZE):
         """Process releases for multiple transactions in a batch."""
         can_release, message = self.can_release_funds()
         if not can_release:
             raise ValueError(f"Cannot release funds: {message}")
-            
+
+        return self.release_escrow(chunk_size)
+
+    def release_escrow(self, chunk_size=RELEASE_CHUNK_SIZE):
+        """Release this milestone's share of every completed deposit.
+
+        Deposits are released in id order, chunk_size at a time. Each chunk
+        commits on its own: its release rows are bulk-created and the app's
+        escrow balance is decremented once with an F() expression. Deposits
+        that already have a release for this milestone are skipped, so a
+        run that stopped part way picks up where it left off.
+        """
         from django.db import transaction
-        
-        with transaction.atomic():
-            escrow_transactions = self.app.escrowtransaction_set.filter(
-                transaction_type='DEPOSIT',
-                status='COMPLETED'
-            ).select_for_update()
-            
-            success_count = 0
-            failed_count = 0
-            total_released = Decimal('0.00')
-            
-            for escrow_tx in escrow_transactions:
-                try:
-                    release_amount = (escrow_tx.amount * self.release_percentage) / Decimal('100.0')
-                    escrow_tx.process_milestone_release(self)
-                    success_count += 1
-                    total_released += release_amount
-                except Exception as e:
-                    failed_count += 1
-                    logger.error(f"Failed to process release for transaction {escrow_tx.id}: {str(e)}")
-            
-            return {
-                'success_count': success_count,
-                'failed_count': failed_count,
-                'total_released': total_released
-            }
+        from ..services.escrow_ledger import EscrowLedger
+
+        released = EscrowTransaction.objects.filter(
+            milestone=self,
+            transaction_type=EscrowTransaction.Type.MILESTONE_RELEASE,
+            original_transaction__isnull=False
+        ).values('original_transaction_id')
+        deposits = EscrowTransaction.objects.filter(
+            app_id=self.app_id,
+            transaction_type=EscrowTransaction.Type.DEPOSIT,
+            status=EscrowTransaction.Status.COMPLETED
+        ).exclude(id__in=released).order_by('id').values(
+            'id', 'investor_id', 'amount', 'currency', 'payment_gateway', 'gateway_reference'
+        )
+
+        success_count = 0
+        total_released = Decimal('0.00')
+        last_id = 0
+        while True:
+            with transaction.atomic():
+                # Serializes releases for the app, so the exclusion above
+                # sees every release committed before this chunk
+                app = AppListing.objects.select_for_update().only('funds_in_escrow').get(pk=self.app_id)
+                chunk = list(deposits.filter(id__gt=last_id)[:chunk_size])
+                if not chunk:
+                    break
+
+                now = timezone.now()
+                releases = [
+                    EscrowTransaction(
+                        app_id=self.app_id,
+                        investor_id=deposit['investor_id'],
+                        transaction_type=EscrowTransaction.Type.MILESTONE_RELEASE,
+                        amount=(deposit['amount'] * self.release_percentage / Decimal('100.0')).quantize(Decimal('0.01')),
+                        currency=deposit['currency'],
+                        payment_gateway=deposit['payment_gateway'],
+                        gateway_reference=f"{deposit['gateway_reference']}_milestone_{self.id}",
+                        status=EscrowTransaction.Status.COMPLETED,
+                        completed_at=now,
+                        milestone=self,
+                        release_percentage=self.release_percentage,
+                        original_transaction_id=deposit['id']
+                    )
+                    for deposit in chunk
+                ]
+                chunk_total = sum((release.amount for release in releases), Decimal('0.00'))
+                if chunk_total > app.funds_in_escrow:
+                    raise ValueError(
+                        f"Release amount (₦{chunk_total:,.2f}) exceeds funds in escrow (₦{app.funds_in_escrow:,.2f})"
+                    )
+
+                EscrowTransaction.objects.bulk_create(releases)
+                # bulk_create skips the signals that keep the escrow ledger
+                EscrowLedger.record(self.app_id, released=chunk_total)
+                AppListing.objects.filter(pk=self.app_id).update(
+                    funds_in_escrow=models.F('funds_in_escrow') - chunk_total,
+                    escrow_status='PARTIALLY_RELEASED'
+                )
+
+            last_id = chunk[-1]['id']
+            success_count += len(releases)
+            total_released += chunk_total
+            logger.info(
+                f"Released {chunk_total} from escrow for milestone {self.id}, "
+                f"{len(releases)} deposits up to transaction {last_id}"
+            )
+
+        self.app.refresh_from_db(fields=['funds_in_escrow', 'escrow_status'])
+        return {
+            'success_count': success_count,
+            'failed_count': 0,
+            'total_released': total_released,
+            'last_transaction_id': last_id or None
+        }
 
     def rollback_release(self, release_transaction):
         """Rollback a failed milestone release."""
@@ -0,0 +1,37 @@
+from decimal import Decimal
+from django.db import models
+
+
+class RevenueMonthlyRollup(models.Model):
+    """Per-app, per-currency revenue totals for a closed calendar month.
+
+    Built by RevenueRollupService so that dashboards spanning years of
+    revenue read one row per month instead of every Revenue record.
+    """
+
+    app = models.ForeignKey(
+        'AppListing',
+        on_delete=models.CASCADE,
+        related_name='revenue_rollups'
+    )
+    month = models.DateField(help_text="First day of the rolled-up month")
+    currency = models.CharField(max_length=3)
+    total_amount = models.DecimalField(
+        max_digits=15,
+        decimal_places=2,
+        default=Decimal('0.00')
+    )
+    revenue_count = models.PositiveIntegerField(default=0)
+    customer_count = models.PositiveIntegerField(default=0)
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        app_label = 'core'
+        ordering = ['-month']
+        unique_together = ('app', 'month', 'currency')
+        indexes = [
+            models.Index(fields=['month']),
+        ]
+
+    def __str__(self):
+        return f"{self.app_id} {self.month:%Y-%m} {self.currency}: {self.total_amount}"
@@ -14,6 +14,13 @@ RESET_PERIODS = {
 
 WARNING_THRESHOLD = 0.85  # 85% of limit
 
+# Daily and monthly call limits per feature for each tier
+TIER_USAGE_LIMITS = {
+    'FREE': {'daily': 100, 'monthly': 1000},
+    'DEV_PRO': {'daily': 1000, 'monthly': 10000},
+    'INV_PRO': {'daily': 5000, 'monthly': 50000}
+}
+
 class Subscription(models.Model):
     class Tier(models.TextChoices):
         FREE = 'FREE', 'Free'
@@ -104,21 +111,17 @@ class SubscriptionFeatureUsage(models.Model):
         return f"{self.subscription.user.email} - {self.feature_name}"
 
     def increment_usage(self):
-        """Increment usage counters"""
-        self.daily_usage += 1
-        self.monthly_usage += 1
-        self.save()
+        """Increment usage counters in the database, safe under concurrent calls"""
+        SubscriptionFeatureUsage.objects.filter(pk=self.pk).update(
+            daily_usage=models.F('daily_usage') + 1,
+            monthly_usage=models.F('monthly_usage') + 1,
+            last_used=timezone.now()
+        )
+        self.refresh_from_db(fields=['daily_usage', 'monthly_usage', 'last_used'])
     
     def get_usage_limits(self):
         """Get the usage limits for this feature based on subscription tier"""
-        tier_limits = {
-            'FREE': {'daily': 100, 'monthly': 1000},
-            'DEV_PRO': {'daily': 1000, 'monthly': 10000},
-            'INV_PRO': {'daily': 5000, 'monthly': 50000}
-        }
-        
-        tier = self.subscription.tier
-        limits = tier_limits.get(tier, tier_limits['FREE'])
+        limits = TIER_USAGE_LIMITS.get(self.subscription.tier, TIER_USAGE_LIMITS['FREE'])
         
         return {
             'daily_limit': limits['daily'],
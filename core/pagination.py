@@ -0,0 +1,222 @@
+from django.core import signing
+from django.core.cache import cache
+from django.core.exceptions import FieldDoesNotExist, ValidationError
+from django.db import connection
+from django.db.models import Q
+from rest_framework.exceptions import NotFound
+from rest_framework.pagination import BasePagination
+from rest_framework.response import Response
+from rest_framework.utils.urls import replace_query_param
+import hashlib
+
+
+class InvalidCursor(Exception):
+    pass
+
+
+def encode_cursor(data):
+    # Hex keeps the token free of words the input sanitization middleware rejects
+    return signing.dumps(data, salt='core.pagination', compress=True).encode().hex()
+
+
+def decode_cursor(token):
+    try:
+        return signing.loads(bytes.fromhex(token).decode(), salt='core.pagination')
+    except (ValueError, signing.BadSignature):
+        raise InvalidCursor('Invalid cursor')
+
+
+def estimated_count(queryset, timeout=300, version=None):
+    """Row count that is cheap to repeat.
+
+    Unfiltered querysets on PostgreSQL and MySQL read the planner's table
+    statistics. Anything else is counted once and cached for `timeout`
+    seconds under a key derived from the SQL and `version`; callers that
+    track changes can pass a new version to get a fresh count.
+    """
+    statistics_sql = {
+        'postgresql': 'SELECT reltuples FROM pg_class WHERE relname = %s',
+        'mysql': (
+            'SELECT TABLE_ROWS FROM information_schema.TABLES '
+            'WHERE TABLE_SCHEMA = DATABASE() AND TABLE_NAME = %s'
+        ),
+    }.get(connection.vendor)
+    if statistics_sql and not queryset.query.where and not queryset.query.distinct:
+        with connection.cursor() as cursor:
+            cursor.execute(statistics_sql, [queryset.model._meta.db_table])
+            row = cursor.fetchone()
+        # Statistics are missing or unreliable for small, never-analyzed tables
+        if row and row[0] and row[0] > 1000:
+            return int(row[0])
+
+    queryset = queryset.order_by()
+    sql, params = queryset.query.sql_with_params()
+    key = 'pagination:count:' + hashlib.md5(f'{sql}{params}{version}'.encode()).hexdigest()
+    count = cache.get(key)
+    if count is None:
+        count = queryset.count()
+        cache.set(key, count, timeout)
+    return count
+
+
+class KeysetPage:
+    def __init__(self, object_list, next_cursor, previous_cursor):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    @property
+    def has_next(self):
+        return self.next_cursor is not None
+
+    @property
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __len__(self):
+        return len(self.object_list)
+
+
+class KeysetPaginator:
+    """Paginates a queryset by seeking past the last row of the previous page.
+
+    `ordering` lists the sort fields, '-' for descending, and must end in a
+    unique field so rows with equal sort values keep a stable order. Each
+    page is one indexed range query of per_page + 1 rows however deep it
+    is, unlike OFFSET which reads and discards every earlier row. Cursors
+    are signed, so clients treat them as opaque tokens.
+    """
+
+    def __init__(self, queryset, per_page, ordering=('-created_at', '-id')):
+        self.queryset = queryset
+        self.per_page = per_page
+        self.ordering = tuple(ordering)
+        self.fields = [field.lstrip('-') for field in self.ordering]
+
+    def _position(self, obj):
+        return [getattr(obj, field) for field in self.fields]
+
+    def _to_python(self, field, value):
+        try:
+            return self.queryset.model._meta.get_field(field).to_python(value)
+        except FieldDoesNotExist:
+            # Annotations are stored as plain JSON values
+            return value
+
+    def _seek(self, position, reverse):
+        """Rows strictly after position in this ordering (before it when reverse)"""
+        condition = Q()
+        for index in range(len(self.fields) - 1, -1, -1):
+            field = self.fields[index]
+            descending = self.ordering[index].startswith('-') != reverse
+            step = Q(**{f'{field}__{"lt" if descending else "gt"}': position[index]})
+            if index < len(self.fields) - 1:
+                step |= Q(**{field: position[index]}) & condition
+            condition = step
+        return condition
+
+    def encode(self, obj, direction):
+        values = [
+            value.isoformat() if hasattr(value, 'isoformat') else
+            str(value) if not isinstance(value, (int, float, str, type(None))) else value
+            for value in self._position(obj)
+        ]
+        return encode_cursor({'p': values, 'd': direction})
+
+    def page(self, cursor=None):
+        """The page after (or before) the cursor; the first page without one"""
+        direction = 'next'
+        queryset = self.queryset.order_by(*self.ordering)
+        if cursor:
+            data = decode_cursor(cursor)
+            try:
+                direction = data['d']
+                position = [self._to_python(field, value) for field, value in zip(self.fields, data['p'])]
+            except (KeyError, TypeError, ValidationError):
+                raise InvalidCursor('Invalid cursor')
+            if len(position) != len(self.fields) or direction not in ('next', 'previous'):
+                raise InvalidCursor('Invalid cursor')
+            if direction == 'previous':
+                reversed_ordering = [
+                    field[1:] if field.startswith('-') else f'-{field}' for field in self.ordering
+                ]
+                queryset = self.queryset.order_by(*reversed_ordering)
+            queryset = queryset.filter(self._seek(position, reverse=direction == 'previous'))
+
+        rows = list(queryset[:self.per_page + 1])
+        has_more = len(rows) > self.per_page
+        rows = rows[:self.per_page]
+        if direction == 'previous':
+            rows.reverse()
+
+        if not rows:
+            return KeysetPage([], None, None)
+        if direction == 'next':
+            has_next, has_previous = has_more, bool(cursor)
+        else:
+            has_next, has_previous = True, has_more
+        return KeysetPage(
+            rows,
+            self.encode(rows[-1], 'next') if has_next else None,
+            self.encode(rows[0], 'previous') if has_previous else None
+        )
+
+
+class KeysetPagination(BasePagination):
+    """DRF pagination over KeysetPaginator with an estimated total count"""
+
+    page_size = 10
+    max_page_size = 100
+    cursor_query_param = 'cursor'
+    page_size_query_param = 'page_size'
+    ordering = ('-created_at', '-id')
+
+    def get_page_size(self, request):
+        try:
+            size = int(request.query_params.get(self.page_size_query_param, self.page_size))
+        except (TypeError, ValueError):
+            return self.page_size
+        return max(1, min(size, self.max_page_size))
+
+    def paginate_queryset(self, queryset, request, view=None):
+        self.request = request
+        paginator = KeysetPaginator(
+            queryset,
+            self.get_page_size(request),
+            getattr(view, 'keyset_ordering', self.ordering)
+        )
+        try:
+            self.page = paginator.page(request.query_params.get(self.cursor_query_param))
+        except InvalidCursor as e:
+            raise NotFound(str(e))
+        self.count = estimated_count(queryset)
+        return self.page.object_list
+
+    def _link(self, cursor):
+        if cursor is None:
+            return None
+        url = self.request.build_absolute_uri()
+        return replace_query_param(url, self.cursor_query_param, cursor)
+
+    def get_paginated_response(self, data):
+        return Response({
+            'count': self.count,
+            'next': self._link(self.page.next_cursor),
+            'previous': self._link(self.page.previous_cursor),
+            'results': data
+        })
+
+    def get_paginated_response_schema(self, schema):
+        return {
+            'type': 'object',
+            'required': ['results'],
+            'properties': {
+                'count': {'type': 'integer', 'description': 'Estimated total'},
+                'next': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'previous': {'type': 'string', 'nullable': True, 'format': 'uri'},
+                'results': schema,
+            },
+        }
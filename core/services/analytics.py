@@ -80,8 +80,7 @@ class AnalyticsService:
     def get_app_performance_metrics():
         """Track app performance and success rates"""
         top_apps = AppListing.objects.annotate(
-            total_investment=Sum('investment__amount_paid'),
-            investor_count=Count('investment__investor', distinct=True)
+            total_investment=F('raised_amount')
         ).order_by('-total_investment')[:5]
         
         # Convert Decimal values to float
@@ -0,0 +1,152 @@
+from collections import defaultdict
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.db import close_old_connections
+from django.dispatch import receiver
+import atexit
+import os
+import queue
+import threading
+import time
+import logging
+
+logger = logging.getLogger('core.audit')
+
+
+class AuditLogSink:
+    """Buffers audit log entries and writes them in batches off the request path.
+
+    Entries are unsaved model instances. Requests put them on a bounded
+    in-process queue and a daemon thread saves them with bulk_create every
+    AUDIT_LOG_FLUSH_INTERVAL seconds or AUDIT_LOG_BATCH_SIZE entries. When
+    the queue is full a request waits at most AUDIT_LOG_ENQUEUE_TIMEOUT
+    seconds, then the entry is dropped and counted. Entries submitted with
+    sync=True are saved immediately.
+    """
+
+    def __init__(self):
+        self.async_enabled = getattr(settings, 'AUDIT_LOG_ASYNC', True)
+        self.max_queue_size = getattr(settings, 'AUDIT_LOG_QUEUE_SIZE', 10000)
+        self.batch_size = getattr(settings, 'AUDIT_LOG_BATCH_SIZE', 500)
+        self.flush_interval = getattr(settings, 'AUDIT_LOG_FLUSH_INTERVAL', 2)
+        self.enqueue_timeout = getattr(settings, 'AUDIT_LOG_ENQUEUE_TIMEOUT', 0.01)
+        self._lock = threading.Lock()
+        self._queue = queue.Queue(maxsize=self.max_queue_size)
+        self._writer = None
+        self._pid = None
+        self._counters = defaultdict(int)
+        self._dropped_by_type = defaultdict(int)
+        atexit.register(self.flush)
+
+    def _count(self, counter, amount=1):
+        with self._lock:
+            self._counters[counter] += amount
+
+    def submit(self, entry, sync=False):
+        """Queue an entry for writing; returns False if it was dropped"""
+        if sync or not self.async_enabled:
+            self._write([entry])
+            return True
+
+        self._ensure_writer()
+        try:
+            if self.enqueue_timeout:
+                self._queue.put(entry, timeout=self.enqueue_timeout)
+            else:
+                self._queue.put_nowait(entry)
+        except queue.Full:
+            with self._lock:
+                self._counters['dropped'] += 1
+                self._dropped_by_type[getattr(entry, 'event_type', None)] += 1
+                dropped = self._counters['dropped']
+            if dropped == 1 or dropped % 1000 == 0:
+                logger.warning(f"Audit log queue full, {dropped} entries dropped so far")
+            return False
+
+        self._count('enqueued')
+        return True
+
+    def _ensure_writer(self):
+        if self._pid == os.getpid() and self._writer is not None and self._writer.is_alive():
+            return
+        with self._lock:
+            if self._pid != os.getpid():
+                # Forked worker: the inherited queue belongs to the parent
+                self._queue = queue.Queue(maxsize=self.max_queue_size)
+                self._pid = os.getpid()
+                self._writer = None
+            if self._writer is None or not self._writer.is_alive():
+                self._writer = threading.Thread(
+                    target=self._run, name='audit-log-writer', daemon=True
+                )
+                self._writer.start()
+
+    def _run(self):
+        while True:
+            batch = self._collect()
+            if batch:
+                self._write(batch)
+
+    def _collect(self):
+        """Wait for up to batch_size entries or flush_interval seconds"""
+        batch = [self._queue.get()]
+        deadline = time.monotonic() + self.flush_interval
+        while len(batch) < self.batch_size:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                break
+            try:
+                batch.append(self._queue.get(timeout=remaining))
+            except queue.Empty:
+                break
+        return batch
+
+    def _write(self, entries):
+        by_model = defaultdict(list)
+        for entry in entries:
+            by_model[type(entry)].append(entry)
+        try:
+            for model, model_entries in by_model.items():
+                model.objects.bulk_create(model_entries, batch_size=self.batch_size)
+                self._count('written', len(model_entries))
+        except Exception as e:
+            self._count('failed', len(entries))
+            logger.error(f"Error writing {len(entries)} audit log entries: {str(e)}")
+        finally:
+            if threading.current_thread() is self._writer:
+                close_old_connections()
+
+    def flush(self):
+        """Write every queued entry from the calling thread"""
+        batch = []
+        while True:
+            try:
+                batch.append(self._queue.get_nowait())
+            except queue.Empty:
+                break
+            if len(batch) >= self.batch_size:
+                self._write(batch)
+                batch = []
+        if batch:
+            self._write(batch)
+
+    def stats(self):
+        with self._lock:
+            return {
+                'enqueued': self._counters['enqueued'],
+                'written': self._counters['written'],
+                'failed': self._counters['failed'],
+                'dropped': self._counters['dropped'],
+                'dropped_by_type': dict(self._dropped_by_type),
+                'queue_size': self._queue.qsize(),
+                'queue_capacity': self.max_queue_size,
+            }
+
+
+audit_sink = AuditLogSink()
+
+
+@receiver(setting_changed)
+def update_audit_sink(sender, setting, value, **kwargs):
+    if setting == 'AUDIT_LOG_ASYNC':
+        audit_sink.async_enabled = True if value is None else value
@@ -0,0 +1,181 @@
+from bisect import insort
+from django.core.cache import cache
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def normalize(text):
+    return ' '.join((text or '').lower().split())
+
+
+class TrieNode:
+    __slots__ = ('children', 'top')
+
+    def __init__(self):
+        self.children = {}
+        self.top = []
+
+
+class SuggestionTrie:
+    """Prefix trie whose nodes keep their TOP_K best entries.
+
+    Every entry is reachable from the start of its text and from the start
+    of each later word, so "arm" finds "Robot Arm". A lookup walks one
+    node per prefix character and reads the precomputed ranking there.
+    """
+
+    TOP_K = 10
+    MAX_DEPTH = 30
+
+    def __init__(self, entries=()):
+        self.root = TrieNode()
+        self.size = 0
+        for text, kind, score in entries:
+            self.add(text, kind, score)
+
+    def add(self, text, kind, score):
+        normalized = normalize(text)
+        if not normalized:
+            return
+        entry = (-score, text, kind)
+        starts = [0] + [match.end() for match in re.finditer(r'\s+', normalized)]
+        for start in starts:
+            node = self.root
+            for char in normalized[start:start + self.MAX_DEPTH]:
+                node = node.children.setdefault(char, TrieNode())
+                if entry in node.top:
+                    continue
+                if len(node.top) < self.TOP_K or entry < node.top[-1]:
+                    insort(node.top, entry)
+                    del node.top[self.TOP_K:]
+        self.size += 1
+
+    def lookup(self, prefix, limit=5):
+        node = self.root
+        for char in normalize(prefix)[:self.MAX_DEPTH]:
+            node = node.children.get(char)
+            if node is None:
+                return []
+        return [
+            {'text': text, 'type': kind, 'score': -negative_score}
+            for negative_score, text, kind in node.top[:limit]
+        ]
+
+
+class AutocompleteService:
+    """Search suggestions from app names, categories and popular queries.
+
+    The suggestion list is built from the database once and shared through
+    the cache as a snapshot. Each process builds its own trie from the
+    snapshot and checks the snapshot version at most every SYNC_INTERVAL
+    seconds, so a lookup normally touches no database and no cache.
+    Listing changes invalidate the snapshot; the next process to notice
+    rebuilds it while the others keep serving their current trie.
+    """
+
+    SNAPSHOT_KEY = 'autocomplete:snapshot'
+    VERSION_KEY = 'autocomplete:version'
+    BUILD_LOCK_KEY = 'autocomplete:building'
+    SYNC_INTERVAL = 5
+    BUILD_LOCK_TIMEOUT = 60
+    POPULAR_QUERY_LIMIT = 200
+    # Listing fields that add or remove suggestions; score-only changes
+    # (investor and view counts) wait for the periodic refresh
+    SOURCE_FIELDS = frozenset({'name', 'category', 'status'})
+
+    _lock = threading.Lock()
+    _trie = None
+    _version = None
+    _checked_at = 0
+
+    @classmethod
+    def build_entries(cls, popular_queries=None):
+        """(text, type, score) tuples; popular_queries is an iterable of (query, count)
+
+        Defaults to the currently trending searches.
+        """
+        from django.db.models import Count
+        from ..models import AppListing
+        from .search import SEARCHABLE_STATUSES
+        from .search_trends import search_trends
+
+        if popular_queries is None:
+            popular_queries = search_trends.trending(cls.POPULAR_QUERY_LIMIT)
+
+        listed = AppListing.objects.filter(status__in=SEARCHABLE_STATUSES)
+        entries = [
+            (name, 'app', investor_count * 10 + view_count)
+            for name, investor_count, view_count in listed.values_list('name', 'investor_count', 'view_count')
+        ]
+        entries += [
+            (row['category'], 'category', row['count'])
+            for row in listed.values('category').annotate(count=Count('id'))
+        ]
+        entries += [(query, 'query', int(count)) for query, count in popular_queries]
+        return entries
+
+    @classmethod
+    def publish_snapshot(cls, popular_queries=None):
+        """Rebuild the shared snapshot from the database"""
+        started = time.perf_counter()
+        entries = cls.build_entries(popular_queries)
+        version = time.time_ns()
+        cache.set(cls.SNAPSHOT_KEY, {'version': version, 'entries': entries}, timeout=None)
+        cache.set(cls.VERSION_KEY, version, timeout=None)
+        logger.info(
+            f"Published autocomplete snapshot: {len(entries)} entries in "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+        return version
+
+    @classmethod
+    def invalidate(cls):
+        cache.delete(cls.SNAPSHOT_KEY)
+        cache.set(cls.VERSION_KEY, None, timeout=None)
+
+    @classmethod
+    def _load(cls):
+        snapshot = cache.get(cls.SNAPSHOT_KEY)
+        if snapshot is None:
+            building = cache.add(cls.BUILD_LOCK_KEY, True, cls.BUILD_LOCK_TIMEOUT)
+            if not building and cls._trie is not None:
+                # Another process is rebuilding; keep serving the current trie
+                return
+            try:
+                cls.publish_snapshot()
+            finally:
+                if building:
+                    cache.delete(cls.BUILD_LOCK_KEY)
+            snapshot = cache.get(cls.SNAPSHOT_KEY)
+        if snapshot and snapshot['version'] != cls._version:
+            cls._trie = SuggestionTrie(snapshot['entries'])
+            cls._version = snapshot['version']
+
+    @classmethod
+    def get_trie(cls):
+        now = time.monotonic()
+        if cls._trie is not None and now - cls._checked_at < cls.SYNC_INTERVAL:
+            return cls._trie
+        with cls._lock:
+            if cls._trie is None or now - cls._checked_at >= cls.SYNC_INTERVAL:
+                if cls._trie is None or cache.get(cls.VERSION_KEY) != cls._version:
+                    cls._load()
+                cls._checked_at = now
+        return cls._trie
+
+    @classmethod
+    def suggest(cls, prefix, limit=5):
+        trie = cls.get_trie()
+        return trie.lookup(prefix, limit) if trie is not None else []
+
+    @classmethod
+    def reset(cls):
+        """Forget this process's trie (tests and settings changes)"""
+        with cls._lock:
+            cls._trie = None
+            cls._version = None
+            cls._checked_at = 0
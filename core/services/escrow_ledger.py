@@ -0,0 +1,188 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Max, OuterRef, Subquery, Sum, Value
+from django.db.models.functions import Coalesce
+from django.utils import timezone
+from ..models import AppListing, EscrowTransaction
+from ..models.escrow_ledger import EscrowBalanceSnapshot, EscrowLedgerEntry
+import logging
+
+logger = logging.getLogger(__name__)
+
+ZERO = Decimal('0.00')
+
+
+class EscrowLedger:
+    """Escrow totals kept as an append-only ledger with periodic snapshots.
+
+    Signals on EscrowTransaction (see core.signals) append an entry for
+    every change in what a transaction contributes to its app's totals;
+    bulk writers call record() themselves. snapshot() rolls new entries
+    into per-app EscrowBalanceSnapshot rows, and balances are read as the
+    latest snapshot plus the entries after it. verify() checks both
+    against the EscrowTransaction rows they are derived from.
+    """
+
+    # Entries younger than this are left for the next snapshot, so one
+    # whose transaction commits late, behind a higher id, is not skipped
+    SNAPSHOT_LAG = timedelta(minutes=5)
+    RELEASE_TYPES = (EscrowTransaction.Type.RELEASE, EscrowTransaction.Type.MILESTONE_RELEASE)
+
+    @classmethod
+    def contribution(cls, transaction_type, status, amount):
+        """(received, released) a transaction adds to its app's escrow totals"""
+        if status != EscrowTransaction.Status.COMPLETED or amount is None:
+            return ZERO, ZERO
+        if transaction_type == EscrowTransaction.Type.DEPOSIT:
+            return Decimal(amount), ZERO
+        if transaction_type in cls.RELEASE_TYPES:
+            return ZERO, Decimal(amount)
+        return ZERO, ZERO
+
+    @classmethod
+    def record(cls, app_id, received=ZERO, released=ZERO, escrow_transaction_id=None):
+        if not received and not released:
+            return None
+        return EscrowLedgerEntry.objects.create(
+            app_id=app_id,
+            escrow_transaction_id=escrow_transaction_id,
+            received=received,
+            released=released
+        )
+
+    @classmethod
+    def record_change(cls, app_id, escrow_transaction_id, before=None, after=None):
+        """Append the difference between two (type, status, amount) states of a transaction"""
+        received_before, released_before = cls.contribution(*before) if before else (ZERO, ZERO)
+        received_after, released_after = cls.contribution(*after) if after else (ZERO, ZERO)
+        return cls.record(
+            app_id,
+            received=received_after - received_before,
+            released=released_after - released_before,
+            escrow_transaction_id=escrow_transaction_id
+        )
+
+    @staticmethod
+    def balance(app):
+        """{'total_received', 'total_released'} for an app"""
+        return {
+            'total_received': app.total_received,
+            'total_released': app.total_released
+        }
+
+    @classmethod
+    def snapshot(cls, now=None):
+        """Snapshot every app with ledger entries since its latest snapshot.
+
+        Returns the number of snapshots written.
+        """
+        cutoff = (now or timezone.now()) - cls.SNAPSHOT_LAG
+        cutoff_id = EscrowLedgerEntry.objects.filter(created_at__lte=cutoff).aggregate(last=Max('id'))['last']
+        if cutoff_id is None:
+            return 0
+
+        latest = EscrowBalanceSnapshot.objects.filter(app=OuterRef('app')).order_by('-id')
+        deltas = EscrowLedgerEntry.objects.filter(
+            id__lte=cutoff_id,
+            id__gt=Coalesce(Subquery(latest.values('last_entry_id')[:1]), Value(0))
+        ).order_by().values('app').annotate(received=Sum('received'), released=Sum('released'))
+        deltas = {delta['app']: delta for delta in deltas}
+        if not deltas:
+            return 0
+
+        previous = {
+            snapshot.app_id: snapshot for snapshot in EscrowBalanceSnapshot.objects.filter(
+                id__in=EscrowBalanceSnapshot.objects.filter(app_id__in=deltas).order_by().values(
+                    'app'
+                ).annotate(latest=Max('id')).values('latest')
+            )
+        }
+        snapshots = []
+        for app_id, delta in deltas.items():
+            snapshot = previous.get(app_id)
+            snapshots.append(EscrowBalanceSnapshot(
+                app_id=app_id,
+                last_entry_id=cutoff_id,
+                total_received=(snapshot.total_received if snapshot else ZERO) + delta['received'],
+                total_released=(snapshot.total_released if snapshot else ZERO) + delta['released']
+            ))
+        EscrowBalanceSnapshot.objects.bulk_create(snapshots)
+        logger.info(f"Wrote {len(snapshots)} escrow balance snapshots up to ledger entry {cutoff_id}")
+        return len(snapshots)
+
+    @classmethod
+    def transaction_totals(cls, app_id):
+        """(received, released) aggregated from the app's EscrowTransaction rows"""
+        completed = EscrowTransaction.objects.filter(app_id=app_id, status=EscrowTransaction.Status.COMPLETED)
+        received = completed.filter(
+            transaction_type=EscrowTransaction.Type.DEPOSIT
+        ).aggregate(total=Sum('amount'))['total'] or ZERO
+        released = completed.filter(
+            transaction_type__in=cls.RELEASE_TYPES
+        ).aggregate(total=Sum('amount'))['total'] or ZERO
+        return received, released
+
+    @classmethod
+    def verify(cls, app_ids=None, repair=False):
+        """Check the ledger and snapshots of each app against its transactions.
+
+        Every snapshot must equal the sum of the app's ledger entries up to
+        its last_entry_id, and the sum of all entries must equal the totals
+        aggregated from EscrowTransaction. Returns the discrepancies found.
+        With repair, snapshots from the first wrong one on are deleted and a
+        correcting entry is appended for ledger drift.
+        """
+        if app_ids is None:
+            app_ids = AppListing.objects.order_by('pk').values_list('pk', flat=True)
+
+        problems = []
+        for app_id in app_ids:
+            snapshots = list(EscrowBalanceSnapshot.objects.filter(app_id=app_id).order_by('last_entry_id', 'id'))
+            received = released = ZERO
+            bad_snapshot = None
+            index = 0
+            entries = EscrowLedgerEntry.objects.filter(app_id=app_id).order_by('id').values_list(
+                'id', 'received', 'released'
+            )
+            for entry_id, entry_received, entry_released in entries.iterator():
+                while index < len(snapshots) and snapshots[index].last_entry_id < entry_id:
+                    bad_snapshot = bad_snapshot or cls._check_snapshot(snapshots[index], received, released, problems)
+                    index += 1
+                received += entry_received
+                released += entry_released
+            for snapshot in snapshots[index:]:
+                bad_snapshot = bad_snapshot or cls._check_snapshot(snapshot, received, released, problems)
+
+            expected = cls.transaction_totals(app_id)
+            if (received, released) != expected:
+                problems.append({
+                    'app_id': app_id,
+                    'kind': 'ledger',
+                    'expected': expected,
+                    'actual': (received, released)
+                })
+
+            if repair and (bad_snapshot or (received, released) != expected):
+                with transaction.atomic():
+                    if bad_snapshot:
+                        EscrowBalanceSnapshot.objects.filter(
+                            app_id=app_id,
+                            last_entry_id__gte=bad_snapshot.last_entry_id
+                        ).delete()
+                    cls.record(app_id, received=expected[0] - received, released=expected[1] - released)
+        return problems
+
+    @staticmethod
+    def _check_snapshot(snapshot, received, released, problems):
+        """The snapshot if its totals differ from the ledger sums before it"""
+        if (snapshot.total_received, snapshot.total_released) == (received, released):
+            return None
+        problems.append({
+            'app_id': snapshot.app_id,
+            'kind': 'snapshot',
+            'snapshot_id': snapshot.id,
+            'expected': (received, released),
+            'actual': (snapshot.total_received, snapshot.total_released)
+        })
+        return snapshot
@@ -0,0 +1,227 @@
+from collections import OrderedDict
+from decimal import Decimal, InvalidOperation
+from django.conf import settings
+from django.core.cache import cache
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils import timezone
+import threading
+import time
+import logging
+import requests
+
+logger = logging.getLogger(__name__)
+
+
+class LocalLRUCache:
+    """Small thread-safe in-process LRU cache with a per-entry TTL"""
+
+    def __init__(self, maxsize=256, ttl=60):
+        self.maxsize = maxsize
+        self.ttl = ttl
+        self._data = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._data.get(key)
+            if entry is None:
+                return None
+            value, expires_at = entry
+            if expires_at < time.monotonic():
+                del self._data[key]
+                return None
+            self._data.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._data[key] = (value, time.monotonic() + self.ttl)
+            self._data.move_to_end(key)
+            while len(self._data) > self.maxsize:
+                self._data.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._data.clear()
+
+
+class RateSnapshot:
+    """An immutable set of rates, quoted as units of each currency per USD.
+
+    All conversions made through one snapshot use the same rates, so a
+    page that converts many amounts shows figures that agree with each other.
+    """
+
+    def __init__(self, rates, version, source='settings'):
+        self.rates = rates
+        self.version = version
+        self.source = source
+
+    def get_rate(self, from_currency, to_currency):
+        """Get the rate from one currency to another via USD cross rates"""
+        from_currency = from_currency.upper()
+        to_currency = to_currency.upper()
+        if from_currency == to_currency:
+            return Decimal('1')
+
+        key = (self.version, from_currency, to_currency)
+        rate = ExchangeRateService.local_cache.get(key)
+        if rate is None:
+            try:
+                rate = self.rates[to_currency] / self.rates[from_currency]
+            except KeyError:
+                raise ValueError(
+                    f"Conversion from {from_currency} to {to_currency} not supported"
+                )
+            ExchangeRateService.local_cache.set(key, rate)
+        return rate
+
+    def convert(self, amount, from_currency, to_currency):
+        """Convert an amount, returning None for a missing amount"""
+        if amount is None:
+            return None
+        return Decimal(str(amount)) * self.get_rate(from_currency, to_currency)
+
+    def convert_many(self, amounts, from_currency, to_currency):
+        """Convert a sequence of amounts with a single rate lookup"""
+        rate = self.get_rate(from_currency, to_currency)
+        return [
+            None if amount is None else Decimal(str(amount)) * rate
+            for amount in amounts
+        ]
+
+    def as_dict(self):
+        return {currency: str(rate) for currency, rate in self.rates.items()}
+
+
+class ExchangeRateService:
+    """Exchange rates served from an in-process LRU backed by the shared cache.
+
+    The refresh_exchange_rates Celery task fetches rates from the configured
+    provider and publishes them to the shared cache. Request paths only read
+    the two cache tiers and fall back to the rates in settings, so they never
+    wait on the provider.
+    """
+
+    CACHE_KEY = 'exchange_rates:usd'
+    SNAPSHOT_KEY = 'snapshot'
+    REQUEST_ATTR = '_exchange_rate_snapshot'
+    LOCAL_TTL = 60  # Seconds before re-reading the shared cache
+    CACHE_TIMEOUT = 60 * 60 * 24 * 2  # Survives a missed daily refresh
+    PROVIDER_TIMEOUT = 10
+
+    local_cache = LocalLRUCache(maxsize=512, ttl=LOCAL_TTL)
+
+    @staticmethod
+    def _parse_rates(raw_rates):
+        rates = {}
+        for currency, rate in raw_rates.items():
+            try:
+                rate = Decimal(str(rate))
+            except (InvalidOperation, TypeError, ValueError):
+                continue
+            if rate > 0:
+                rates[currency.upper()] = rate
+        rates['USD'] = Decimal('1')
+        return rates
+
+    @classmethod
+    def get_default_rates(cls):
+        """Get the fallback rates configured in settings"""
+        rates = dict(getattr(settings, 'EXCHANGE_RATES', {}))
+        rates['NGN'] = settings.USD_TO_NGN_RATE
+        return cls._parse_rates(rates)
+
+    @classmethod
+    def get_snapshot(cls, request=None):
+        """Get the current rate snapshot, pinned to the request if one is given"""
+        if request is not None:
+            snapshot = getattr(request, cls.REQUEST_ATTR, None)
+            if snapshot is None:
+                snapshot = cls.get_snapshot()
+                setattr(request, cls.REQUEST_ATTR, snapshot)
+            return snapshot
+
+        snapshot = cls.local_cache.get(cls.SNAPSHOT_KEY)
+        if snapshot is not None:
+            return snapshot
+
+        try:
+            cached = cache.get(cls.CACHE_KEY)
+        except Exception as e:
+            logger.warning(f"Exchange rate cache unavailable: {e}")
+            cached = None
+
+        if cached:
+            snapshot = RateSnapshot(
+                cls._parse_rates(cached['rates']),
+                version=cached['version'],
+                source=cached.get('source', 'provider')
+            )
+        else:
+            snapshot = RateSnapshot(cls.get_default_rates(), version='settings')
+        cls.local_cache.set(cls.SNAPSHOT_KEY, snapshot)
+        return snapshot
+
+    @classmethod
+    def get_rate(cls, from_currency, to_currency, request=None):
+        return cls.get_snapshot(request).get_rate(from_currency, to_currency)
+
+    @classmethod
+    def convert(cls, amount, from_currency, to_currency, request=None):
+        return cls.get_snapshot(request).convert(amount, from_currency, to_currency)
+
+    @classmethod
+    def convert_many(cls, amounts, from_currency, to_currency, request=None):
+        return cls.get_snapshot(request).convert_many(amounts, from_currency, to_currency)
+
+    @classmethod
+    def fetch_rates(cls):
+        """Fetch USD-based rates from the provider, or None if not configured"""
+        url = getattr(settings, 'EXCHANGE_RATE_API_URL', None)
+        if not url:
+            return None
+        response = requests.get(url, timeout=cls.PROVIDER_TIMEOUT)
+        response.raise_for_status()
+        return response.json().get('rates') or None
+
+    @classmethod
+    def refresh_rates(cls):
+        """Publish fresh rates to the shared cache.
+
+        Currencies the provider does not quote keep their settings rate.
+        Returns the published snapshot.
+        """
+        rates = cls.get_default_rates()
+        source = 'settings'
+        try:
+            fetched = cls.fetch_rates()
+        except Exception as e:
+            logger.error(f"Error fetching exchange rates: {e}")
+            fetched = None
+        if fetched:
+            rates.update(cls._parse_rates(fetched))
+            source = 'provider'
+
+        snapshot = RateSnapshot(rates, version=timezone.now().isoformat(), source=source)
+        cache.set(cls.CACHE_KEY, {
+            'rates': snapshot.as_dict(),
+            'version': snapshot.version,
+            'source': source,
+        }, cls.CACHE_TIMEOUT)
+        cls.local_cache.clear()
+        logger.info(f"Published {len(rates)} exchange rates from {source}")
+        return snapshot
+
+    @classmethod
+    def clear(cls):
+        """Drop both cache tiers so the next lookup re-reads the rates"""
+        cache.delete(cls.CACHE_KEY)
+        cls.local_cache.clear()
+
+
+@receiver(setting_changed)
+def reset_exchange_rates(sender, setting, **kwargs):
+    if setting in ('USD_TO_NGN_RATE', 'EXCHANGE_RATES', 'EXCHANGE_RATE_API_URL'):
+        ExchangeRateService.clear()
@@ -0,0 +1,91 @@
+from bisect import bisect_right
+from django.conf import settings
+import csv
+import ipaddress
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class IPCountryTable:
+    """Offline IP-to-country lookup over sorted, non-overlapping ranges.
+
+    Loaded from a CSV file with one "network,country_code" row per CIDR
+    block (e.g. "102.88.0.0/16,NG"). Lookups are a binary search over the
+    range starts, so they cost microseconds and never touch the network.
+    """
+
+    def __init__(self, rows=()):
+        ranges = {4: [], 6: []}
+        for network, country in rows:
+            try:
+                network = ipaddress.ip_network(network.strip(), strict=False)
+            except ValueError:
+                logger.warning(f"Skipping invalid network in IP table: {network}")
+                continue
+            ranges[network.version].append((
+                int(network.network_address),
+                int(network.broadcast_address),
+                country.strip().upper()
+            ))
+
+        self._starts = {}
+        self._ranges = {}
+        for version, version_ranges in ranges.items():
+            version_ranges.sort()
+            self._ranges[version] = version_ranges
+            self._starts[version] = [start for start, _, _ in version_ranges]
+
+    def __len__(self):
+        return sum(len(ranges) for ranges in self._ranges.values())
+
+    @classmethod
+    def from_csv(cls, path):
+        with open(path, newline='') as f:
+            rows = [
+                (row[0], row[1]) for row in csv.reader(f)
+                if len(row) >= 2 and row[0] and not row[0].startswith('#')
+            ]
+        return cls(rows)
+
+    def lookup(self, ip):
+        """Get the country code for an IP address, or None if unknown"""
+        try:
+            address = ipaddress.ip_address(ip.strip())
+        except (AttributeError, ValueError):
+            return None
+
+        value = int(address)
+        index = bisect_right(self._starts[address.version], value) - 1
+        if index < 0:
+            return None
+        start, end, country = self._ranges[address.version][index]
+        return country if value <= end else None
+
+
+_table = None
+_table_lock = threading.Lock()
+
+
+def get_ip_country_table():
+    """Get the process-wide IP table, loading it on first use"""
+    global _table
+    if _table is None:
+        with _table_lock:
+            if _table is None:
+                path = getattr(settings, 'GEOIP_CIDR_TABLE', None)
+                try:
+                    _table = IPCountryTable.from_csv(path) if path else IPCountryTable()
+                except OSError as e:
+                    logger.warning(f"IP country table unavailable ({e}), using async lookups only")
+                    _table = IPCountryTable()
+                else:
+                    logger.info(f"Loaded {len(_table)} IP ranges from {path}")
+    return _table
+
+
+def reset_ip_country_table():
+    global _table
+    with _table_lock:
+        _table = None
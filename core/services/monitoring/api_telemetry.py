@@ -0,0 +1,238 @@
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections, transaction
+from django.db.models import Sum, Max
+from django.utils import timezone
+from datetime import timedelta
+from .histogram import LatencyHistogram
+import atexit
+import random
+import threading
+import time
+import logging
+
+logger = logging.getLogger('core.api.monitoring')
+
+
+class EndpointStats:
+    """In-memory totals for one endpoint and method within one minute"""
+
+    def __init__(self):
+        self.request_count = 0
+        self.error_count = 0
+        self.status_counts = {}
+        self.latency = LatencyHistogram()
+
+    def record(self, status_code, response_time_ms, is_error):
+        self.request_count += 1
+        if is_error:
+            self.error_count += 1
+        status = str(status_code)
+        self.status_counts[status] = self.status_counts.get(status, 0) + 1
+        self.latency.record(response_time_ms / 1000)
+
+
+class APITelemetryCollector:
+    """Aggregates API traffic in memory and flushes minute rollups.
+
+    Requests only update in-process counters. Every FLUSH_INTERVAL seconds
+    a background thread merges them into APIRequestRollup rows, and
+    whatever is still buffered is written when the process exits. Raw
+    APIRequest rows are kept for a sample of successful requests
+    (API_TELEMETRY_SAMPLE_RATE) and for every error. Rollups older than
+    API_TELEMETRY_RETENTION_DAYS are deleted by prune().
+    """
+
+    FLUSH_INTERVAL = 60
+    MAX_RECENT_ERRORS = 50
+    ERROR_STATS_TIMEOUT = 3600
+    PRUNE_CHUNK_SIZE = 1000
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._next_flush = time.monotonic() + self.FLUSH_INTERVAL
+        self._flushing = False
+        self._reset()
+        # The flush thread is a daemon, so buffered data would die with the worker
+        atexit.register(self._background_flush)
+
+    def _reset(self):
+        self._stats = {}
+        self._samples = []
+        self._errors = []
+
+    @property
+    def sample_rate(self):
+        return getattr(settings, 'API_TELEMETRY_SAMPLE_RATE', 0.01)
+
+    @staticmethod
+    def bucket_for(when):
+        return when.replace(second=0, microsecond=0)
+
+    def record(self, endpoint, method, status_code, response_time_ms, user_id=None,
+               ip_address=None, error=None):
+        """Record one API call; error is (exception, traceback) for raised errors"""
+        now = timezone.now()
+        is_error = error is not None or status_code >= 500
+        raw = None
+        if error is not None or random.random() < self.sample_rate:
+            raw = {
+                'user_id': user_id,
+                'endpoint': endpoint,
+                'method': method,
+                'response_time': response_time_ms,
+                'status_code': status_code,
+                'ip_address': ip_address,
+            }
+
+        with self._lock:
+            key = (self.bucket_for(now), endpoint, method)
+            stats = self._stats.get(key)
+            if stats is None:
+                stats = self._stats[key] = EndpointStats()
+            stats.record(status_code, response_time_ms, is_error)
+            if error is not None:
+                exception, stack_trace = error
+                self._errors.append((raw, {
+                    'type': exception.__class__.__name__,
+                    'message': str(exception),
+                    'traceback': stack_trace,
+                    'user_id': user_id,
+                    'endpoint': endpoint,
+                    'method': method,
+                    'timestamp': now,
+                }))
+            elif raw is not None:
+                self._samples.append(raw)
+
+            flush_due = not self._flushing and time.monotonic() >= self._next_flush
+            if flush_due:
+                self._flushing = True
+
+        if flush_due:
+            threading.Thread(target=self._background_flush, name='api-telemetry-flush', daemon=True).start()
+
+    def _background_flush(self):
+        try:
+            self.flush()
+        except Exception as e:
+            logger.error(f"Error flushing API telemetry: {str(e)}")
+        finally:
+            # The flush thread exits, so its connections must not be kept open
+            connections.close_all()
+
+    def flush(self):
+        """Write buffered rollups, sampled requests and errors"""
+        with self._lock:
+            stats, samples, errors = self._stats, self._samples, self._errors
+            self._reset()
+            self._next_flush = time.monotonic() + self.FLUSH_INTERVAL
+
+        try:
+            for (bucket, endpoint, method), endpoint_stats in stats.items():
+                self._store_rollup(bucket, endpoint, method, endpoint_stats)
+            self._store_samples(samples)
+            self._store_errors(errors)
+        finally:
+            with self._lock:
+                self._flushing = False
+        return len(stats)
+
+    def _store_rollup(self, bucket, endpoint, method, stats):
+        from ...models import APIRequestRollup
+
+        with transaction.atomic():
+            rollup, _ = APIRequestRollup.objects.select_for_update().get_or_create(
+                bucket=bucket, endpoint=endpoint[:255], method=method
+            )
+            rollup.request_count += stats.request_count
+            rollup.error_count += stats.error_count
+            rollup.total_response_time += stats.latency.total * 1000
+            rollup.max_response_time = max(rollup.max_response_time, stats.latency.max * 1000)
+            for status, count in stats.status_counts.items():
+                rollup.status_counts[status] = rollup.status_counts.get(status, 0) + count
+            for bucket_index, count in stats.latency.counts.items():
+                bucket_index = str(bucket_index)
+                rollup.latency_histogram[bucket_index] = rollup.latency_histogram.get(bucket_index, 0) + count
+            rollup.save()
+
+    def _store_samples(self, samples):
+        from ...models import APIRequest
+
+        if samples:
+            APIRequest.objects.bulk_create([APIRequest(**sample) for sample in samples])
+
+    def _store_errors(self, errors):
+        from ...models import APIRequest, APIError
+
+        if not errors:
+            return
+        for raw, details in errors:
+            # Saved one by one: bulk_create does not return ids on every backend
+            api_request = APIRequest.objects.create(**raw)
+            APIError.objects.create(
+                request=api_request,
+                error_type=details['type'],
+                error_message=details['message'],
+                stack_trace=details['traceback']
+            )
+
+        stats = cache.get('api_error_stats') or {'count': 0, 'types': {}, 'recent': []}
+        for _, details in errors:
+            stats['count'] += 1
+            stats['types'][details['type']] = stats['types'].get(details['type'], 0) + 1
+        stats['recent'] = (stats['recent'] + [details for _, details in errors])[-self.MAX_RECENT_ERRORS:]
+        cache.set('api_error_stats', stats, timeout=self.ERROR_STATS_TIMEOUT)
+
+    @property
+    def retention_days(self):
+        return getattr(settings, 'API_TELEMETRY_RETENTION_DAYS', 30)
+
+    def prune(self, now=None, chunk_size=PRUNE_CHUNK_SIZE):
+        """Delete rollups older than the retention period; returns the number deleted"""
+        from ...models import APIRequestRollup
+
+        cutoff = (now or timezone.now()) - timedelta(days=self.retention_days)
+        expired = APIRequestRollup.objects.filter(bucket__lt=cutoff).order_by('bucket')
+        deleted = 0
+        while True:
+            ids = list(expired.values_list('id', flat=True)[:chunk_size])
+            if not ids:
+                break
+            deleted += APIRequestRollup.objects.filter(id__in=ids).delete()[0]
+        logger.info(f"Pruned {deleted} API request rollups older than {cutoff:%Y-%m-%d %H:%M}")
+        return deleted
+
+    @staticmethod
+    def summarize(rollups):
+        """Combine a queryset of rollups into totals with latency percentiles"""
+        totals = rollups.aggregate(
+            requests=Sum('request_count'),
+            errors=Sum('error_count'),
+            response_time=Sum('total_response_time'),
+            max_response_time=Max('max_response_time')
+        )
+        latency = LatencyHistogram()
+        for histogram in rollups.values_list('latency_histogram', flat=True):
+            for bucket_index, count in histogram.items():
+                bucket_index = int(bucket_index)
+                latency.counts[bucket_index] = latency.counts.get(bucket_index, 0) + count
+                latency.count += count
+        if latency.count:
+            latency.min = 0
+            latency.max = (totals['max_response_time'] or 0) / 1000
+
+        requests = totals['requests'] or 0
+        return {
+            'requests': requests,
+            'errors': totals['errors'] or 0,
+            'error_rate': (totals['errors'] / requests * 100) if requests else 0,
+            'average_response_time': (totals['response_time'] / requests) if requests else 0,
+            'max_response_time': totals['max_response_time'] or 0,
+            'p50_response_time': latency.percentile(50) * 1000,
+            'p95_response_time': latency.percentile(95) * 1000,
+            'p99_response_time': latency.percentile(99) * 1000,
+        }
+
+
+api_telemetry = APITelemetryCollector()
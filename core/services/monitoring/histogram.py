@@ -0,0 +1,302 @@
+from django.core.cache import cache
+import math
+import os
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class LatencyHistogram:
+    """Mergeable log-bucketed latency histogram.
+
+    Bucket upper bounds grow by GROWTH from MIN_VALUE seconds, so any
+    percentile is reported within 5% of the true value while the
+    histogram stays a few hundred counters at most.
+    """
+
+    MIN_VALUE = 0.0001  # 0.1ms
+    GROWTH = 1.05
+
+    def __init__(self, counts=None, count=0, total=0.0, min_value=None, max_value=None):
+        self.counts = dict(counts or {})
+        self.count = count
+        self.total = total
+        self.min = min_value
+        self.max = max_value
+
+    @classmethod
+    def bucket_for(cls, value):
+        if value <= cls.MIN_VALUE:
+            return 0
+        return math.ceil(math.log(value / cls.MIN_VALUE) / math.log(cls.GROWTH))
+
+    @classmethod
+    def bucket_upper_bound(cls, bucket):
+        return cls.MIN_VALUE * cls.GROWTH ** bucket
+
+    def record(self, value):
+        bucket = self.bucket_for(value)
+        self.counts[bucket] = self.counts.get(bucket, 0) + 1
+        self.count += 1
+        self.total += value
+        self.min = value if self.min is None else min(self.min, value)
+        self.max = value if self.max is None else max(self.max, value)
+
+    def merge(self, other):
+        for bucket, count in other.counts.items():
+            self.counts[bucket] = self.counts.get(bucket, 0) + count
+        self.count += other.count
+        self.total += other.total
+        if other.min is not None:
+            self.min = other.min if self.min is None else min(self.min, other.min)
+        if other.max is not None:
+            self.max = other.max if self.max is None else max(self.max, other.max)
+        return self
+
+    def percentile(self, percent):
+        """Get the value below which `percent` of the recorded values fall"""
+        if not self.count:
+            return 0
+        rank = max(1, math.ceil(self.count * percent / 100))
+        seen = 0
+        for bucket in sorted(self.counts):
+            seen += self.counts[bucket]
+            if seen >= rank:
+                value = self.bucket_upper_bound(bucket)
+                return min(max(value, self.min), self.max)
+        return self.max
+
+    def summary(self):
+        if not self.count:
+            return {'avg': 0, 'max': 0, 'min': 0, 'count': 0, 'p50': 0, 'p95': 0, 'p99': 0}
+        return {
+            'avg': self.total / self.count,
+            'max': self.max,
+            'min': self.min,
+            'count': self.count,
+            'p50': self.percentile(50),
+            'p95': self.percentile(95),
+            'p99': self.percentile(99),
+        }
+
+    def to_dict(self):
+        return {
+            'counts': dict(self.counts),
+            'count': self.count,
+            'total': self.total,
+            'min': self.min,
+            'max': self.max,
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(
+            counts={int(bucket): count for bucket, count in data['counts'].items()},
+            count=data['count'],
+            total=data['total'],
+            min_value=data['min'],
+            max_value=data['max']
+        )
+
+
+class MetricsWindow:
+    """Overall and per-endpoint histograms for one time window"""
+
+    def __init__(self):
+        self.overall = LatencyHistogram()
+        self.endpoints = {}
+
+    def record(self, endpoint, seconds):
+        self.overall.record(seconds)
+        histogram = self.endpoints.get(endpoint)
+        if histogram is None:
+            histogram = self.endpoints[endpoint] = LatencyHistogram()
+        histogram.record(seconds)
+
+    def merge(self, other):
+        self.overall.merge(other.overall)
+        for endpoint, histogram in other.endpoints.items():
+            self.endpoints.setdefault(endpoint, LatencyHistogram()).merge(histogram)
+        return self
+
+    def to_dict(self):
+        return {
+            'overall': self.overall.to_dict(),
+            'endpoints': {
+                endpoint: histogram.to_dict()
+                for endpoint, histogram in self.endpoints.items()
+            },
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        window = cls()
+        window.overall = LatencyHistogram.from_dict(data['overall'])
+        window.endpoints = {
+            endpoint: LatencyHistogram.from_dict(histogram)
+            for endpoint, histogram in data['endpoints'].items()
+        }
+        return window
+
+
+class MetricsAggregator:
+    """Per-process request metrics, flushed to the shared cache in batches.
+
+    Requests only update in-memory histograms and counters. Every
+    FLUSH_INTERVAL seconds the process writes its histograms to its own
+    cache slot, which no other process writes to, and adds its counter
+    deltas with cache.incr. Readers merge the histograms of all live slots.
+    """
+
+    FLUSH_INTERVAL = 10
+    WINDOW = 3600
+    MAX_SLOTS = 64
+    MAX_ENDPOINTS = 500
+    MAX_RECENT_ERRORS = 50
+    SLOT_KEY = 'metrics:slot:{}'
+    COUNTER_TIMEOUT = 3600
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._set_process()
+        self._window_id = self._current_window_id()
+        self._current = MetricsWindow()
+        self._previous = MetricsWindow()
+        self._next_flush = time.monotonic() + self.FLUSH_INTERVAL
+        self._reset_pending()
+
+    def _set_process(self):
+        self.pid = os.getpid()
+        self.process_id = f'{self.pid}-{uuid.uuid4().hex[:8]}'
+        self._slot = None
+
+    def _reset_pending(self):
+        self._pending_counters = {}
+        self._pending_error_types = {}
+        self._pending_errors = []
+
+    def _current_window_id(self):
+        return int(time.time() // self.WINDOW)
+
+    def _roll_window(self):
+        window_id = self._current_window_id()
+        if window_id != self._window_id:
+            self._previous = self._current if window_id == self._window_id + 1 else MetricsWindow()
+            self._current = MetricsWindow()
+            self._window_id = window_id
+
+    def _count(self, counter, amount=1):
+        self._pending_counters[counter] = self._pending_counters.get(counter, 0) + amount
+
+    def record_request(self, endpoint, seconds, cache_status=None):
+        with self._lock:
+            self._roll_window()
+            if endpoint not in self._current.endpoints and \
+                    len(self._current.endpoints) >= self.MAX_ENDPOINTS:
+                endpoint = 'OTHER'
+            self._current.record(endpoint, seconds)
+            if cache_status == 'HIT':
+                self._count('cache_hits')
+            elif cache_status is not None:
+                self._count('cache_misses')
+        self.maybe_flush()
+
+    def record_hit(self):
+        with self._lock:
+            self._count('request_count')
+
+    def record_error(self, error_details):
+        with self._lock:
+            self._count('error_count')
+            error_type = error_details['type']
+            self._pending_error_types[error_type] = self._pending_error_types.get(error_type, 0) + 1
+            self._pending_errors.append(error_details)
+            del self._pending_errors[:-self.MAX_RECENT_ERRORS]
+        self.maybe_flush()
+
+    def maybe_flush(self):
+        now = time.monotonic()
+        with self._lock:
+            if now < self._next_flush:
+                return
+            self._next_flush = now + self.FLUSH_INTERVAL
+        try:
+            self.flush()
+        except Exception as e:
+            logger.warning(f"Error flushing request metrics: {e}")
+
+    def flush(self):
+        """Write this process's histograms and counter deltas to the cache"""
+        with self._lock:
+            if self.pid != os.getpid():
+                # Forked worker: claim a slot of its own
+                self._set_process()
+            self._roll_window()
+            payload = {
+                'owner': self.process_id,
+                'window': self._window_id,
+                'current': self._current.to_dict(),
+                'previous': self._previous.to_dict(),
+            }
+            counters = self._pending_counters
+            error_types = self._pending_error_types
+            errors = self._pending_errors
+            self._reset_pending()
+
+        self._write_slot(payload)
+        for counter, amount in counters.items():
+            self._incr(counter, amount)
+        if error_types:
+            merged = cache.get('error_types') or {}
+            for error_type, amount in error_types.items():
+                merged[error_type] = merged.get(error_type, 0) + amount
+            cache.set('error_types', merged, timeout=self.COUNTER_TIMEOUT)
+        if errors:
+            recent_errors = (cache.get('recent_errors') or []) + errors
+            cache.set('recent_errors', recent_errors[-self.MAX_RECENT_ERRORS:], timeout=self.COUNTER_TIMEOUT)
+
+    def _incr(self, key, amount):
+        if cache.add(key, amount, timeout=self.COUNTER_TIMEOUT):
+            return
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, amount, timeout=self.COUNTER_TIMEOUT)
+
+    def _write_slot(self, payload):
+        timeout = self.WINDOW * 2
+        if self._slot is not None:
+            key = self.SLOT_KEY.format(self._slot)
+            current = cache.get(key)
+            if current is None or current.get('owner') == self.process_id:
+                cache.set(key, payload, timeout=timeout)
+                return
+            # The slot expired while idle and was claimed by another process
+            self._slot = None
+
+        for slot in range(self.MAX_SLOTS):
+            if cache.add(self.SLOT_KEY.format(slot), payload, timeout=timeout):
+                self._slot = slot
+                return
+        logger.warning("No free metrics slot; request histograms not published")
+
+    @classmethod
+    def read_merged(cls):
+        """Merge the last one to two windows of histograms from every process"""
+        merged = MetricsWindow()
+        window_id = int(time.time() // cls.WINDOW)
+        slots = cache.get_many([cls.SLOT_KEY.format(slot) for slot in range(cls.MAX_SLOTS)])
+        for payload in slots.values():
+            if payload['window'] == window_id:
+                merged.merge(MetricsWindow.from_dict(payload['current']))
+                merged.merge(MetricsWindow.from_dict(payload['previous']))
+            elif payload['window'] == window_id - 1:
+                merged.merge(MetricsWindow.from_dict(payload['current']))
+        return merged
+
+
+metrics_aggregator = MetricsAggregator()
@@ -7,6 +7,7 @@ from typing import Dict, Any
 import os
 from django.conf import settings
 from collections import defaultdict
+from .histogram import MetricsAggregator, metrics_aggregator
 
 class SystemMetricsService:
     @staticmethod
@@ -133,34 +134,34 @@ class SystemMetricsService:
     
     @staticmethod
     def get_response_metrics() -> Dict[str, Any]:
-        """Get response time metrics from cache"""
-        response_times = cache.get('response_times', [])
-        endpoint_times = cache.get('endpoint_times', defaultdict(list))
+        """Get response time metrics merged from every process's histograms"""
+        metrics_aggregator.flush()
+        merged = MetricsAggregator.read_merged()
+        overall = merged.overall.summary()
         
         metrics = {
-            'avg_response_time': 0,
-            'max_response_time': 0,
-            'min_response_time': 0,
+            'avg_response_time': overall['avg'],
+            'max_response_time': overall['max'],
+            'min_response_time': overall['min'],
+            'p50_response_time': overall['p50'],
+            'p95_response_time': overall['p95'],
+            'p99_response_time': overall['p99'],
+            'total_requests': overall['count'],
             'endpoint_metrics': {}
         }
         
-        if response_times:
-            metrics.update({
-                'avg_response_time': sum(response_times) / len(response_times),
-                'max_response_time': max(response_times),
-                'min_response_time': min(response_times),
-                'total_requests': len(response_times)
-            })
-        
         # Calculate per-endpoint metrics
-        for endpoint, times in endpoint_times.items():
-            if times:
-                metrics['endpoint_metrics'][endpoint] = {
-                    'avg_time': sum(times) / len(times),
-                    'max_time': max(times),
-                    'min_time': min(times),
-                    'requests': len(times)
-                }
+        for endpoint, histogram in merged.endpoints.items():
+            summary = histogram.summary()
+            metrics['endpoint_metrics'][endpoint] = {
+                'avg_time': summary['avg'],
+                'max_time': summary['max'],
+                'min_time': summary['min'],
+                'p50_time': summary['p50'],
+                'p95_time': summary['p95'],
+                'p99_time': summary['p99'],
+                'requests': summary['count']
+            }
         
         return metrics
     
@@ -181,15 +182,21 @@ class SystemMetricsService:
     @staticmethod
     def get_cache_metrics() -> Dict[str, Any]:
         """Get cache performance metrics"""
+        from ..search_cache import SearchResultCache
+        
         hits = cache.get('cache_hits', 0)
         misses = cache.get('cache_misses', 0)
         total = hits + misses
+        search = SearchResultCache.stats()
         
         return {
             'cache_hits': hits,
             'cache_misses': misses,
             'hit_rate': (hits / total * 100) if total > 0 else 0,
-            'total_operations': total
+            'total_operations': total,
+            'search_cache_hits': search['hits'],
+            'search_cache_misses': search['misses'],
+            'search_cache_hit_rate': search['hit_rate']
         }
 
 class PerformanceMonitor:
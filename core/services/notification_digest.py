@@ -0,0 +1,150 @@
+from datetime import timedelta
+from itertools import groupby
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.mail import EmailMultiAlternatives, get_connection
+from django.template.loader import get_template
+from django.utils import timezone
+from ..models import Notification
+import logging
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+class NotificationDigestService:
+    """Builds and sends notification digest emails in batches.
+
+    A run covers one window per frequency, ending on the hour it starts.
+    Recipients are processed in ascending user id order, BATCH_SIZE at a
+    time: one query loads the notifications of the whole batch, the digest
+    template is compiled once per run, and the batch is sent over a single
+    SMTP connection. After each batch the last user id is checkpointed, so
+    re-running a failed window skips users who already got their digest.
+    """
+
+    WINDOWS = {
+        'HOURLY': timedelta(hours=1),
+        'DAILY': timedelta(days=1),
+        'WEEKLY': timedelta(days=7),
+    }
+    TEMPLATE = 'core/emails/notification_digest.html'
+    CHECKPOINT_KEY = 'notification_digest:{frequency}:{window_end}'
+    MAX_ITEMS = 20
+
+    def __init__(self, frequency, window_end=None):
+        if frequency not in self.WINDOWS:
+            raise ValueError(f"Unsupported frequency: {frequency}")
+        if window_end is None:
+            window_end = timezone.now().replace(minute=0, second=0, microsecond=0)
+        self.frequency = frequency
+        self.window_end = window_end
+        self.window_start = window_end - self.WINDOWS[frequency]
+        self._template = None
+
+    @staticmethod
+    def batch_size():
+        return getattr(settings, 'NOTIFICATION_DIGEST_BATCH_SIZE', 200)
+
+    @property
+    def checkpoint_key(self):
+        return self.CHECKPOINT_KEY.format(
+            frequency=self.frequency,
+            window_end=self.window_end.isoformat()
+        )
+
+    @property
+    def checkpoint(self):
+        """Id of the last user whose digest was sent in this window"""
+        return cache.get(self.checkpoint_key, 0)
+
+    def _save_checkpoint(self, user_id):
+        # Keep it past the end of the next window so a late retry still resumes
+        timeout = int(self.WINDOWS[self.frequency].total_seconds()) * 2
+        cache.set(self.checkpoint_key, user_id, timeout=timeout)
+
+    def _window_notifications(self):
+        return Notification.objects.filter(
+            created_at__gte=self.window_start,
+            created_at__lt=self.window_end,
+            user__is_active=True,
+            user__notification_preferences__notification_frequency=self.frequency,
+            user__notification_preferences__email_notifications=True
+        ).exclude(user__email='')
+
+    def pending_batches(self):
+        """User id batches still to be sent in this window"""
+        user_ids = list(
+            self._window_notifications()
+            .filter(user_id__gt=self.checkpoint)
+            .order_by('user_id')
+            .values_list('user_id', flat=True)
+            .distinct()
+        )
+        size = self.batch_size()
+        return [user_ids[i:i + size] for i in range(0, len(user_ids), size)]
+
+    @property
+    def template(self):
+        if self._template is None:
+            self._template = get_template(self.TEMPLATE)
+        return self._template
+
+    def build_messages(self, user_ids):
+        """One digest email per user, from a single notification query"""
+        users = User.objects.in_bulk(user_ids)
+        notifications = (
+            self._window_notifications()
+            .filter(user_id__in=user_ids)
+            .order_by('user_id', '-created_at')
+            .only('user_id', 'title', 'message', 'link', 'created_at')
+        )
+        subject = f'Your {self.frequency.title()} Notification Digest'
+        messages = []
+        for user_id, items in groupby(notifications.iterator(), key=lambda n: n.user_id):
+            user = users.get(user_id)
+            if user is None:
+                continue
+            items = list(items)
+            html_content = self.template.render({
+                'subject': subject,
+                'user': user,
+                'notifications': items[:self.MAX_ITEMS],
+                'total': len(items),
+                'remaining': max(len(items) - self.MAX_ITEMS, 0),
+                'site_url': settings.SITE_URL,
+            })
+            message = EmailMultiAlternatives(
+                subject=subject,
+                body='',
+                from_email=settings.DEFAULT_FROM_EMAIL,
+                to=[user.email]
+            )
+            message.attach_alternative(html_content, 'text/html')
+            messages.append(message)
+        return messages
+
+    def send_batch(self, user_ids, connection=None):
+        """Send one batch and checkpoint it; returns the number of emails sent"""
+        user_ids = [user_id for user_id in user_ids if user_id > self.checkpoint]
+        if not user_ids:
+            return 0
+
+        messages = self.build_messages(user_ids)
+        if connection is None:
+            with get_connection() as connection:
+                sent = connection.send_messages(messages) or 0
+        else:
+            sent = connection.send_messages(messages) or 0
+        self._save_checkpoint(max(user_ids))
+        logger.info(f"Sent {sent} {self.frequency.lower()} digests, checkpoint at user {max(user_ids)}")
+        return sent
+
+    def run(self):
+        """Send every pending batch in this process over one connection"""
+        sent = 0
+        with get_connection() as connection:
+            for user_ids in self.pending_batches():
+                sent += self.send_batch(user_ids, connection=connection)
+        return sent
@@ -0,0 +1,178 @@
+from django.apps import apps
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import models, transaction
+from ..models import Notification
+from .notification_stream import publish_notifications
+import logging
+import uuid
+
+User = get_user_model()
+logger = logging.getLogger(__name__)
+
+
+def serialize_email_context(context):
+    """Replace model instances in an email context with JSON-safe references"""
+    serialized = {}
+    for key, value in (context or {}).items():
+        if isinstance(value, models.Model):
+            value = {'__model__': value._meta.label, 'pk': value.pk}
+        serialized[key] = value
+    return serialized
+
+
+def deserialize_email_context(context):
+    """Load the model instances referenced by serialize_email_context"""
+    loaded = {}
+    for key, value in (context or {}).items():
+        if isinstance(value, dict) and '__model__' in value:
+            model = apps.get_model(value['__model__'])
+            value = model.objects.filter(pk=value['pk']).first()
+        loaded[key] = value
+    return loaded
+
+
+class NotificationDispatcher:
+    """Fans one notification out to many recipients.
+
+    In-app notifications are written with bulk_create and pushed to the
+    recipients' channel-layer groups a chunk at a time. Email and push
+    delivery are queued as Celery tasks per chunk of recipients, so the
+    caller never waits on SMTP or FCM. Delivery outcomes are counted per
+    channel in the cache; see stats().
+    """
+
+    CHANNELS = ('in_app', 'realtime', 'email', 'push')
+    METRICS_KEY = 'notification_dispatch:{channel}:{outcome}'
+    METRICS_TIMEOUT = 60 * 60 * 24 * 7
+
+    @staticmethod
+    def chunk_size():
+        return getattr(settings, 'NOTIFICATION_DISPATCH_CHUNK_SIZE', 500)
+
+    @classmethod
+    def dispatch(cls, recipients, type, title, message, link='',
+                 severity=Notification.Severity.LOW, email=None, push=False, push_data=None,
+                 defer=True):
+        """Notify every user in the recipients queryset.
+
+        email is an optional dict with subject, template and context. Each
+        recipient's email is rendered with the user added to the context
+        under recipient_key (default 'user'). With defer=False, delivery
+        runs in this process straight away instead of after commit in
+        Celery; use it only for small, urgent recipient lists. Returns the
+        per-channel counts for this dispatch.
+        """
+        if email:
+            email = {
+                'subject': email['subject'],
+                'template': email['template'],
+                'context': serialize_email_context(email.get('context')),
+                'recipient_key': email.get('recipient_key', 'user'),
+            }
+
+        result = {'recipients': 0, 'in_app': 0, 'email_batches': 0, 'push_batches': 0}
+        user_ids = recipients.order_by('pk').values_list('pk', flat=True).distinct()
+        chunk = []
+        for user_id in user_ids.iterator(chunk_size=cls.chunk_size()):
+            chunk.append(user_id)
+            if len(chunk) >= cls.chunk_size():
+                cls._dispatch_chunk(chunk, type, title, message, link, severity, email, push, push_data, defer, result)
+                chunk = []
+        if chunk:
+            cls._dispatch_chunk(chunk, type, title, message, link, severity, email, push, push_data, defer, result)
+        return result
+
+    @classmethod
+    def _dispatch_chunk(cls, user_ids, type, title, message, link, severity, email, push, push_data, defer, result):
+        from ..tasks import deliver_notification_emails, deliver_push_notifications
+
+        dispatch_id = uuid.uuid4()
+        notifications = Notification.objects.bulk_create([
+            Notification(
+                user_id=user_id,
+                type=type,
+                title=title,
+                message=message,
+                link=link,
+                severity=severity,
+                dispatch_id=dispatch_id
+            )
+            for user_id in user_ids
+        ])
+        if notifications and notifications[0].pk is None:
+            # Backends without RETURNING (MySQL) leave the new ids unset,
+            # but the stream needs them for Last-Event-ID resume. The chunk's
+            # own marker keeps identical concurrent dispatches apart.
+            notifications = list(Notification.objects.filter(dispatch_id=dispatch_id).order_by('id'))
+
+        result['recipients'] += len(user_ids)
+        result['in_app'] += len(notifications)
+        cls.record('in_app', 'created', len(notifications))
+
+        def run(task, *args, **kwargs):
+            if defer:
+                task.delay(*args, **kwargs)
+            else:
+                task(*args, **kwargs)
+
+        def deliver():
+            cls.record('realtime', 'published', publish_notifications(notifications))
+            if email:
+                cls.record('email', 'queued', len(user_ids))
+                run(deliver_notification_emails, list(user_ids), **email)
+            if push:
+                cls.record('push', 'queued', len(user_ids))
+                run(deliver_push_notifications, list(user_ids), title, message, push_data)
+
+        if email:
+            result['email_batches'] += 1
+        if push:
+            result['push_batches'] += 1
+        if defer:
+            transaction.on_commit(deliver)
+        else:
+            deliver()
+
+    @classmethod
+    def dispatch_async(cls, filters=None, excludes=None, **kwargs):
+        """Run dispatch() in a Celery worker for recipients matching the User filters"""
+        from ..tasks import dispatch_notification
+
+        if kwargs.get('email'):
+            kwargs['email'] = dict(kwargs['email'], context=serialize_email_context(kwargs['email'].get('context')))
+        return dispatch_notification.delay(filters or {}, excludes or {}, **kwargs)
+
+    @classmethod
+    def record(cls, channel, outcome, amount=1):
+        if not amount:
+            return
+        key = cls.METRICS_KEY.format(channel=channel, outcome=outcome)
+        if cache.add(key, amount, timeout=cls.METRICS_TIMEOUT):
+            return
+        try:
+            cache.incr(key, amount)
+        except ValueError:
+            # Expired between add and incr
+            cache.set(key, amount, timeout=cls.METRICS_TIMEOUT)
+
+    @classmethod
+    def stats(cls):
+        """Delivery counts per channel and outcome"""
+        outcomes = {
+            'in_app': ('created',),
+            'realtime': ('published',),
+            'email': ('queued', 'sent', 'skipped', 'failed'),
+            'push': ('queued', 'sent', 'skipped', 'failed'),
+        }
+        keys = {
+            cls.METRICS_KEY.format(channel=channel, outcome=outcome): (channel, outcome)
+            for channel in cls.CHANNELS
+            for outcome in outcomes[channel]
+        }
+        values = cache.get_many(list(keys))
+        stats = {channel: {} for channel in cls.CHANNELS}
+        for key, (channel, outcome) in keys.items():
+            stats[channel][outcome] = values.get(key, 0)
+        return stats
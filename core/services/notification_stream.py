@@ -0,0 +1,101 @@
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.conf import settings
+import asyncio
+import json
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def notification_group(user_id):
+    """Channel-layer group shared by the notification WebSocket and SSE stream"""
+    return f"user_{user_id}_notifications"
+
+
+def serialize_notification(notification):
+    return {
+        'id': notification.id,
+        'type': notification.type,
+        'title': notification.title,
+        'message': notification.message,
+        'link': notification.link,
+        'severity': notification.severity,
+        'is_read': notification.is_read,
+        'created_at': notification.created_at.isoformat(),
+    }
+
+
+def publish_notification(notification):
+    """Push a notification to the user's connected WebSocket and SSE clients"""
+    channel_layer = get_channel_layer()
+    if channel_layer is None:
+        return
+    try:
+        async_to_sync(channel_layer.group_send)(
+            notification_group(notification.user_id),
+            {'type': 'notification_message', 'data': serialize_notification(notification)}
+        )
+    except Exception as e:
+        logger.error(f"Error publishing notification {notification.id}: {str(e)}")
+
+
+def publish_notifications(notifications):
+    """Push a batch of notifications to their users in one event loop pass.
+
+    Returns the number of notifications handed to the channel layer.
+    """
+    channel_layer = get_channel_layer()
+    if channel_layer is None or not notifications:
+        return 0
+
+    async def send_all():
+        results = await asyncio.gather(*[
+            channel_layer.group_send(
+                notification_group(notification.user_id),
+                {'type': 'notification_message', 'data': serialize_notification(notification)}
+            )
+            for notification in notifications
+        ], return_exceptions=True)
+        failures = [result for result in results if isinstance(result, Exception)]
+        if failures:
+            logger.error(f"Error publishing {len(failures)} notifications: {str(failures[0])}")
+        return len(results) - len(failures)
+
+    return async_to_sync(send_all)()
+
+
+def format_sse_event(data, event_id=None):
+    """Format a payload as a Server-Sent Events message"""
+    lines = []
+    if event_id is not None:
+        lines.append(f"id: {event_id}")
+    lines.append(f"data: {json.dumps(data)}")
+    return '\n'.join(lines) + '\n\n'
+
+
+class StreamConnectionLimiter:
+    """Caps the number of open notification streams in this process"""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.active = 0
+
+    @property
+    def limit(self):
+        return getattr(settings, 'NOTIFICATION_STREAM_MAX_CONNECTIONS', 1000)
+
+    def acquire(self):
+        with self._lock:
+            if self.active >= self.limit:
+                return False
+            self.active += 1
+            return True
+
+    def release(self):
+        with self._lock:
+            self.active = max(self.active - 1, 0)
+
+
+stream_connections = StreamConnectionLimiter()
@@ -3,7 +3,9 @@ from django.template.loader import render_to_string
 from django.conf import settings
 from django.contrib.auth import get_user_model
 from ..models import Notification
-from firebase_admin import messaging
+from .notification_dispatcher import NotificationDispatcher
+from .notification_digest import NotificationDigestService
+from .push import PushDeliveryService
 from django.utils import timezone
 from django.urls import reverse
 import logging
@@ -26,102 +28,71 @@ class NotificationService:
     @staticmethod
     def send_push_notification(user, title, message, data=None):
         """
-        Send a push notification to a user if they have opted in for push notifications.
+        Send a push notification to each of a user's devices if they have opted in for push notifications.
+        Devices that hit a transient FCM error are retried from the push worker queue.
         """
         if not user.notification_preferences.push_notifications:
             return
         
-        if not hasattr(user, 'device_tokens'):
+        tokens = list(user.device_tokens.values_list('token', flat=True))
+        if not tokens:
             return
-            
-        msg = messaging.Message(
-            notification=messaging.Notification(
-                title=title,
-                body=message
-            ),
-            data=data or {},
-            token=user.device_tokens.token
-        )
         
-        return messaging.send(msg)
+        result = PushDeliveryService.send(tokens, title, message, data)
+        if result['retry']:
+            from ..tasks import send_push_batch
+            send_push_batch.delay(result['retry'], title, message, data)
+        return result
 
     @staticmethod
-    def send_email_notification(user, subject, template, context):
+    def send_email_notification(user, subject, template, context, connection=None):
         """
         Send an email notification to a user if they have opted in for email notifications.
+        Pass an open connection to reuse it across many emails.
         """
         if not user.notification_preferences.email_notifications:
             return
             
         html_content = render_to_string(template, context)
         
-        send_mail(
+        return send_mail(
             subject=subject,
             message='',  # Empty string as we're using HTML content
             from_email=settings.DEFAULT_FROM_EMAIL,
             recipient_list=[user.email],
-            html_message=html_content
+            html_message=html_content,
+            connection=connection
         )
     
     @staticmethod
     def send_notification_digest(frequency='DAILY'):
         """
         Send notification digest emails to users based on their preferences.
+        Runs every batch in this process; the send_*_digest tasks run them as a Celery chain.
         """
-        if frequency == 'DAILY':
-            cutoff = timezone.now() - timezone.timedelta(days=1)
-        elif frequency == 'WEEKLY':
-            cutoff = timezone.now() - timezone.timedelta(days=7)
-        else:
-            raise ValueError(f"Unsupported frequency: {frequency}")
-            
-        users = User.objects.filter(
-            notification_preferences__notification_frequency=frequency
-        )
-        
-        for user in users:
-            notifications = Notification.objects.filter(
-                user=user,
-                created_at__gte=cutoff
-            )
-            
-            if notifications.exists():
-                NotificationService.send_email_notification(
-                    user=user,
-                    subject=f'Your {frequency.title()} Notification Digest',
-                    template='core/emails/notification_digest.html',
-                    context={'notifications': notifications}
-                )
+        return NotificationDigestService(frequency).run()
     
     @staticmethod
     def notify_app_submission(app):
         """
         Notify admins about a new app submission.
         """
-        # Get all admin users
-        admin_users = User.objects.filter(role=User.Role.ADMIN)
-        
-        for admin in admin_users:
-            # Create in-app notification
-            Notification.objects.create(
-                user=admin,
-                type=Notification.Type.APP_APPROVAL,
-                title='New App Submission',
-                message=f'New app "{app.name}" submitted by {app.developer.email} requires review.',
-                link=f'/admin/core/applisting/{app.id}/change/'
-            )
-            
-            # Send email notification
-            NotificationService.send_email_notification(
-                user=admin,
-                subject='New App Submission Requires Review',
-                template='core/emails/app_submission.html',
-                context={
+        return NotificationDispatcher.dispatch(
+            User.objects.filter(role=User.Role.ADMIN),
+            type=Notification.Type.APP_APPROVAL,
+            title='New App Submission',
+            message=f'New app "{app.name}" submitted by {app.developer.email} requires review.',
+            link=f'/admin/core/applisting/{app.id}/change/',
+            email={
+                'subject': 'New App Submission Requires Review',
+                'template': 'core/emails/app_submission.html',
+                'context': {
                     'app': app,
-                    'admin': admin,
                     'site_url': settings.SITE_URL
-                }
-            )
+                },
+                'recipient_key': 'admin'
+            }
+        )
     
     @staticmethod
     def notify_app_approval(app):
@@ -191,30 +162,25 @@ class NotificationService:
     @classmethod
     def notify_community_suggestion(cls, app):
         """Notify admins about a new community app suggestion."""
-        admins = User.objects.filter(role=User.Role.ADMIN)
-        
-        for admin in admins:
-            Notification.objects.create(
-                user=admin,
-                type=Notification.Type.APP_APPROVAL,
-                title="New Community App Suggestion",
-                message=f"A new app '{app.name}' has been suggested by the community. Please review.",
-                link=reverse('core:admin_review_app', args=[app.pk])
-            )
+        return NotificationDispatcher.dispatch(
+            User.objects.filter(role=User.Role.ADMIN),
+            type=Notification.Type.APP_APPROVAL,
+            title="New Community App Suggestion",
+            message=f"A new app '{app.name}' has been suggested by the community. Please review.",
+            link=reverse('core:admin_review_app', args=[app.pk])
+        )
 
     @classmethod
     def notify_suggestion_trending(cls, app):
         """Notify admins and the suggester when an app becomes trending."""
         # Notify admins
-        admins = User.objects.filter(role=User.Role.ADMIN)
-        for admin in admins:
-            Notification.objects.create(
-                user=admin,
-                type=Notification.Type.APP_UPDATE,
-                title="Community App Trending",
-                message=f"The suggested app '{app.name}' is now trending with high community interest.",
-                link=reverse('core:app_detail', args=[app.pk])
-            )
+        NotificationDispatcher.dispatch(
+            User.objects.filter(role=User.Role.ADMIN),
+            type=Notification.Type.APP_UPDATE,
+            title="Community App Trending",
+            message=f"The suggested app '{app.name}' is now trending with high community interest.",
+            link=reverse('core:app_detail', args=[app.pk])
+        )
         
         # Notify the suggester
         if app.suggested_by:
@@ -318,36 +284,29 @@ class NotificationService:
     def notify_admins_fee_processing_failed(cls, app, error):
         """Notify admins when platform fee processing fails"""
         try:
-            # Get all admin users
-            admins = User.objects.filter(is_staff=True)
-            
-            for admin in admins:
-                # Create notification
-                Notification.objects.create(
-                    user=admin,
-                    type=Notification.Type.SYSTEM_ERROR,
-                    title=f"Platform Fee Processing Failed - {app.name}",
-                    message=(
-                        f"Platform fee processing failed for app {app.name} (ID: {app.id}).\n"
-                        f"Error: {error}\n\n"
-                        f"Please check the platform fee dashboard and process the fee manually if needed."
-                    ),
-                    link=f"/admin/platform-fees/",
-                    severity=Notification.Severity.HIGH
-                )
-                
-                # Send email notification
-                cls.send_email_notification(
-                    user=admin,
-                    subject=f"Platform Fee Processing Failed - {app.name}",
-                    template="core/emails/platform_fee_failed.html",
-                    context={
+            NotificationDispatcher.dispatch(
+                User.objects.filter(is_staff=True),
+                type=Notification.Type.SYSTEM_ERROR,
+                title=f"Platform Fee Processing Failed - {app.name}",
+                message=(
+                    f"Platform fee processing failed for app {app.name} (ID: {app.id}).\n"
+                    f"Error: {error}\n\n"
+                    f"Please check the platform fee dashboard and process the fee manually if needed."
+                ),
+                link=f"/admin/platform-fees/",
+                severity=Notification.Severity.HIGH,
+                email={
+                    'subject': f"Platform Fee Processing Failed - {app.name}",
+                    'template': "core/emails/platform_fee_failed.html",
+                    'context': {
                         'app': app,
-                        'error': error,
-                        'admin': admin,
+                        'error': str(error),
                         'site_url': settings.SITE_URL
-                    }
-                )
+                    },
+                    'recipient_key': 'admin'
+                },
+                defer=False
+            )
                 
         except Exception as e:
             logger.error(f"Failed to send admin notification for fee processing failure: {str(e)}")
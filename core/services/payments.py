@@ -584,8 +584,12 @@ class PaymentService:
             return {'status': False, 'message': str(e)}
 
     @classmethod
-    def create_subscription_payment(cls, user, plan, amount, currency='NGN'):
-        """Create a subscription payment"""
+    def create_subscription_payment(cls, user, plan, amount, currency='NGN', reference=None):
+        """Create a subscription payment.
+
+        Paystack rejects a reference it has already seen, so callers that
+        may retry pass a stable reference instead of a generated one.
+        """
         logger.info(f"Creating subscription payment - Plan: {plan}, Amount: {amount} {currency}")
         
         if not isinstance(amount, (int, float, Decimal)) or float(amount) <= 0:
@@ -593,7 +597,7 @@ class PaymentService:
             raise ValueError("Invalid amount")
         
         # Generate unique reference for subscription payment
-        reference = f"sub_{uuid.uuid4().hex[:16]}"
+        reference = reference or f"sub_{uuid.uuid4().hex[:16]}"
         
         # Convert amount to kobo/cents
         amount_in_subunit = int(float(amount) * 100)
@@ -639,7 +643,7 @@ class PaymentService:
         
         try:
             logger.info(f"Sending subscription payment request to Paystack: {json.dumps(data)}")
-            response = requests.post(url, headers=headers, json=data)
+            response = requests.post(url, headers=headers, json=data, timeout=30)
             
             if response.status_code != 200:
                 error_data = response.json()
@@ -673,6 +677,49 @@ class PaymentService:
                 'error': str(e)
             }
     
+    @classmethod
+    def lookup_transaction(cls, reference):
+        """Look up a Paystack transaction by reference, whatever its status.
+
+        Returns {'success': True, 'found': ...}, or success False when
+        Paystack could not be asked.
+        """
+        url = f"https://api.paystack.co/transaction/verify/{reference}"
+        headers = {
+            'Authorization': f'Bearer {settings.PAYSTACK_SECRET_KEY}',
+            'Content-Type': 'application/json'
+        }
+        
+        try:
+            response = requests.get(url, headers=headers, timeout=30)
+        except requests.RequestException as e:
+            logger.error(f"Transaction lookup failed for {reference}: {str(e)}")
+            return {
+                'success': False,
+                'error': str(e)
+            }
+        
+        if response.status_code in (400, 404):
+            # Paystack answers "Transaction reference not found" with a 400
+            return {
+                'success': True,
+                'found': False
+            }
+        if response.status_code != 200:
+            logger.error(f"Transaction lookup failed - HTTP {response.status_code}")
+            return {
+                'success': False,
+                'error': f"Transaction lookup failed with status {response.status_code}"
+            }
+        
+        data = response.json().get('data') or {}
+        return {
+            'success': True,
+            'found': True,
+            'status': data.get('status'),
+            'reference': reference
+        }
+    
     @classmethod
     def verify_subscription_payment(cls, reference):
         """Verify a subscription payment"""
@@ -0,0 +1,172 @@
+from django.conf import settings
+from django.core.signals import setting_changed
+from django.dispatch import receiver
+from django.utils.module_loading import import_string
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# FCM accepts at most this many tokens per multicast request
+MULTICAST_LIMIT = 500
+
+SENT = 'sent'
+INVALID = 'invalid'  # Token is dead and should be deleted
+RETRY = 'retry'  # Transient failure, worth sending again later
+FAILED = 'failed'
+
+
+class FirebasePushClient:
+    """Sends multicast messages through the Firebase Admin SDK"""
+
+    def send_multicast(self, tokens, title, body, data=None):
+        """Send one message to up to MULTICAST_LIMIT tokens; returns one status per token"""
+        from firebase_admin import exceptions, messaging
+
+        message = messaging.MulticastMessage(
+            tokens=list(tokens),
+            notification=messaging.Notification(title=title, body=body),
+            data={key: str(value) for key, value in (data or {}).items()}
+        )
+        try:
+            response = messaging.send_each_for_multicast(message)
+        except (exceptions.UnavailableError, exceptions.InternalError) as e:
+            logger.warning(f"FCM unavailable for {len(tokens)} tokens: {str(e)}")
+            return [RETRY] * len(tokens)
+        except ValueError as e:
+            # Raised when Firebase was not initialized (no credentials)
+            logger.error(f"Firebase push unavailable: {str(e)}")
+            return [FAILED] * len(tokens)
+
+        statuses = []
+        for result in response.responses:
+            error = result.exception
+            if result.success:
+                statuses.append(SENT)
+            elif isinstance(error, (messaging.UnregisteredError, messaging.SenderIdMismatchError)):
+                # Only these mean the token itself is dead; InvalidArgumentError
+                # can be caused by the payload and says nothing about the token
+                statuses.append(INVALID)
+            elif isinstance(error, (messaging.QuotaExceededError, exceptions.UnavailableError,
+                                    exceptions.InternalError)):
+                statuses.append(RETRY)
+            else:
+                logger.warning(f"FCM rejected a token: {str(error)}")
+                statuses.append(FAILED)
+        return statuses
+
+
+class FakePushClient:
+    """Offline stand-in for FirebasePushClient, for tests and load testing.
+
+    Tokens starting with 'invalid' are reported as unregistered and tokens
+    starting with 'unavailable' as transient failures. latency (seconds)
+    is slept once per multicast call to imitate the FCM round trip.
+    """
+
+    def __init__(self, latency=0):
+        self.latency = latency
+        self._lock = threading.Lock()
+        self.calls = []
+
+    def send_multicast(self, tokens, title, body, data=None):
+        if self.latency:
+            time.sleep(self.latency)
+        with self._lock:
+            self.calls.append({'tokens': list(tokens), 'title': title, 'body': body, 'data': data})
+
+        statuses = []
+        for token in tokens:
+            if token.startswith('invalid'):
+                statuses.append(INVALID)
+            elif token.startswith('unavailable'):
+                statuses.append(RETRY)
+            else:
+                statuses.append(SENT)
+        return statuses
+
+    def reset(self):
+        with self._lock:
+            self.calls = []
+
+    @property
+    def sent_tokens(self):
+        return [token for call in self.calls for token in call['tokens']]
+
+
+_client = None
+_client_lock = threading.Lock()
+
+
+def get_push_client():
+    """The client named by PUSH_NOTIFICATION_CLIENT, created once per process"""
+    global _client
+    if _client is None:
+        with _client_lock:
+            if _client is None:
+                path = getattr(settings, 'PUSH_NOTIFICATION_CLIENT', 'core.services.push.FirebasePushClient')
+                _client = import_string(path)()
+    return _client
+
+
+@receiver(setting_changed)
+def reset_push_client(sender, setting, **kwargs):
+    global _client
+    if setting == 'PUSH_NOTIFICATION_CLIENT':
+        _client = None
+
+
+class PushDeliveryService:
+    """Delivers push notifications to registered device tokens.
+
+    Tokens are sent in multicast chunks of MULTICAST_LIMIT. Tokens FCM
+    reports as unregistered or invalid are deleted straight away; tokens
+    that hit a transient error are returned so the caller can retry them.
+    """
+
+    @staticmethod
+    def tokens_for_users(user_ids):
+        """(user_id, token) pairs for the given users who have push notifications enabled"""
+        from ..models import DeviceToken
+
+        return list(
+            DeviceToken.objects.filter(
+                user_id__in=user_ids,
+                user__notification_preferences__push_notifications=True
+            ).values_list('user_id', 'token')
+        )
+
+    @staticmethod
+    def chunk(tokens):
+        return [tokens[i:i + MULTICAST_LIMIT] for i in range(0, len(tokens), MULTICAST_LIMIT)]
+
+    @classmethod
+    def send(cls, tokens, title, message, data=None, client=None):
+        """Send to the tokens and prune dead ones.
+
+        Returns counts of sent, failed and pruned tokens, plus the list of
+        tokens to retry.
+        """
+        from ..models import DeviceToken
+
+        client = client or get_push_client()
+        result = {'sent': 0, 'failed': 0, 'pruned': 0, 'retry': []}
+        invalid = []
+        for batch in cls.chunk(list(tokens)):
+            statuses = client.send_multicast(batch, title, message, data)
+            for token, status in zip(batch, statuses):
+                if status == SENT:
+                    result['sent'] += 1
+                elif status == INVALID:
+                    invalid.append(token)
+                elif status == RETRY:
+                    result['retry'].append(token)
+                else:
+                    result['failed'] += 1
+
+        if invalid:
+            result['pruned'], _ = DeviceToken.objects.filter(token__in=invalid).delete()
+            result['failed'] += len(invalid)
+            logger.info(f"Pruned {result['pruned']} invalid device tokens")
+        return result
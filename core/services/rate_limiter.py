@@ -1,15 +1,313 @@
-from django.core.cache import cache
 from django.conf import settings
+from redis.exceptions import RedisError
+import math
+import threading
+import time
+import uuid
+import logging
+
+logger = logging.getLogger(__name__)
+
+SLIDING_WINDOW_LOG = 'sliding_window_log'
+SLIDING_WINDOW_COUNTER = 'sliding_window_counter'
+TOKEN_BUCKET = 'token_bucket'
+
+# Each script returns {allowed, remaining, reset_ms, retry_after_ms}
+SLIDING_WINDOW_LOG_SCRIPT = """
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+redis.call('ZREMRANGEBYSCORE', KEYS[1], 0, now - period)
+local count = redis.call('ZCARD', KEYS[1])
+local allowed = 0
+if count < limit then
+    redis.call('ZADD', KEYS[1], now, ARGV[4])
+    count = count + 1
+    allowed = 1
+end
+redis.call('PEXPIRE', KEYS[1], period)
+local reset = period
+local oldest = redis.call('ZRANGE', KEYS[1], 0, 0, 'WITHSCORES')
+if oldest[2] then
+    reset = tonumber(oldest[2]) + period - now
+end
+local retry = 0
+if allowed == 0 then
+    retry = reset
+end
+return {allowed, limit - count, reset, retry}
+"""
+
+SLIDING_WINDOW_COUNTER_SCRIPT = """
+local now = tonumber(ARGV[1])
+local period = tonumber(ARGV[2])
+local limit = tonumber(ARGV[3])
+local elapsed = now % period
+local current = tonumber(redis.call('GET', KEYS[1]) or '0')
+local previous = tonumber(redis.call('GET', KEYS[2]) or '0')
+local weighted = previous * (period - elapsed) / period + current
+local allowed = 0
+if weighted < limit then
+    redis.call('INCR', KEYS[1])
+    redis.call('PEXPIRE', KEYS[1], period * 2)
+    weighted = weighted + 1
+    allowed = 1
+end
+local retry = 0
+if allowed == 0 then
+    retry = period - elapsed
+end
+return {allowed, math.max(0, math.floor(limit - weighted)), period - elapsed, retry}
+"""
+
+TOKEN_BUCKET_SCRIPT = """
+local now = tonumber(ARGV[1])
+local capacity = tonumber(ARGV[2])
+local rate = tonumber(ARGV[3])
+local state = redis.call('HMGET', KEYS[1], 'tokens', 'ts')
+local tokens = tonumber(state[1])
+local ts = tonumber(state[2])
+if tokens == nil or ts == nil then
+    tokens = capacity
+    ts = now
+end
+tokens = math.min(capacity, tokens + math.max(0, now - ts) * rate)
+local allowed = 0
+if tokens >= 1 then
+    tokens = tokens - 1
+    allowed = 1
+end
+redis.call('HSET', KEYS[1], 'tokens', tostring(tokens), 'ts', now)
+redis.call('PEXPIRE', KEYS[1], math.ceil(capacity / rate))
+local retry = 0
+if allowed == 0 then
+    retry = math.ceil((1 - tokens) / rate)
+end
+return {allowed, math.floor(tokens), math.ceil((capacity - tokens) / rate), retry}
+"""
+
+SCRIPTS = {
+    SLIDING_WINDOW_LOG: SLIDING_WINDOW_LOG_SCRIPT,
+    SLIDING_WINDOW_COUNTER: SLIDING_WINDOW_COUNTER_SCRIPT,
+    TOKEN_BUCKET: TOKEN_BUCKET_SCRIPT,
+}
+
+
+class RateLimitPolicy:
+    """How many calls are allowed per period, and the algorithm enforcing it.
+
+    - sliding_window_log: exact, stores one entry per call in the window
+    - sliding_window_counter: approximate, two counters per key
+    - token_bucket: allows bursts of up to `burst` calls, refilling at
+      calls/period
+    """
+
+    ALGORITHMS = (SLIDING_WINDOW_LOG, SLIDING_WINDOW_COUNTER, TOKEN_BUCKET)
+
+    def __init__(self, calls, period, algorithm=SLIDING_WINDOW_COUNTER, burst=None):
+        if algorithm not in self.ALGORITHMS:
+            raise ValueError(f"Unknown rate limit algorithm: {algorithm}")
+        self.calls = calls
+        self.period = period
+        self.algorithm = algorithm
+        self.burst = burst or calls
+
+    @classmethod
+    def from_config(cls, config):
+        """Build a policy from a RATE_LIMITS settings entry"""
+        return cls(
+            calls=config['calls'],
+            period=config['period'],
+            algorithm=config.get('algorithm', SLIDING_WINDOW_COUNTER),
+            burst=config.get('burst')
+        )
+
+    @property
+    def period_ms(self):
+        return int(self.period * 1000)
+
+    @property
+    def ttl_ms(self):
+        """How long a key's state can matter after its last call"""
+        return int(self.period_ms * max(2, self.burst / self.calls))
+
+    @property
+    def limit(self):
+        return self.burst if self.algorithm == TOKEN_BUCKET else self.calls
+
+
+class RateLimitResult:
+    def __init__(self, allowed, limit, remaining, reset_ms, retry_after_ms=0):
+        self.allowed = bool(allowed)
+        self.limit = limit
+        self.remaining = max(int(remaining), 0)
+        self.reset = math.ceil(reset_ms / 1000)
+        self.retry_after = math.ceil(retry_after_ms / 1000)
+
+    def __bool__(self):
+        return self.allowed
+
+    def headers(self):
+        """Get the X-RateLimit-* headers describing this result"""
+        headers = {
+            'X-RateLimit-Limit': str(self.limit),
+            'X-RateLimit-Remaining': str(self.remaining),
+            'X-RateLimit-Reset': str(self.reset),
+        }
+        if not self.allowed:
+            headers['Retry-After'] = str(max(self.retry_after, 1))
+        return headers
+
+    def apply_headers(self, response):
+        for header, value in self.headers().items():
+            response[header] = value
+        return response
+
+
+class LocalRateLimitBackend:
+    """In-process implementation of the rate limiting algorithms.
+
+    Used when the cache is not Redis or Redis is unreachable. Limits are
+    then enforced per process rather than across the deployment.
+    """
+
+    MAX_KEYS = 10000
+
+    def __init__(self):
+        self._state = {}
+        self._lock = threading.Lock()
+
+    def _sweep(self, now_ms):
+        if len(self._state) > self.MAX_KEYS:
+            for key in [k for k, (_, expires) in self._state.items() if expires <= now_ms]:
+                del self._state[key]
+
+    def hit(self, key, policy, now_ms):
+        with self._lock:
+            self._sweep(now_ms)
+            state, expires = self._state.get(key, (None, 0))
+            if expires <= now_ms:
+                state = None
+            handler = getattr(self, f'_{policy.algorithm}')
+            state, result = handler(state, policy, now_ms)
+            self._state[key] = (state, now_ms + policy.ttl_ms)
+            return result
+
+    def _sliding_window_log(self, log, policy, now_ms):
+        period = policy.period_ms
+        log = [t for t in (log or []) if t > now_ms - period]
+        allowed = len(log) < policy.calls
+        if allowed:
+            log.append(now_ms)
+        reset = log[0] + period - now_ms if log else period
+        return log, RateLimitResult(
+            allowed, policy.limit, policy.calls - len(log), reset,
+            0 if allowed else reset
+        )
+
+    def _sliding_window_counter(self, state, policy, now_ms):
+        period = policy.period_ms
+        window = now_ms // period
+        elapsed = now_ms % period
+        if state is None or state['window'] < window - 1:
+            previous, current = 0, 0
+        elif state['window'] == window - 1:
+            previous, current = state['current'], 0
+        else:
+            previous, current = state['previous'], state['current']
+
+        weighted = previous * (period - elapsed) / period + current
+        allowed = weighted < policy.calls
+        if allowed:
+            current += 1
+            weighted += 1
+        state = {'window': window, 'previous': previous, 'current': current}
+        return state, RateLimitResult(
+            allowed, policy.limit, math.floor(policy.calls - weighted),
+            period - elapsed, 0 if allowed else period - elapsed
+        )
+
+    def _token_bucket(self, state, policy, now_ms):
+        capacity = policy.burst
+        rate = policy.calls / policy.period_ms
+        tokens, ts = state if state else (capacity, now_ms)
+        tokens = min(capacity, tokens + max(0, now_ms - ts) * rate)
+        allowed = tokens >= 1
+        if allowed:
+            tokens -= 1
+        return (tokens, now_ms), RateLimitResult(
+            allowed, policy.limit, math.floor(tokens),
+            math.ceil((capacity - tokens) / rate),
+            0 if allowed else math.ceil((1 - tokens) / rate)
+        )
+
+
+class RateLimiter:
+    """Shared rate limiting engine.
+
+    With the django-redis cache backend every check is a single Lua script
+    call, so concurrent requests cannot race past a limit. Otherwise, or
+    while Redis is unreachable, the local backend is used.
+    """
+
+    REDIS_RETRY_INTERVAL = 30  # Seconds to stay on the local backend after a Redis error
+
+    def __init__(self):
+        self.local = LocalRateLimitBackend()
+        self._scripts = {}
+        self._redis_down_until = 0
+
+    def _get_redis(self):
+        if time.monotonic() < self._redis_down_until:
+            return None
+        backend = settings.CACHES.get('default', {}).get('BACKEND', '')
+        if 'django_redis' not in backend:
+            return None
+        from django_redis import get_redis_connection
+        return get_redis_connection('default')
+
+    def _get_script(self, client, algorithm):
+        script = self._scripts.get(algorithm)
+        if script is None or script.registered_client is not client:
+            script = client.register_script(SCRIPTS[algorithm])
+            self._scripts[algorithm] = script
+        return script
+
+    def _redis_hit(self, client, key, policy, now_ms):
+        script = self._get_script(client, policy.algorithm)
+        if policy.algorithm == SLIDING_WINDOW_LOG:
+            keys = [key]
+            args = [now_ms, policy.period_ms, policy.calls, f'{now_ms}-{uuid.uuid4().hex}']
+        elif policy.algorithm == SLIDING_WINDOW_COUNTER:
+            window = now_ms // policy.period_ms
+            keys = [f'{key}:{window}', f'{key}:{window - 1}']
+            args = [now_ms, policy.period_ms, policy.calls]
+        else:
+            keys = [key]
+            args = [now_ms, policy.burst, policy.calls / policy.period_ms]
+        allowed, remaining, reset_ms, retry_ms = script(keys=keys, args=args)
+        return RateLimitResult(allowed, policy.limit, remaining, reset_ms, retry_ms)
+
+    def hit(self, key, policy):
+        """Record a call against key and report whether it is within the policy"""
+        now_ms = int(time.time() * 1000)
+        try:
+            client = self._get_redis()
+            if client is not None:
+                return self._redis_hit(client, key, policy, now_ms)
+        except RedisError as e:
+            logger.warning(f"Rate limiter falling back to local backend: {e}")
+            self._redis_down_until = time.monotonic() + self.REDIS_RETRY_INTERVAL
+        return self.local.hit(key, policy, now_ms)
+
+
+rate_limiter = RateLimiter()
+
 
 class NotificationRateLimiter:
     @staticmethod
     def can_send(user_id, notification_type, limit=5, period=3600):
         """Check if user hasn't exceeded notification limit"""
         key = f'notification_rate_{user_id}_{notification_type}'
-        count = cache.get(key, 0)
-        
-        if count >= limit:
-            return False
-            
-        cache.set(key, count + 1, period)
-        return True 
\ No newline at end of file
+        policy = RateLimitPolicy(limit, period, algorithm=SLIDING_WINDOW_LOG)
+        return rate_limiter.hit(key, policy).allowed
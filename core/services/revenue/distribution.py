@@ -3,12 +3,24 @@ from django.db.models import Sum, Count, Avg
 from django.utils import timezone
 from django.db import transaction
 from core.models import Revenue, Distribution, ShareOwnership, Transaction, AppListing
+from core.services.revenue.rollup import RevenueRollupService
 from decimal import Decimal
 from django.core.exceptions import ValidationError
+import logging
+import time
+
+logger = logging.getLogger(__name__)
 
 class RevenueDistributionService:
+    # Rows per INSERT when persisting distributions in batched mode
+    DISTRIBUTION_CHUNK_SIZE = 1000
+
     def get_total_revenue(self, user, app_id=None, currency='USD'):
         """Get total revenue for all apps of a user or a specific app"""
+        if currency == 'USD':
+            # Convert per-currency totals to USD, using rollups for closed months
+            return RevenueRollupService.get_total(app_id=app_id, developer=user)
+        
         revenues = Revenue.objects.all()
         
         if app_id:
@@ -16,14 +28,10 @@ class RevenueDistributionService:
         else:
             revenues = revenues.filter(app__developer=user)
             
-        if currency == 'USD':
-            # Convert all revenues to USD
-            total = sum(revenue.get_amount_usd() for revenue in revenues)
-        else:
-            # Only sum revenues in specified currency
-            total = revenues.filter(currency=currency).aggregate(
-                total=Sum('amount')
-            )['total'] or 0
+        # Only sum revenues in specified currency
+        total = revenues.filter(currency=currency).aggregate(
+            total=Sum('amount')
+        )['total'] or 0
             
         return Decimal(str(total))
     
@@ -38,13 +46,13 @@ class RevenueDistributionService:
             revenues = revenues.filter(app__developer=user)
             
         if currency == 'USD':
-            # Convert all revenues to USD
-            total = sum(revenue.get_amount_usd() for revenue in revenues)
-        else:
-            # Only sum revenues in specified currency
-            total = revenues.filter(currency=currency).aggregate(
-                total=Sum('amount')
-            )['total'] or 0
+            # Convert per-currency totals to USD
+            return RevenueRollupService.sum_revenues(revenues)
+        
+        # Only sum revenues in specified currency
+        total = revenues.filter(currency=currency).aggregate(
+            total=Sum('amount')
+        )['total'] or 0
             
         return Decimal(str(total))
     
@@ -53,7 +61,7 @@ class RevenueDistributionService:
         revenues = Revenue.objects.filter(app_id=app_id)
         
         # Basic metrics
-        total_revenue = sum(revenue.get_amount_usd() for revenue in revenues)
+        total_revenue = self.get_total_revenue(None, app_id)
         monthly_revenue = self.get_monthly_revenue(None, app_id)
         
         # Customer metrics
@@ -205,6 +213,88 @@ class RevenueDistributionService:
                 logger.error(f"Distribution failed: {str(e)}")
                 raise
 
+    def calculate_share_distribution_batch(self, app, revenue_amount):
+        """Calculate shareholder allocations from a single ownership query.
+        
+        Returns a list of dicts keyed by recipient_id so that large cap
+        tables never load full User or ShareOwnership instances.
+        """
+        ownerships = list(
+            ShareOwnership.objects.filter(
+                app=app,
+                percentage_owned__gt=0
+            ).order_by('pk').values_list('user_id', 'percentage_owned')
+        )
+        total_owned = sum(percentage for _, percentage in ownerships)
+        
+        if not total_owned:
+            raise ValidationError("No shares found for distribution")
+        
+        revenue_amount = Decimal(revenue_amount)
+        cent = Decimal('0.01')
+        allocations = [
+            {
+                'recipient_id': user_id,
+                'amount': (revenue_amount * percentage / total_owned).quantize(cent),
+                'share_percentage': (percentage / total_owned * Decimal('100')).quantize(cent)
+            }
+            for user_id, percentage in ownerships
+        ]
+        
+        # Adjust last distribution to account for rounding differences
+        difference = revenue_amount - sum(a['amount'] for a in allocations)
+        if difference:
+            allocations[-1]['amount'] += difference
+        
+        return allocations
+    
+    def process_distribution_batched(self, revenue_id, chunk_size=None):
+        """Distribute revenue with bulk inserts for large cap tables.
+        
+        Returns throughput metrics for the run, or None if the revenue
+        has already been distributed.
+        """
+        chunk_size = chunk_size or self.DISTRIBUTION_CHUNK_SIZE
+        started = time.monotonic()
+        
+        with transaction.atomic():
+            revenue = Revenue.objects.select_for_update().get(id=revenue_id)
+            if revenue.is_distributed:
+                return None
+            
+            allocations = self.calculate_share_distribution_batch(revenue.app_id, revenue.amount)
+            Distribution.objects.bulk_create(
+                (
+                    Distribution(
+                        revenue_id=revenue.id,
+                        recipient_id=allocation['recipient_id'],
+                        amount=allocation['amount'],
+                        share_percentage=allocation['share_percentage']
+                    )
+                    for allocation in allocations
+                ),
+                batch_size=chunk_size
+            )
+            
+            Revenue.objects.filter(pk=revenue.pk).update(
+                is_distributed=True,
+                updated_at=timezone.now()
+            )
+        
+        elapsed = time.monotonic() - started
+        metrics = {
+            'revenue_id': revenue_id,
+            'shareholders': len(allocations),
+            'total_distributed': sum(a['amount'] for a in allocations),
+            'elapsed_seconds': elapsed,
+            'shareholders_per_second': len(allocations) / elapsed if elapsed else float(len(allocations))
+        }
+        logger.info(
+            f"Distributed revenue {revenue_id} to {metrics['shareholders']} shareholders "
+            f"in {elapsed:.3f}s ({metrics['shareholders_per_second']:.0f}/s)"
+        )
+        return metrics
+
     def _process_single_distribution(self, distribution):
         """Process a single distribution payment"""
         try:
@@ -256,20 +346,30 @@ class RevenueDistributionService:
         self._process_single_distribution(distribution)
         return True
 
-    def schedule_distributions(self):
-        """Schedule pending distributions for processing"""
+    def schedule_distributions(self, batched=False, chunk_size=None):
+        """Schedule pending distributions for processing
+        
+        In batched mode, returns the throughput metrics of each processed revenue.
+        """
         pending_revenues = Revenue.objects.filter(
             is_distributed=False,
             period_end__lte=timezone.now()
         )
         
-        for revenue in pending_revenues:
+        results = []
+        for revenue_id in pending_revenues.values_list('id', flat=True):
             try:
-                self.process_distribution(revenue.id)
-            except Exception as e:
+                if batched:
+                    metrics = self.process_distribution_batched(revenue_id, chunk_size)
+                    if metrics:
+                        results.append(metrics)
+                else:
+                    self.process_distribution(revenue_id)
+            except Exception:
                 # Log error but continue processing others
-                print(f"Error processing revenue {revenue.id}: {str(e)}")
+                logger.exception(f"Error processing revenue {revenue_id}")
                 continue
+        return results
 
     def get_distribution_history(self, app_id):
         """Get distribution history for an app"""
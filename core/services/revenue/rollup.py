@@ -0,0 +1,160 @@
+from datetime import datetime
+from decimal import Decimal
+from django.db import transaction
+from django.db.models import Sum, Count, Max
+from django.db.models.functions import TruncMonth
+from django.utils import timezone
+from core.models import Revenue, RevenueMonthlyRollup
+from core.utils import get_exchange_rate
+import logging
+
+logger = logging.getLogger(__name__)
+
+class RevenueRollupService:
+    """Currency-aware revenue aggregation backed by monthly rollups.
+
+    Revenue is summed per currency in the database and each currency
+    total is converted once. Closed months are read from
+    RevenueMonthlyRollup, so only the months after the last rollup are
+    aggregated from raw Revenue rows.
+    """
+
+    @staticmethod
+    def month_start(value=None):
+        """Get the start of the month containing value (default: now)"""
+        value = timezone.localtime(value) if value else timezone.localtime()
+        return value.replace(day=1, hour=0, minute=0, second=0, microsecond=0)
+
+    @staticmethod
+    def next_month(month):
+        """Get the first day of the month after the given month start"""
+        if month.month == 12:
+            return month.replace(year=month.year + 1, month=1)
+        return month.replace(month=month.month + 1)
+
+    @staticmethod
+    def to_currency(totals, currency='USD'):
+        """Convert (currency, amount) totals, applying one rate per currency"""
+        converted = Decimal('0')
+        for from_currency, amount in totals:
+            if not amount:
+                continue
+            if from_currency == currency:
+                converted += amount
+            else:
+                converted += Decimal(amount) * get_exchange_rate(from_currency, currency)
+        return converted.quantize(Decimal('0.01'))
+
+    @classmethod
+    def sum_revenues(cls, revenues, currency='USD'):
+        """Sum a Revenue queryset in the target currency, grouped by currency in SQL"""
+        totals = revenues.order_by().values('currency').annotate(total=Sum('amount'))
+        return cls.to_currency(
+            ((row['currency'], row['total']) for row in totals),
+            currency
+        )
+
+    @classmethod
+    def get_rolled_through(cls):
+        """Get the start of the first month not covered by rollups, or None"""
+        latest = RevenueMonthlyRollup.objects.aggregate(month=Max('month'))['month']
+        if latest is None:
+            return None
+        month = timezone.make_aware(datetime(latest.year, latest.month, 1))
+        return cls.next_month(month)
+
+    @classmethod
+    def get_total(cls, app_id=None, developer=None, currency='USD'):
+        """Get all-time revenue for an app or a developer's apps in one currency"""
+        revenues = Revenue.objects.all()
+        rollups = RevenueMonthlyRollup.objects.all()
+        if app_id:
+            revenues = revenues.filter(app_id=app_id)
+            rollups = rollups.filter(app_id=app_id)
+        else:
+            revenues = revenues.filter(app__developer=developer)
+            rollups = rollups.filter(app__developer=developer)
+
+        rolled_through = cls.get_rolled_through()
+        if rolled_through is None:
+            return cls.sum_revenues(revenues, currency)
+
+        historic = rollups.filter(
+            month__lt=rolled_through.date()
+        ).order_by().values('currency').annotate(total=Sum('total_amount'))
+        historic_total = cls.to_currency(
+            ((row['currency'], row['total']) for row in historic),
+            currency
+        )
+        live_total = cls.sum_revenues(revenues.filter(created_at__gte=rolled_through), currency)
+        return historic_total + live_total
+
+    @classmethod
+    def _aggregate_months(cls, revenues):
+        return revenues.order_by().annotate(
+            rollup_month=TruncMonth('created_at')
+        ).values('app_id', 'rollup_month', 'currency').annotate(
+            total=Sum('amount'),
+            count=Count('id'),
+            customers=Sum('customer_count')
+        )
+
+    @classmethod
+    def _store(cls, rows):
+        stored = 0
+        for row in rows:
+            RevenueMonthlyRollup.objects.update_or_create(
+                app_id=row['app_id'],
+                month=timezone.localtime(row['rollup_month']).date(),
+                currency=row['currency'],
+                defaults={
+                    'total_amount': row['total'] or Decimal('0.00'),
+                    'revenue_count': row['count'],
+                    'customer_count': row['customers'] or 0
+                }
+            )
+            stored += 1
+        return stored
+
+    @classmethod
+    def build_rollups(cls, rebuild=False):
+        """Roll up every closed month that is not yet covered.
+
+        Returns the number of rollup rows written.
+        """
+        current_month = cls.month_start()
+        with transaction.atomic():
+            if rebuild:
+                RevenueMonthlyRollup.objects.all().delete()
+                rolled_through = None
+            else:
+                rolled_through = cls.get_rolled_through()
+
+            revenues = Revenue.objects.filter(created_at__lt=current_month)
+            if rolled_through:
+                revenues = revenues.filter(created_at__gte=rolled_through)
+            stored = cls._store(cls._aggregate_months(revenues))
+
+        logger.info(f"Stored {stored} revenue rollup rows before {current_month:%Y-%m}")
+        return stored
+
+    @classmethod
+    def refresh_month(cls, app_id, created_at):
+        """Recompute an app's rollup for the month of a changed revenue record.
+
+        Months that are not rolled up yet are read live and need no refresh.
+        """
+        rolled_through = cls.get_rolled_through()
+        if rolled_through is None or created_at is None or created_at >= rolled_through:
+            return
+
+        month = cls.month_start(created_at)
+        with transaction.atomic():
+            RevenueMonthlyRollup.objects.filter(app_id=app_id, month=month.date()).delete()
+            cls._store(cls._aggregate_months(
+                Revenue.objects.filter(
+                    app_id=app_id,
+                    created_at__gte=month,
+                    created_at__lt=cls.next_month(month)
+                )
+            ))
@@ -3,10 +3,22 @@ from django.db.models.functions import Lower
 from django.contrib.postgres.search import SearchVector, SearchQuery, SearchRank
 from django.conf import settings
 from ..models import AppListing, User
+from .search_index import app_search_index
+from .autocomplete import AutocompleteService
+from .search_trends import search_trends
+from .search_cache import SearchResultCache
+from ..pagination import KeysetPaginator, InvalidCursor, decode_cursor, encode_cursor, estimated_count
+
+# Listing statuses shown in search results
+SEARCHABLE_STATUSES = ('APPROVED', 'ACTIVE')
 
 class SearchService:
     @staticmethod
-    def search_apps(query=None, filters=None, sort_by=None, page=1, per_page=10):
+    def using_postgres():
+        return settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql'
+
+    @staticmethod
+    def search_apps(query=None, filters=None, sort_by=None, page=1, per_page=10, cursor=None):
         """
         Advanced search with filters and ranking
         
@@ -14,40 +26,57 @@ class SearchService:
         - query: Search text
         - filters: Dict of filters (category, price_range, status, etc.)
         - sort_by: Sorting criteria
-        - page: Page number
+        - page: Page number, for links made before cursors; prefer cursor
         - per_page: Items per page
+        - cursor: next_cursor or previous_cursor of an earlier result
+        
+        Results are cached as id lists until a listing or investment changes.
         """
+        cache_key = SearchResultCache.key(query, filters, sort_by, page, per_page, cursor)
+        cached = SearchResultCache.get(cache_key)
+        if cached is not None:
+            return SearchResultCache.hydrate(cached)
+        
+        results = SearchService._search_apps(query, filters, sort_by, page, per_page, cursor)
+        results['results'] = list(results['results'])
+        if not results.pop('fallback', False):
+            SearchResultCache.set(cache_key, results)
+        return results
+    
+    @staticmethod
+    def _search_apps(query, filters, sort_by, page, per_page, cursor):
+        """Uncached search_apps"""
+        fallback = False
+        if query and not SearchService.using_postgres():
+            if app_search_index.ensure_fresh():
+                # MySQL/SQLite: ranked search over the in-process inverted index
+                return SearchService._search_index(query, filters or {}, sort_by, page, per_page, cursor)
+            # The index is still being built in the background
+            fallback = True
+        
         # Start with approved and active apps
-        queryset = AppListing.objects.filter(Q(status='APPROVED') | Q(status='ACTIVE'))
-        
-        if query:
-            # Check if using PostgreSQL
-            if settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
-                # PostgreSQL full-text search
-                search_vector = SearchVector('name', weight='A') + \
-                              SearchVector('description', weight='B') + \
-                              SearchVector('ai_features', weight='B') + \
-                              SearchVector('category', weight='C')
-                
-                search_query = SearchQuery(query)
-                
-                # Apply full-text search with ranking
-                queryset = queryset.annotate(
-                    rank=SearchRank(search_vector, search_query)
-                ).filter(rank__gt=0.1)
-            else:
-                # SQLite fallback using basic text search
-                q_objects = Q()
-                search_fields = ['name', 'description', 'ai_features', 'category']
-                
-                for term in query.split():
-                    for field in search_fields:
-                        q_objects |= Q(**{f"{field}__icontains": term})
-                
-                queryset = queryset.filter(q_objects).annotate(
-                    # Simple relevance score based on exact matches
-                    rank=Count('id')
-                )
+        queryset = AppListing.objects.filter(status__in=SEARCHABLE_STATUSES)
+        
+        if query and fallback:
+            # Unranked substring match until the index is ready
+            q_objects = Q()
+            for term in query.split():
+                for field in ('name', 'description', 'ai_features', 'category'):
+                    q_objects |= Q(**{f"{field}__icontains": term})
+            queryset = queryset.filter(q_objects)
+        elif query:
+            # PostgreSQL full-text search
+            search_vector = SearchVector('name', weight='A') + \
+                          SearchVector('description', weight='B') + \
+                          SearchVector('ai_features', weight='B') + \
+                          SearchVector('category', weight='C')
+            
+            search_query = SearchQuery(query)
+            
+            # Apply full-text search with ranking
+            queryset = queryset.annotate(
+                rank=SearchRank(search_vector, search_query)
+            ).filter(rank__gt=0.1)
         
         # Apply filters
         if filters:
@@ -66,44 +95,113 @@ class SearchService:
                     total_investment=Count('investment')
                 ).filter(total_investment__gte=filters['min_funding'])
         
-        # Apply sorting
-        if sort_by:
-            if sort_by == 'newest':
-                queryset = queryset.order_by('-created_at')
-            elif sort_by == 'popular':
-                queryset = queryset.annotate(
-                    investor_count=Count('investment__investor', distinct=True)
-                ).order_by('-investor_count')
-            elif sort_by == 'funding':
-                queryset = queryset.annotate(
-                    total_investment=Count('investment')
-                ).order_by('-total_investment')
-            elif sort_by == 'relevance' and query:
-                if settings.DATABASES['default']['ENGINE'] == 'django.db.backends.postgresql':
-                    queryset = queryset.order_by('-rank')
-                else:
-                    # For SQLite, order by multiple fields for better relevance
-                    queryset = queryset.order_by('-rank', '-created_at')
+        # Apply sorting; the ordering doubles as the pagination key
+        if sort_by == 'popular':
+            ordering = ('-investor_count', '-id')
+        elif sort_by == 'funding':
+            if 'total_investment' not in queryset.query.annotations:
+                queryset = queryset.annotate(total_investment=Count('investment'))
+            ordering = ('-total_investment', '-id')
+        elif sort_by == 'relevance' and query and not fallback:
+            ordering = ('-rank', '-id')
         else:
             # Default sorting
-            queryset = queryset.order_by('-created_at')
+            ordering = ('-created_at', '-id')
         
-        # Calculate total results and pages
-        total_results = queryset.count()
+        total_results = estimated_count(queryset, version=SearchResultCache.generation())
         total_pages = (total_results + per_page - 1) // per_page
         
-        # Apply pagination
-        start = (page - 1) * per_page
-        end = start + per_page
-        results = queryset[start:end]
+        if cursor or page == 1:
+            try:
+                keyset_page = KeysetPaginator(queryset, per_page, ordering).page(cursor)
+            except InvalidCursor:
+                keyset_page = KeysetPaginator(queryset, per_page, ordering).page()
+            return {
+                'results': keyset_page.object_list,
+                'total_results': total_results,
+                'total_pages': total_pages,
+                'current_page': page,
+                'has_next': keyset_page.has_next,
+                'has_previous': keyset_page.has_previous,
+                'next_cursor': keyset_page.next_cursor,
+                'previous_cursor': keyset_page.previous_cursor,
+                'fallback': fallback
+            }
         
+        start = (page - 1) * per_page
+        results = queryset.order_by(*ordering)[start:start + per_page]
         return {
             'results': results,
             'total_results': total_results,
             'total_pages': total_pages,
             'current_page': page,
             'has_next': page < total_pages,
-            'has_previous': page > 1
+            'has_previous': page > 1,
+            'next_cursor': None,
+            'previous_cursor': None,
+            'fallback': fallback
+        }
+    
+    @staticmethod
+    def _search_index(query, filters, sort_by, page, per_page, cursor=None):
+        """search_apps over the inverted index; filters are applied inside the index
+        
+        The ranked hits are in memory, so a cursor simply carries the offset.
+        """
+        statuses = [
+            status for status in SEARCHABLE_STATUSES
+            if 'status' not in filters or status == filters['status']
+        ]
+        hits = app_search_index.search(
+            query,
+            statuses=statuses,
+            category=filters.get('category'),
+            price_range=filters.get('price_range')
+        ) if statuses else []
+        
+        if hits and ('min_funding' in filters or sort_by == 'funding'):
+            # Investment counts are not indexed; fetch them for the matches only
+            investments = dict(
+                AppListing.objects.filter(id__in=[app_id for app_id, _ in hits])
+                .annotate(total_investment=Count('investment'))
+                .values_list('id', 'total_investment')
+            )
+            if 'min_funding' in filters:
+                hits = [hit for hit in hits if investments.get(hit[0], 0) >= filters['min_funding']]
+            if sort_by == 'funding':
+                hits = sorted(hits, key=lambda hit: (investments.get(hit[0], 0), hit[0]), reverse=True)
+        
+        if sort_by in ('newest', 'popular') or not sort_by:
+            hits = app_search_index.order(hits, sort_by)
+        
+        total_results = len(hits)
+        total_pages = (total_results + per_page - 1) // per_page
+        start = (page - 1) * per_page
+        if cursor:
+            try:
+                start = max(int(decode_cursor(cursor)['o']), 0)
+            except (InvalidCursor, KeyError, TypeError, ValueError):
+                pass
+            page = start // per_page + 1
+        page_hits = hits[start:start + per_page]
+        
+        apps = AppListing.objects.in_bulk([app_id for app_id, _ in page_hits])
+        results = []
+        for app_id, score in page_hits:
+            app = apps.get(app_id)
+            if app is not None:
+                app.rank = score
+                results.append(app)
+        
+        return {
+            'results': results,
+            'total_results': total_results,
+            'total_pages': total_pages,
+            'current_page': page,
+            'has_next': start + per_page < total_results,
+            'has_previous': start > 0,
+            'next_cursor': encode_cursor({'o': start + per_page}) if start + per_page < total_results else None,
+            'previous_cursor': encode_cursor({'o': max(start - per_page, 0)}) if start > 0 else None
         }
     
     @staticmethod
@@ -111,6 +209,8 @@ class SearchService:
         """
         Get autocomplete suggestions based on partial query
         
+        Served from the in-memory autocomplete trie, ranked by popularity.
+        
         Parameters:
         - partial_query: Partial search text
         - limit: Maximum number of suggestions
@@ -118,26 +218,17 @@ class SearchService:
         if not partial_query or len(partial_query) < 2:
             return []
         
-        # Search in app names
-        app_suggestions = AppListing.objects.filter(
-            name__icontains=partial_query
-        ).values_list('name', flat=True)[:limit]
-        
-        # Search in categories
-        category_suggestions = AppListing.objects.filter(
-            category__icontains=partial_query
-        ).values_list('category', flat=True).distinct()[:limit]
-        
-        # Combine and deduplicate suggestions
-        suggestions = list(set(list(app_suggestions) + list(category_suggestions)))[:limit]
-        
-        return [{'text': s, 'type': 'suggestion'} for s in suggestions]
+        return AutocompleteService.suggest(partial_query, limit)
+    
+    @staticmethod
+    def record_search(query):
+        """Count a search towards trending searches"""
+        search_trends.record(query)
     
     @staticmethod
     def get_trending_searches(limit=5):
-        """Get trending search terms"""
-        # This would typically use a cache or database of recent searches
-        # For now, return popular categories
-        return AppListing.objects.values('category').annotate(
-            count=Count('id')
-        ).order_by('-count')[:limit] 
\ No newline at end of file
+        """Get trending search terms, most searched first"""
+        return [
+            {'query': query, 'score': round(score, 2)}
+            for query, score in search_trends.trending(limit)
+        ]
@@ -0,0 +1,104 @@
+from django.core.cache import cache
+from .autocomplete import normalize
+import hashlib
+import json
+
+
+class SearchResultCache:
+    """Caches search_apps results as id lists plus pagination totals.
+
+    Keys include a generation counter that listing and investment changes
+    bump (see core.signals), which orphans every cached result at once;
+    orphaned entries simply expire. Rows are hydrated with one in_bulk
+    query on a hit, so cached pages always show current listing data.
+    """
+
+    GENERATION_KEY = 'search_cache:generation'
+    STATS_KEY = 'search_cache:{outcome}'
+    TIMEOUT = 300
+    STATS_TIMEOUT = 60 * 60 * 24
+
+    @staticmethod
+    def _normalize_filters(filters):
+        normalized = {}
+        for name, value in (filters or {}).items():
+            if name == 'price_range':
+                value = [str(bound) for bound in value]
+            elif isinstance(value, str):
+                value = value.strip()
+            normalized[name] = value
+        return normalized
+
+    @classmethod
+    def generation(cls):
+        return cache.get(cls.GENERATION_KEY, 0)
+
+    @classmethod
+    def key(cls, query, filters, sort_by, page, per_page, cursor):
+        generation = cls.generation()
+        params = json.dumps(
+            [normalize(query), cls._normalize_filters(filters), sort_by or '', page, per_page, cursor or ''],
+            sort_keys=True,
+            default=str
+        )
+        return f'search_cache:{generation}:{hashlib.md5(params.encode()).hexdigest()}'
+
+    @classmethod
+    def get(cls, key):
+        entry = cache.get(key)
+        cls.record('hits' if entry is not None else 'misses')
+        return entry
+
+    @classmethod
+    def set(cls, key, results):
+        """Store a search_apps result with its rows reduced to ids and ranks"""
+        entry = dict(results)
+        entry['results'] = [(app.id, getattr(app, 'rank', None)) for app in results['results']]
+        cache.set(key, entry, cls.TIMEOUT)
+
+    @staticmethod
+    def hydrate(entry):
+        """A search_apps result from a cached entry, with rows loaded in one query"""
+        from ..models import AppListing
+
+        apps = AppListing.objects.in_bulk([app_id for app_id, _ in entry['results']])
+        results = []
+        for app_id, rank in entry['results']:
+            app = apps.get(app_id)
+            if app is None:
+                continue
+            if rank is not None:
+                app.rank = rank
+            results.append(app)
+        return dict(entry, results=results)
+
+    @classmethod
+    def invalidate(cls):
+        if cache.add(cls.GENERATION_KEY, 1, timeout=None):
+            return
+        try:
+            cache.incr(cls.GENERATION_KEY)
+        except ValueError:
+            cache.set(cls.GENERATION_KEY, 1, timeout=None)
+
+    @classmethod
+    def record(cls, outcome):
+        key = cls.STATS_KEY.format(outcome=outcome)
+        if cache.add(key, 1, timeout=cls.STATS_TIMEOUT):
+            return
+        try:
+            cache.incr(key)
+        except ValueError:
+            cache.set(key, 1, timeout=cls.STATS_TIMEOUT)
+
+    @classmethod
+    def stats(cls):
+        values = cache.get_many([cls.STATS_KEY.format(outcome=outcome) for outcome in ('hits', 'misses')])
+        hits = values.get(cls.STATS_KEY.format(outcome='hits'), 0)
+        misses = values.get(cls.STATS_KEY.format(outcome='misses'), 0)
+        total = hits + misses
+        return {
+            'hits': hits,
+            'misses': misses,
+            'hit_rate': (hits / total * 100) if total > 0 else 0,
+        }
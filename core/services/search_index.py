@@ -0,0 +1,392 @@
+from bisect import bisect_left
+from collections import defaultdict
+from django.conf import settings
+from django.core.cache import cache
+from django.db import connections
+import math
+import re
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+TOKEN_PATTERN = re.compile(r'\w+')
+STOP_WORDS = frozenset({
+    'a', 'an', 'and', 'are', 'as', 'at', 'be', 'by', 'for', 'from', 'in', 'is',
+    'it', 'of', 'on', 'or', 'that', 'the', 'to', 'with',
+})
+
+
+def tokenize(text):
+    """Lowercased word tokens without stop words"""
+    return [
+        token for token in TOKEN_PATTERN.findall((text or '').lower())
+        if token not in STOP_WORDS
+    ]
+
+
+class InvertedIndex:
+    """In-memory inverted index with BM25F ranking.
+
+    Each document has weighted text fields and a dict of attributes.
+    Postings map a term to the weighted term frequency in each document.
+    Attributes listed in FACETS are also indexed as value -> doc id sets,
+    so equality filters narrow the candidates before any scoring.
+    """
+
+    K1 = 1.2
+    B = 0.75
+    PREFIX_WEIGHT = 0.7  # Score share of a prefix match relative to an exact match
+    MAX_PREFIX_EXPANSIONS = 50
+    MIN_PREFIX_LENGTH = 2
+
+    def __init__(self, field_weights, facets=()):
+        self.field_weights = field_weights
+        self.facets = tuple(facets)
+        self._lock = threading.RLock()
+        self.clear()
+
+    def clear(self):
+        with self._lock:
+            self.postings = defaultdict(dict)
+            self.doc_terms = {}
+            self.doc_lengths = {}
+            self.attributes = {}
+            self.facet_index = {facet: defaultdict(set) for facet in self.facets}
+            self._total_length = 0.0
+            self._sorted_terms = None
+
+    def __len__(self):
+        return len(self.doc_lengths)
+
+    def __contains__(self, doc_id):
+        return doc_id in self.doc_lengths
+
+    def add(self, doc_id, fields, attributes=None):
+        """Index a document, replacing any previous version of it"""
+        term_weights = defaultdict(float)
+        for field, weight in self.field_weights.items():
+            for token in tokenize(fields.get(field)):
+                term_weights[token] += weight
+
+        with self._lock:
+            self.remove(doc_id)
+            for term, weight in term_weights.items():
+                if term not in self.postings:
+                    self._sorted_terms = None
+                self.postings[term][doc_id] = weight
+            self.doc_terms[doc_id] = list(term_weights)
+            length = sum(term_weights.values())
+            self.doc_lengths[doc_id] = length
+            self._total_length += length
+            self.attributes[doc_id] = attributes or {}
+            for facet in self.facets:
+                self.facet_index[facet][self.attributes[doc_id].get(facet)].add(doc_id)
+
+    def remove(self, doc_id):
+        with self._lock:
+            if doc_id not in self.doc_lengths:
+                return
+            for term in self.doc_terms.pop(doc_id):
+                del self.postings[term][doc_id]
+                if not self.postings[term]:
+                    del self.postings[term]
+                    self._sorted_terms = None
+            self._total_length -= self.doc_lengths.pop(doc_id)
+            attributes = self.attributes.pop(doc_id)
+            for facet in self.facets:
+                docs = self.facet_index[facet].get(attributes.get(facet))
+                if docs is not None:
+                    docs.discard(doc_id)
+
+    def _expand(self, token):
+        """The token itself plus up to MAX_PREFIX_EXPANSIONS longer terms it prefixes"""
+        expansions = []
+        if token in self.postings:
+            expansions.append((token, 1.0))
+        if len(token) < self.MIN_PREFIX_LENGTH:
+            return expansions
+
+        if self._sorted_terms is None:
+            self._sorted_terms = sorted(self.postings)
+        position = bisect_left(self._sorted_terms, token)
+        while position < len(self._sorted_terms) and len(expansions) < self.MAX_PREFIX_EXPANSIONS:
+            term = self._sorted_terms[position]
+            if not term.startswith(token):
+                break
+            if term != token:
+                expansions.append((term, self.PREFIX_WEIGHT))
+            position += 1
+        return expansions
+
+    def candidates(self, facets=None, predicate=None):
+        """Doc ids passing the facet filters ({facet: value or set of values}) and predicate"""
+        with self._lock:
+            allowed = None
+            for facet, values in (facets or {}).items():
+                if not isinstance(values, (set, frozenset, list, tuple)):
+                    values = [values]
+                matching = set()
+                for value in values:
+                    matching |= self.facet_index[facet].get(value, set())
+                allowed = matching if allowed is None else allowed & matching
+            if allowed is None:
+                allowed = set(self.doc_lengths)
+            if predicate is not None:
+                allowed = {doc_id for doc_id in allowed if predicate(self.attributes[doc_id])}
+            return allowed
+
+    def search(self, query, facets=None, predicate=None):
+        """Matching doc ids and BM25 scores, best first.
+
+        A document matches if any query term (or a term it prefixes) occurs
+        in it. Filters are applied before scoring.
+        """
+        tokens = tokenize(query)
+        if not tokens:
+            return []
+
+        with self._lock:
+            allowed = self.candidates(facets, predicate) if (facets or predicate) else None
+            doc_count = len(self.doc_lengths)
+            if not doc_count:
+                return []
+            average_length = self._total_length / doc_count or 1.0
+
+            scores = defaultdict(float)
+            for token in dict.fromkeys(tokens):
+                for term, term_weight in self._expand(token):
+                    docs = self.postings[term]
+                    idf = math.log(1 + (doc_count - len(docs) + 0.5) / (len(docs) + 0.5))
+                    for doc_id, frequency in docs.items():
+                        if allowed is not None and doc_id not in allowed:
+                            continue
+                        norm = self.K1 * (1 - self.B + self.B * self.doc_lengths[doc_id] / average_length)
+                        scores[doc_id] += term_weight * idf * frequency * (self.K1 + 1) / (frequency + norm)
+
+        return sorted(scores.items(), key=lambda item: (-item[1], -item[0]))
+
+    def attribute(self, doc_id, name):
+        return self.attributes.get(doc_id, {}).get(name)
+
+
+class AppSearchIndex:
+    """Process-local search index over AppListing, kept fresh incrementally.
+
+    Saves and deletes in this process update the index straight away (see
+    core.signals), bump a generation counter in the shared cache and log
+    the changed listing id under the new generation. Other processes
+    notice the new generation on their next search and reindex just the
+    logged ids. A process that has fallen too far behind, or finds part
+    of the log expired, rebuilds instead, as does every process every
+    MAX_AGE seconds to catch queryset updates that bypass signals.
+    Rebuilds run in a background thread; until the first one finishes,
+    callers fall back to the database (see ensure_fresh).
+    """
+
+    FIELD_WEIGHTS = {'name': 3.0, 'category': 1.5, 'ai_features': 1.0, 'description': 1.0}
+    FACETS = ('status', 'category')
+    # Listing fields the index (or search filtering and sorting) reads
+    INDEXED_FIELDS = frozenset({
+        'name', 'description', 'ai_features', 'category', 'status',
+        'price_per_percentage', 'investor_count',
+    })
+    GENERATION_KEY = 'search_index:app_listing:generation'
+    CHANGE_KEY = 'search_index:app_listing:change:{generation}'
+    CHANGE_TIMEOUT = 60 * 60
+    MAX_SYNC_CHANGES = 500
+    MAX_AGE = 300
+
+    def __init__(self):
+        self.index = InvertedIndex(self.FIELD_WEIGHTS, self.FACETS)
+        self._lock = threading.Lock()
+        self._state_lock = threading.Lock()
+        self._rebuilding = False
+        self._generation = None
+        self._built_at = None
+
+    @staticmethod
+    def _documents(queryset):
+        for app in queryset.values(
+            'id', 'name', 'description', 'ai_features', 'category', 'status',
+            'price_per_percentage', 'investor_count', 'created_at'
+        ).iterator(chunk_size=500):
+            yield app['id'], app
+
+    def _index_document(self, app, index=None):
+        (self.index if index is None else index).add(
+            app['id'],
+            {field: app[field] for field in self.FIELD_WEIGHTS},
+            {
+                'status': app['status'],
+                'category': app['category'],
+                'price_per_percentage': app['price_per_percentage'],
+                'investor_count': app['investor_count'],
+                'created_at': app['created_at'],
+            }
+        )
+
+    def rebuild(self):
+        """Build a fresh index and swap it in; searches keep using the old one meanwhile"""
+        from ..models import AppListing
+
+        started = time.perf_counter()
+        # Read before the rows, so changes made during the build are replayed by sync()
+        generation = cache.get(self.GENERATION_KEY, 0)
+        index = InvertedIndex(self.FIELD_WEIGHTS, self.FACETS)
+        for app_id, app in self._documents(AppListing.objects.all()):
+            self._index_document(app, index)
+        with self._lock:
+            self.index = index
+            self._generation = generation
+            self._built_at = time.monotonic()
+        logger.info(
+            f"Built app search index: {len(index)} listings in "
+            f"{(time.perf_counter() - started) * 1000:.1f}ms"
+        )
+
+    def start_rebuild(self):
+        """Rebuild in a background thread unless one is already running.
+
+        With SEARCH_INDEX_BACKGROUND_BUILD off (tests) the rebuild runs
+        in the calling thread instead.
+        """
+        if not getattr(settings, 'SEARCH_INDEX_BACKGROUND_BUILD', True):
+            self.rebuild()
+            return
+        with self._state_lock:
+            if self._rebuilding:
+                return
+            self._rebuilding = True
+        threading.Thread(target=self._background_rebuild, name='search-index-build', daemon=True).start()
+
+    def _background_rebuild(self):
+        try:
+            self.rebuild()
+        except Exception as e:
+            logger.error(f"Error building app search index: {str(e)}")
+        finally:
+            with self._state_lock:
+                self._rebuilding = False
+            # The build thread exits, so its connections must not be kept open
+            connections.close_all()
+
+    @property
+    def is_ready(self):
+        return self._built_at is not None
+
+    def _reindex(self, app_ids):
+        """Reload the given listings, dropping any that no longer exist"""
+        from ..models import AppListing
+
+        app_ids = set(app_ids)
+        for app_id, app in self._documents(AppListing.objects.filter(id__in=app_ids)):
+            self._index_document(app)
+            app_ids.discard(app_id)
+        for app_id in app_ids:
+            self.index.remove(app_id)
+
+    def sync(self):
+        """Apply changes logged by other processes since the last sync.
+
+        Returns the number of listings reindexed. A process too far behind,
+        or missing part of the log, starts a rebuild instead.
+        """
+        if cache.get(self.GENERATION_KEY, 0) == self._generation:
+            return 0
+        with self._lock:
+            if self._generation is None:
+                return 0
+            generation = cache.get(self.GENERATION_KEY, 0)
+            if generation == self._generation:
+                return 0
+            missed = range(self._generation + 1, generation + 1)
+            changes = None
+            if self._generation < generation and len(missed) <= self.MAX_SYNC_CHANGES:
+                changes = cache.get_many([
+                    self.CHANGE_KEY.format(generation=missed_generation) for missed_generation in missed
+                ])
+            if changes is not None and len(changes) == len(missed):
+                app_ids = {app_id for ids in changes.values() for app_id in ids}
+                self._reindex(app_ids)
+                self._generation = generation
+                return len(app_ids)
+        # Behind by too much, the counter was reset, or part of the log has
+        # expired or was never written
+        self.start_rebuild()
+        return 0
+
+    def ensure_fresh(self):
+        """Bring the index up to date; False while it has not been built yet.
+
+        Builds never run on the calling thread: a cold or stale index
+        starts a background rebuild and a stale one keeps being served
+        until the new one is swapped in.
+        """
+        if self._built_at is None:
+            self.start_rebuild()
+            return self.is_ready
+        if time.monotonic() - self._built_at > self.MAX_AGE:
+            self.start_rebuild()
+        self.sync()
+        return True
+
+    def update(self, app):
+        """Reindex one listing saved in this process"""
+        self.update_ids([app.id])
+
+    def update_ids(self, app_ids):
+        """Reindex listings changed in this process"""
+        with self._lock:
+            if self._built_at is not None:
+                self._reindex(app_ids)
+        self._log_change(app_ids)
+
+    def delete(self, app_id):
+        with self._lock:
+            self.index.remove(app_id)
+        self._log_change([app_id])
+
+    def _log_change(self, app_ids):
+        try:
+            generation = cache.incr(self.GENERATION_KEY)
+        except ValueError:
+            cache.add(self.GENERATION_KEY, 0, timeout=None)
+            generation = cache.incr(self.GENERATION_KEY)
+        cache.set(self.CHANGE_KEY.format(generation=generation), list(app_ids), self.CHANGE_TIMEOUT)
+        with self._lock:
+            # This process already has its own change; a sync is only needed
+            # if another process bumped the counter in between
+            if self._generation is not None and generation == self._generation + 1:
+                self._generation = generation
+
+    def search(self, query, statuses=None, category=None, price_range=None):
+        """Ranked (app id, score) pairs with filters pushed into the index; call ensure_fresh() first"""
+        facets = {}
+        if statuses:
+            facets['status'] = statuses
+        if category:
+            facets['category'] = category
+
+        predicate = None
+        if price_range:
+            min_price, max_price = price_range
+
+            def predicate(attributes):
+                price = attributes['price_per_percentage']
+                return price is not None and min_price <= price <= max_price
+
+        return self.index.search(query, facets=facets, predicate=predicate)
+
+    def order(self, hits, sort_by):
+        """Order hits by an indexed attribute, highest first: 'popular' or newest"""
+        attribute = 'investor_count' if sort_by == 'popular' else 'created_at'
+        return sorted(
+            hits,
+            key=lambda hit: (self.index.attribute(hit[0], attribute) or 0, hit[0]),
+            reverse=True
+        )
+
+
+app_search_index = AppSearchIndex()
@@ -0,0 +1,204 @@
+from collections import Counter
+from django.core.cache import cache
+from .autocomplete import normalize
+import hashlib
+import heapq
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class CountMinSketch:
+    """Approximate frequency counts in a fixed depth x width table.
+
+    Estimates never undercount; with the default size they overcount by at
+    most about 0.1% of the bucket's total in 99% of lookups.
+    """
+
+    def __init__(self, width=2048, depth=5, rows=None):
+        self.width = width
+        self.depth = depth
+        self.rows = rows or [[0] * width for _ in range(depth)]
+
+    def _columns(self, item):
+        digest = hashlib.blake2b(item.encode(), digest_size=4 * self.depth).digest()
+        return [
+            int.from_bytes(digest[4 * row:4 * row + 4], 'little') % self.width
+            for row in range(self.depth)
+        ]
+
+    def add(self, item, count=1):
+        """Count an item and return its new estimate"""
+        estimate = None
+        for row, column in zip(self.rows, self._columns(item)):
+            row[column] += count
+            estimate = row[column] if estimate is None else min(estimate, row[column])
+        return estimate
+
+    def estimate(self, item):
+        return min(row[column] for row, column in zip(self.rows, self._columns(item)))
+
+    def to_dict(self):
+        return {'width': self.width, 'depth': self.depth, 'rows': self.rows}
+
+    @classmethod
+    def from_dict(cls, data):
+        return cls(data['width'], data['depth'], data['rows'])
+
+
+class TopK:
+    """The k items with the highest estimates seen so far, as a min-heap"""
+
+    def __init__(self, k, items=None):
+        self.k = k
+        self.heap = [(estimate, item) for item, estimate in (items or {}).items()]
+        heapq.heapify(self.heap)
+        self.estimates = dict(items or {})
+
+    def offer(self, item, estimate):
+        if item in self.estimates:
+            self.estimates[item] = estimate
+            self.heap = [(estimate, item) for item, estimate in self.estimates.items()]
+            heapq.heapify(self.heap)
+        elif len(self.heap) < self.k:
+            self.estimates[item] = estimate
+            heapq.heappush(self.heap, (estimate, item))
+        elif estimate > self.heap[0][0]:
+            _, evicted = heapq.heapreplace(self.heap, (estimate, item))
+            del self.estimates[evicted]
+            self.estimates[item] = estimate
+
+    def items(self):
+        return sorted(self.estimates.items(), key=lambda item: (-item[1], item[0]))
+
+
+class SearchTrends:
+    """Counts normalized search queries per hourly bucket.
+
+    Queries are buffered per process and merged into the bucket's shared
+    Count-Min sketch and top-K list at most every FLUSH_INTERVAL seconds
+    (or once FLUSH_SIZE queries are buffered), so recording a search costs
+    a dict increment. Trending queries weight recent buckets higher.
+    """
+
+    BUCKET_SECONDS = 3600
+    RETENTION_BUCKETS = 24
+    TOP_K = 50
+    FLUSH_INTERVAL = 30
+    FLUSH_SIZE = 500
+    DECAY = 0.8  # Weight of each bucket relative to the next newer one
+    MAX_QUERY_LENGTH = 100
+    LOCK_TIMEOUT = 10
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._buffers = {}  # bucket -> Counter of terms
+        self._current_bucket = None
+        self._flushed_at = time.monotonic()
+
+    def bucket_for(self, timestamp=None):
+        timestamp = time.time() if timestamp is None else timestamp
+        return int(timestamp // self.BUCKET_SECONDS) * self.BUCKET_SECONDS
+
+    @staticmethod
+    def bucket_key(bucket):
+        return f'search_trends:bucket:{bucket}'
+
+    def record(self, query):
+        term = normalize(query)[:self.MAX_QUERY_LENGTH]
+        if len(term) < 2:
+            return
+        bucket = self.bucket_for()
+        with self._lock:
+            # Each bucket keeps its own buffer, so counts that could not be
+            # flushed before the hour turned still land in their own hour
+            new_bucket = self._current_bucket not in (None, bucket)
+            self._current_bucket = bucket
+            buffer = self._buffers.get(bucket)
+            if buffer is None:
+                buffer = self._buffers[bucket] = Counter()
+            buffer[term] += 1
+            due = (
+                new_bucket or
+                sum(sum(buffer.values()) for buffer in self._buffers.values()) >= self.FLUSH_SIZE or
+                time.monotonic() - self._flushed_at >= self.FLUSH_INTERVAL
+            )
+            if due:
+                self._flush_locked()
+
+    def flush(self):
+        """Merge this process's buffered queries into the shared buckets"""
+        with self._lock:
+            return self._flush_locked()
+
+    def _flush_locked(self):
+        self._flushed_at = time.monotonic()
+        oldest = self.bucket_for() - self.RETENTION_BUCKETS * self.BUCKET_SECONDS
+        flushed = 0
+        for bucket in sorted(self._buffers):
+            buffer = self._buffers[bucket]
+            if bucket < oldest:
+                # Past retention; nothing reads that bucket any more
+                del self._buffers[bucket]
+            elif self._merge(bucket, buffer):
+                flushed += sum(buffer.values())
+                del self._buffers[bucket]
+        return flushed
+
+    def _merge(self, bucket, buffer):
+        """Add buffered counts to a bucket's shared state; False if another process holds it"""
+        key = self.bucket_key(bucket)
+        lock_key = f'{key}:lock'
+        if not cache.add(lock_key, True, self.LOCK_TIMEOUT):
+            # Another process is flushing this bucket; keep buffering
+            return False
+        try:
+            state = cache.get(key)
+            sketch = CountMinSketch.from_dict(state['sketch']) if state else CountMinSketch()
+            top = TopK(self.TOP_K, state['top'] if state else None)
+            for term, count in buffer.items():
+                top.offer(term, sketch.add(term, count))
+            cache.set(
+                key,
+                {'sketch': sketch.to_dict(), 'top': dict(top.items())},
+                timeout=self.BUCKET_SECONDS * (self.RETENTION_BUCKETS + 1)
+            )
+        finally:
+            cache.delete(lock_key)
+        return True
+
+    def trending(self, limit=10, buckets=None):
+        """[(query, score)] over the last `buckets` buckets, recent ones weighted higher"""
+        current = self.bucket_for()
+        keys = [
+            self.bucket_key(current - age * self.BUCKET_SECONDS)
+            for age in range(buckets or self.RETENTION_BUCKETS)
+        ]
+        states = cache.get_many(keys)
+        scores = Counter()
+        for age, key in enumerate(keys):
+            state = states.get(key)
+            if state:
+                weight = self.DECAY ** age
+                for term, estimate in state['top'].items():
+                    scores[term] += estimate * weight
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    def estimate(self, query, timestamp=None):
+        """Approximate count of a query in the bucket containing timestamp"""
+        state = cache.get(self.bucket_key(self.bucket_for(timestamp)))
+        if not state:
+            return 0
+        return CountMinSketch.from_dict(state['sketch']).estimate(normalize(query))
+
+    def reset(self):
+        """Drop this process's buffer (tests)"""
+        with self._lock:
+            self._buffers = {}
+            self._current_bucket = None
+            self._flushed_at = time.monotonic()
+
+
+search_trends = SearchTrends()
@@ -1,22 +1,22 @@
 from datetime import datetime, timedelta
 from django.utils import timezone
 from django.conf import settings
-from django.db.models import Sum, Count, F
+from django.db.models import Sum, Count, F, Min, Max
 from ..models.subscription import Subscription, SubscriptionFeatureUsage, SubscriptionPlan
 from ..services.payments import PaymentService
+from .subscription_renewal import SubscriptionRenewalRunner
+from .usage_metering import UsageMeter
 import logging
+import time
 from django.db import models
 
 logger = logging.getLogger(__name__)
 
 # Constants for usage tracking
-RESET_PERIODS = {
-    'daily': timedelta(days=1),
-    'monthly': timedelta(days=30)
-}
-
 WARNING_THRESHOLD = 0.85  # 85% of limit
 
+RESET_CHUNK_SIZE = 5000  # Rows per UPDATE when resetting usage counters
+
 class SubscriptionService:
     """Service for managing user subscriptions"""
     
@@ -141,35 +141,8 @@ class SubscriptionService:
     
     @classmethod
     def check_subscription_status(cls):
-        """Check and update status of all subscriptions"""
-        now = timezone.now()
-        
-        # Find expired subscriptions
-        expired = Subscription.objects.filter(
-            is_active=True,
-            end_date__lt=now
-        )
-        
-        for subscription in expired:
-            if subscription.auto_renew:
-                # Attempt to renew
-                payment_result = PaymentService.create_subscription_payment(
-                    user=subscription.user,
-                    plan=subscription.tier,
-                    amount=cls.get_tier_price(subscription.tier)
-                )
-                
-                if payment_result.get('success'):
-                    subscription.end_date = now + timedelta(days=30)
-                    subscription.last_payment_date = now
-                    subscription.next_payment_date = now + timedelta(days=30)
-                    subscription.save()
-                else:
-                    subscription.is_active = False
-                    subscription.save()
-            else:
-                subscription.is_active = False
-                subscription.save()
+        """Renew or deactivate expired subscriptions"""
+        return SubscriptionRenewalRunner().run()
     
     @classmethod
     def get_plan_metrics(cls, plan_id=None):
@@ -247,55 +220,25 @@ class SubscriptionService:
     
     @classmethod
     def track_feature_usage(cls, user, feature_name):
-        """Track usage of a subscription feature"""
+        """Track usage of a subscription feature
+        
+        Counted in the cache by UsageMeter; the stored counters catch up
+        when flush_feature_usage runs.
+        """
         try:
-            subscription = Subscription.objects.get(user=user, is_active=True)
-            feature_usage, created = SubscriptionFeatureUsage.objects.get_or_create(
-                subscription=subscription,
-                feature_name=feature_name
-            )
-            
-            # Check if usage is allowed
-            if not feature_usage.check_usage_allowed():
-                return {
-                    'success': False,
-                    'error': 'Usage limit exceeded',
-                    'usage_stats': feature_usage.get_usage_stats()
-                }
-            
-            # Increment usage
-            feature_usage.increment_usage()
-            
-            # Check for warning threshold
-            limits = feature_usage.get_usage_limits()
-            daily_ratio = feature_usage.daily_usage / limits['daily_limit']
-            monthly_ratio = feature_usage.monthly_usage / limits['monthly_limit']
-            
-            result = {
-                'success': True,
-                'usage_stats': feature_usage.get_usage_stats()
-            }
-            
-            if daily_ratio >= WARNING_THRESHOLD or monthly_ratio >= WARNING_THRESHOLD:
-                result['warning'] = {
-                    'approaching_limit': True,
-                    'daily_ratio': daily_ratio,
-                    'monthly_ratio': monthly_ratio
-                }
-            
-            return result
-            
-        except Subscription.DoesNotExist:
-            return {
-                'success': False,
-                'error': 'No active subscription found'
-            }
+            return UsageMeter.record(user, feature_name)
         except Exception as e:
+            logger.exception("Error tracking feature usage")
             return {
                 'success': False,
                 'error': str(e)
             }
     
+    @classmethod
+    def check_usage_allowed(cls, user, feature_name):
+        """Check whether the user's tier allows another use of a feature"""
+        return UsageMeter.check_usage_allowed(user, feature_name)
+    
     @classmethod
     def get_feature_usage_analytics(cls, user, days=30):
         """Get analytics for feature usage"""
@@ -357,42 +300,52 @@ class SubscriptionService:
             }
     
     @classmethod
-    def reset_usage_counters(cls):
-        """Reset usage counters based on reset periods"""
+    def reset_usage_counters(cls, chunk_size=RESET_CHUNK_SIZE):
+        """Zero the stored counters of windows that have ended
+        
+        Two set-based UPDATEs, daily and monthly, over primary-key ranges
+        of chunk_size rows so each statement only locks one range. Window
+        starts match UsageMeter, which enforces the limits themselves.
+        The daily reset only zeroes rows with usage and leaves
+        daily_reset_at alone: UsageMeter moves it forward when a row is
+        next used, and UsageMeter.flush relies on it to find the rows used
+        today.
+        """
         try:
-            now = timezone.now()
-            reset_count = 0
+            started = time.perf_counter()
+            day_start, month_start = UsageMeter.windows()
+            bounds = SubscriptionFeatureUsage.objects.aggregate(low=Min('id'), high=Max('id'))
+            daily_reset = monthly_reset = 0
             
-            for usage in SubscriptionFeatureUsage.objects.all():
-                daily_reset = now - usage.daily_reset_at >= RESET_PERIODS['daily']
-                monthly_reset = now - usage.monthly_reset_at >= RESET_PERIODS['monthly']
-                
-                if daily_reset:
-                    usage.daily_usage = 0
-                    usage.daily_reset_at = now
-                    reset_count += 1
-                
-                if monthly_reset:
-                    usage.monthly_usage = 0
-                    usage.monthly_reset_at = now
-                    reset_count += 1
-                
-                if daily_reset or monthly_reset:
-                    usage.save(update_fields=['daily_usage', 'monthly_usage', 'daily_reset_at', 'monthly_reset_at'])
+            if bounds['low'] is not None:
+                for low in range(bounds['low'], bounds['high'] + 1, chunk_size):
+                    id_range = (low, low + chunk_size - 1)
+                    daily_reset += SubscriptionFeatureUsage.objects.filter(
+                        id__range=id_range,
+                        daily_reset_at__lt=day_start,
+                        daily_usage__gt=0
+                    ).update(daily_usage=0)
+                    monthly_reset += SubscriptionFeatureUsage.objects.filter(
+                        id__range=id_range,
+                        monthly_reset_at__lt=month_start
+                    ).update(monthly_usage=0, monthly_reset_at=month_start)
             
-            # Force refresh all feature usage objects
-            SubscriptionFeatureUsage.objects.all().update(
-                daily_usage=models.F('daily_usage'),
-                monthly_usage=models.F('monthly_usage')
+            elapsed_ms = (time.perf_counter() - started) * 1000
+            logger.info(
+                f"Reset usage counters: {daily_reset} daily, {monthly_reset} monthly "
+                f"in {elapsed_ms:.1f}ms"
             )
-            
             return {
                 'success': True,
-                'reset_count': reset_count
+                'reset_count': daily_reset + monthly_reset,
+                'daily_reset': daily_reset,
+                'monthly_reset': monthly_reset,
+                'elapsed_ms': round(elapsed_ms, 1)
             }
             
         except Exception as e:
+            logger.exception("Error resetting usage counters")
             return {
                 'success': False,
                 'error': str(e)
-            } 
\ No newline at end of file
+            } 
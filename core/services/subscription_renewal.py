@@ -0,0 +1,245 @@
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import timedelta
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.utils import timezone
+from ..models.subscription import Subscription, SubscriptionPlan
+from .payments import PaymentService
+from .usage_metering import UsageMeter
+import logging
+import random
+import threading
+import time
+import uuid
+
+logger = logging.getLogger(__name__)
+
+RenewalJob = namedtuple('RenewalJob', ['subscription_id', 'user', 'tier', 'amount', 'reference'])
+
+
+class StubPaymentGateway:
+    """Offline stand-in for PaymentService's subscription payments.
+
+    Answers after `latency` seconds and fails `failure_rate` of calls, so
+    renewal throughput can be measured without reaching Paystack. Like
+    Paystack, it rejects a reused reference.
+    """
+
+    def __init__(self, latency=0.0, failure_rate=0.0, seed=None):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.calls = 0
+        self.transactions = {}
+        self._random = random.Random(seed)
+        self._lock = threading.Lock()
+
+    def create_subscription_payment(self, user, plan, amount, currency='NGN', reference=None):
+        if float(amount) <= 0:
+            raise ValueError("Invalid amount")
+        if self.latency:
+            time.sleep(self.latency)
+        reference = reference or f"sub_{uuid.uuid4().hex[:16]}"
+        with self._lock:
+            self.calls += 1
+            if reference in self.transactions:
+                return {'success': False, 'error': 'Duplicate Transaction Reference'}
+            if self._random.random() < self.failure_rate:
+                return {'success': False, 'error': 'Gateway unavailable'}
+            result = {
+                'success': True,
+                'authorization_url': f'https://stub.invalid/{reference}',
+                'access_code': uuid.uuid4().hex[:12],
+                'reference': reference
+            }
+            self.transactions[reference] = result
+            return result
+
+    def lookup_transaction(self, reference):
+        with self._lock:
+            if reference not in self.transactions:
+                return {'success': True, 'found': False}
+        return {'success': True, 'found': True, 'status': 'abandoned', 'reference': reference}
+
+
+class SubscriptionRenewalRunner:
+    """Renews expired subscriptions with payment calls fanned out to a thread pool.
+
+    Workers only talk to the gateway and the cache; subscriptions are read
+    and their outcomes written by the calling thread, in chunks, with one
+    UPDATE per outcome. Each renewal uses a payment reference derived from
+    the subscription and the period being renewed, so retries and repeated
+    runs never start a second payment for the same period, and the cache
+    keeps concurrent runners from working on the same subscription. Paystack
+    rejects a reused reference, so before retrying the runner looks the
+    reference up in case the failed attempt created the transaction anyway.
+    """
+
+    CLAIM_KEY = 'subscription_renewal:{reference}'
+    # Successful payments are remembered long enough to cover a run that
+    # dies before recording them
+    CLAIM_TIMEOUT = 60 * 60 * 24 * 7
+    IN_PROGRESS = 'in_progress'
+    GATEWAY_TIMEOUT = 30  # Seconds PaymentService waits on one Paystack call
+    CHUNK_SIZE = 500
+    RENEWAL_PERIOD = timedelta(days=30)
+
+    def __init__(self, gateway=None, max_workers=None, max_attempts=None, backoff=None, sleep=time.sleep):
+        self.gateway = gateway or PaymentService
+        self.max_workers = max_workers or getattr(settings, 'SUBSCRIPTION_RENEWAL_WORKERS', 8)
+        self.max_attempts = max_attempts or getattr(settings, 'SUBSCRIPTION_RENEWAL_MAX_ATTEMPTS', 3)
+        self.backoff = getattr(settings, 'SUBSCRIPTION_RENEWAL_BACKOFF', 0.5) if backoff is None else backoff
+        self.sleep = sleep
+
+    @property
+    def in_progress_timeout(self):
+        """Longest a charge can run: a lookup and a payment call per attempt plus the backoff"""
+        backoff = sum(self.backoff * 2 ** attempt for attempt in range(self.max_attempts - 1))
+        return int(self.max_attempts * 2 * self.GATEWAY_TIMEOUT + backoff) + 1
+
+    @staticmethod
+    def reference(subscription_id, end_date):
+        """Payment reference for renewing the period that ended at end_date"""
+        return f'renew_{subscription_id}_{end_date:%Y%m%d%H%M%S}'
+
+    def _pay(self, job):
+        """Call the gateway, retrying failures with exponential backoff"""
+        result = None
+        for attempt in range(self.max_attempts):
+            if attempt:
+                existing = self._find_payment(job)
+                if existing:
+                    return existing
+            try:
+                result = self.gateway.create_subscription_payment(
+                    user=job.user,
+                    plan=job.tier,
+                    amount=job.amount,
+                    reference=job.reference
+                )
+            except ValueError as e:
+                # Invalid amount; retrying cannot help
+                return {'success': False, 'error': str(e)}
+            except Exception as e:
+                result = {'success': False, 'error': str(e)}
+            if result.get('success'):
+                return result
+            if attempt < self.max_attempts - 1:
+                delay = self.backoff * 2 ** attempt
+                logger.warning(
+                    f"Renewal payment for subscription {job.subscription_id} failed "
+                    f"({result.get('error')}), retrying in {delay}s"
+                )
+                self.sleep(delay)
+        return result
+
+    def _find_payment(self, job):
+        """The transaction an earlier attempt created for the job's reference, if any"""
+        try:
+            lookup = self.gateway.lookup_transaction(job.reference)
+        except Exception as e:
+            lookup = {'success': False, 'error': str(e)}
+        if not lookup.get('success'):
+            # Retrying may then hit a duplicate reference, which the next lookup resolves
+            logger.warning(f"Could not look up renewal payment {job.reference}: {lookup.get('error')}")
+            return None
+        if lookup.get('found'):
+            logger.info(f"Renewal payment {job.reference} was created by an earlier attempt")
+            return {'success': True, 'reference': job.reference, 'status': lookup.get('status')}
+        return None
+
+    def charge(self, job):
+        """The payment result for a job, or None if another runner holds it"""
+        key = self.CLAIM_KEY.format(reference=job.reference)
+        # Expires on its own if this run dies mid-charge, so the next run
+        # picks the subscription up again
+        if not cache.add(key, self.IN_PROGRESS, self.in_progress_timeout):
+            previous = cache.get(key)
+            # A payment made by a run that died before recording it
+            return previous if isinstance(previous, dict) else None
+
+        result = self._pay(job)
+        if result.get('success'):
+            cache.set(key, result, self.CLAIM_TIMEOUT)
+        else:
+            cache.delete(key)
+        return result
+
+    def charge_all(self, jobs, executor=None):
+        """[(job, result)] for jobs charged concurrently"""
+        if executor is None:
+            with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='renewal') as executor:
+                return list(zip(jobs, executor.map(self.charge, jobs)))
+        return list(zip(jobs, executor.map(self.charge, jobs)))
+
+    def _deactivate(self, subscriptions, now):
+        ids = [subscription.id for subscription in subscriptions]
+        if not ids:
+            return 0
+        count = Subscription.objects.filter(id__in=ids, is_active=True, end_date__lt=now).update(is_active=False)
+        # Bulk updates skip post_save, so drop the metering cache here
+        user_ids = [subscription.user_id for subscription in subscriptions]
+        UsageMeter.forget_subscriptions(user_ids)
+        transaction.on_commit(lambda: UsageMeter.forget_subscriptions(user_ids))
+        return count
+
+    def run(self, now=None):
+        """Renew or deactivate every active subscription that has ended"""
+        started = time.monotonic()
+        now = now or timezone.now()
+        prices = dict(SubscriptionPlan.objects.filter(is_active=True).values_list('tier', 'price'))
+        expired = Subscription.objects.filter(
+            is_active=True,
+            end_date__lt=now
+        ).select_related('user').order_by('id')
+
+        stats = {'renewed': 0, 'failed': 0, 'deactivated': 0, 'skipped': 0}
+        last_id = 0
+        with ThreadPoolExecutor(max_workers=self.max_workers, thread_name_prefix='renewal') as executor:
+            while True:
+                chunk = list(expired.filter(id__gt=last_id)[:self.CHUNK_SIZE])
+                if not chunk:
+                    break
+                last_id = chunk[-1].id
+
+                renewing = {subscription.id: subscription for subscription in chunk if subscription.auto_renew}
+                lapsed = [subscription for subscription in chunk if not subscription.auto_renew]
+                jobs = [
+                    RenewalJob(
+                        subscription.id,
+                        subscription.user,
+                        subscription.tier,
+                        prices.get(subscription.tier, 0),
+                        self.reference(subscription.id, subscription.end_date)
+                    )
+                    for subscription in renewing.values()
+                ]
+
+                renewed, failed = [], []
+                for job, result in self.charge_all(jobs, executor):
+                    if result is None:
+                        stats['skipped'] += 1
+                    elif result.get('success'):
+                        renewed.append(job.subscription_id)
+                    else:
+                        logger.error(f"Renewal of subscription {job.subscription_id} failed: {result.get('error')}")
+                        failed.append(renewing[job.subscription_id])
+
+                if renewed:
+                    stats['renewed'] += Subscription.objects.filter(
+                        id__in=renewed, is_active=True, end_date__lt=now
+                    ).update(
+                        end_date=now + self.RENEWAL_PERIOD,
+                        last_payment_date=now,
+                        next_payment_date=now + self.RENEWAL_PERIOD
+                    )
+                stats['failed'] += self._deactivate(failed, now)
+                stats['deactivated'] += self._deactivate(lapsed, now)
+
+        stats['elapsed_ms'] = round((time.monotonic() - started) * 1000)
+        logger.info(
+            f"Subscription renewals: {stats['renewed']} renewed, {stats['failed']} failed, "
+            f"{stats['deactivated']} deactivated, {stats['skipped']} skipped in {stats['elapsed_ms']}ms"
+        )
+        return stats
@@ -0,0 +1,209 @@
+from datetime import datetime, timezone as dt_timezone
+from django.core.cache import cache
+from django.utils import timezone
+from ..models.subscription import Subscription, SubscriptionFeatureUsage, TIER_USAGE_LIMITS, WARNING_THRESHOLD
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+class UsageMeter:
+    """Per-feature usage counters for subscriptions, kept in the cache.
+
+    Each counter key names its window (the UTC day or calendar month), so
+    a new window starts from zero without any reset job. Counters are
+    incremented atomically with cache.incr and checked against the tier
+    limits without touching the database. flush() copies the current
+    windows into SubscriptionFeatureUsage for reporting; when a counter
+    is missing from the cache it is seeded back from that row.
+    """
+
+    COUNTER_KEY = 'usage:{subscription_id}:{feature}:{window}'
+    SUBSCRIPTION_KEY = 'usage:subscription:{user_id}'
+    SUBSCRIPTION_TIMEOUT = 300
+    DAY_TIMEOUT = 60 * 60 * 48
+    MONTH_TIMEOUT = 60 * 60 * 24 * 62
+    FLUSH_CHUNK_SIZE = 500
+
+    @staticmethod
+    def windows(now=None):
+        """Start of the current day and month windows"""
+        now = (now or timezone.now()).astimezone(dt_timezone.utc)
+        day_start = datetime(now.year, now.month, now.day, tzinfo=dt_timezone.utc)
+        return day_start, day_start.replace(day=1)
+
+    @classmethod
+    def keys(cls, subscription_id, feature, now=None):
+        day_start, month_start = cls.windows(now)
+        return (
+            cls.COUNTER_KEY.format(subscription_id=subscription_id, feature=feature, window=day_start.strftime('d%Y%m%d')),
+            cls.COUNTER_KEY.format(subscription_id=subscription_id, feature=feature, window=month_start.strftime('m%Y%m')),
+        )
+
+    @classmethod
+    def get_subscription(cls, user):
+        """(subscription id, tier) of the user's active subscription, or None"""
+        key = cls.SUBSCRIPTION_KEY.format(user_id=user.pk)
+        subscription = cache.get(key)
+        if subscription is None:
+            subscription = Subscription.objects.filter(user=user, is_active=True).values_list('id', 'tier').first()
+            # Cache misses too, as an empty tuple
+            subscription = tuple(subscription or ())
+            cache.set(key, subscription, cls.SUBSCRIPTION_TIMEOUT)
+        return subscription or None
+
+    @classmethod
+    def forget_subscription(cls, user_id):
+        cache.delete(cls.SUBSCRIPTION_KEY.format(user_id=user_id))
+
+    @classmethod
+    def forget_subscriptions(cls, user_ids):
+        cache.delete_many([cls.SUBSCRIPTION_KEY.format(user_id=user_id) for user_id in user_ids])
+
+    @staticmethod
+    def limits(tier):
+        limits = TIER_USAGE_LIMITS.get(tier, TIER_USAGE_LIMITS['FREE'])
+        return {'daily_limit': limits['daily'], 'monthly_limit': limits['monthly']}
+
+    @classmethod
+    def _seed(cls, subscription_id, feature, day_key, month_key):
+        """Start the window counters from the stored usage, resetting stale windows"""
+        day_start, month_start = cls.windows()
+        usage, _ = SubscriptionFeatureUsage.objects.get_or_create(
+            subscription_id=subscription_id,
+            feature_name=feature
+        )
+        daily = usage.daily_usage if usage.daily_reset_at >= day_start else 0
+        monthly = usage.monthly_usage if usage.monthly_reset_at >= month_start else 0
+        if usage.daily_reset_at < day_start or usage.monthly_reset_at < month_start:
+            SubscriptionFeatureUsage.objects.filter(pk=usage.pk).update(
+                daily_usage=daily,
+                monthly_usage=monthly,
+                daily_reset_at=max(usage.daily_reset_at, day_start),
+                monthly_reset_at=max(usage.monthly_reset_at, month_start)
+            )
+        cache.add(day_key, daily, cls.DAY_TIMEOUT)
+        cache.add(month_key, monthly, cls.MONTH_TIMEOUT)
+
+    @classmethod
+    def _increment(cls, key, amount, timeout):
+        try:
+            return cache.incr(key, amount)
+        except ValueError:
+            # Evicted since it was seeded
+            cache.add(key, 0, timeout)
+            return cache.incr(key, amount)
+
+    @classmethod
+    def _stats(cls, tier, daily, monthly):
+        day_start, month_start = cls.windows()
+        return {
+            'daily_usage': daily,
+            'monthly_usage': monthly,
+            **cls.limits(tier),
+            'daily_reset_at': day_start,
+            'monthly_reset_at': month_start
+        }
+
+    @classmethod
+    def usage(cls, user, feature):
+        """Current window counts for a feature, read from the cache"""
+        subscription = cls.get_subscription(user)
+        if subscription is None:
+            return None
+        subscription_id, tier = subscription
+        day_key, month_key = cls.keys(subscription_id, feature)
+        counters = cache.get_many([day_key, month_key])
+        if len(counters) < 2:
+            cls._seed(subscription_id, feature, day_key, month_key)
+            counters = cache.get_many([day_key, month_key])
+        return cls._stats(tier, counters.get(day_key, 0), counters.get(month_key, 0))
+
+    @classmethod
+    def check_usage_allowed(cls, user, feature):
+        stats = cls.usage(user, feature)
+        return (
+            stats is not None and
+            stats['daily_usage'] < stats['daily_limit'] and
+            stats['monthly_usage'] < stats['monthly_limit']
+        )
+
+    @classmethod
+    def record(cls, user, feature):
+        """Count one use of a feature if the tier limits allow it.
+
+        The counters are incremented first and rolled back if that crossed
+        a limit, so concurrent callers can never both take the last unit.
+        """
+        subscription = cls.get_subscription(user)
+        if subscription is None:
+            return {
+                'success': False,
+                'error': 'No active subscription found'
+            }
+        subscription_id, tier = subscription
+        day_key, month_key = cls.keys(subscription_id, feature)
+        if len(cache.get_many([day_key, month_key])) < 2:
+            cls._seed(subscription_id, feature, day_key, month_key)
+
+        limits = cls.limits(tier)
+        daily = cls._increment(day_key, 1, cls.DAY_TIMEOUT)
+        monthly = cls._increment(month_key, 1, cls.MONTH_TIMEOUT)
+        if daily > limits['daily_limit'] or monthly > limits['monthly_limit']:
+            daily = cls._increment(day_key, -1, cls.DAY_TIMEOUT)
+            monthly = cls._increment(month_key, -1, cls.MONTH_TIMEOUT)
+            return {
+                'success': False,
+                'error': 'Usage limit exceeded',
+                'usage_stats': cls._stats(tier, daily, monthly)
+            }
+
+        result = {
+            'success': True,
+            'usage_stats': cls._stats(tier, daily, monthly)
+        }
+        daily_ratio = daily / limits['daily_limit']
+        monthly_ratio = monthly / limits['monthly_limit']
+        if daily_ratio >= WARNING_THRESHOLD or monthly_ratio >= WARNING_THRESHOLD:
+            result['warning'] = {
+                'approaching_limit': True,
+                'daily_ratio': daily_ratio,
+                'monthly_ratio': monthly_ratio
+            }
+        return result
+
+    @classmethod
+    def flush(cls):
+        """Copy the current window counters into SubscriptionFeatureUsage.
+
+        Only rows used in the current day window can have changed, and the
+        daily_reset_at index finds them. Returns the number of rows updated.
+        """
+        day_start, _ = cls.windows()
+        now = timezone.now()
+        rows = SubscriptionFeatureUsage.objects.filter(daily_reset_at__gte=day_start).only(
+            'id', 'subscription_id', 'feature_name', 'daily_usage', 'monthly_usage'
+        ).order_by('id')
+        updated = 0
+        last_id = 0
+        while True:
+            chunk = list(rows.filter(id__gt=last_id)[:cls.FLUSH_CHUNK_SIZE])
+            if not chunk:
+                break
+            last_id = chunk[-1].id
+            keys = {usage.id: cls.keys(usage.subscription_id, usage.feature_name) for usage in chunk}
+            counters = cache.get_many([key for pair in keys.values() for key in pair])
+            changed = []
+            for usage in chunk:
+                day_key, month_key = keys[usage.id]
+                if day_key not in counters or month_key not in counters:
+                    continue
+                if (usage.daily_usage, usage.monthly_usage) != (counters[day_key], counters[month_key]):
+                    usage.daily_usage = counters[day_key]
+                    usage.monthly_usage = counters[month_key]
+                    usage.last_used = now
+                    changed.append(usage)
+            SubscriptionFeatureUsage.objects.bulk_update(changed, ['daily_usage', 'monthly_usage', 'last_used'])
+            updated += len(changed)
+        logger.info(f"Flushed feature usage counters for {updated} rows")
+        return updated
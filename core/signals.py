@@ -1,7 +1,11 @@
-from django.db.models.signals import post_save, post_delete, pre_save
+from django.db.models.signals import post_save, post_delete, pre_save, pre_delete
 from django.dispatch import receiver
 from django.apps import apps
 from django.core.exceptions import ValidationError
+from django.db import transaction
+from django.db.models import F, Value
+from django.db.models.functions import Greatest
+from decimal import Decimal
 
 def get_storage_quota_model():
     return apps.get_model('core', 'StorageQuota')
@@ -39,30 +43,180 @@ def save_notification_preferences(sender, instance, **kwargs):
 
 @receiver(post_delete, sender='core.Investment')
 def update_share_ownership_on_investment_delete(sender, instance, **kwargs):
-    """Update ShareOwnership when an Investment is deleted"""
-    try:
-        ShareOwnership = apps.get_model('core', 'ShareOwnership')
-        # Get the ShareOwnership record
-        ownership = ShareOwnership.objects.get(
-            user=instance.investor,
-            app=instance.app
-        )
-        
-        # Subtract the percentage that was bought in this investment
-        ownership.percentage_owned -= instance.percentage_bought
+    """Update ShareOwnership and funding counters when an Investment is deleted"""
+    AppListing = apps.get_model('core', 'AppListing')
+    ShareOwnership = apps.get_model('core', 'ShareOwnership')
+    
+    with transaction.atomic():
+        # Lock the app for update, as Investment.save() does
+        try:
+            app = AppListing.objects.select_for_update().get(pk=instance.app_id)
+        except AppListing.DoesNotExist:
+            return  # App is being deleted along with its investments
         
-        # If no shares left, delete the ownership record
-        if ownership.percentage_owned <= 0:
-            ownership.delete()
-        else:
-            ownership.save()
+        try:
+            # Get the ShareOwnership record
+            ownership = ShareOwnership.objects.get(
+                user=instance.investor,
+                app=app
+            )
+            
+            # Subtract the percentage that was bought in this investment
+            ownership.percentage_owned -= instance.percentage_bought
             
-        # Update app's remaining percentage
-        instance.app.remaining_percentage += instance.percentage_bought
-        instance.app.save()
+            # If no shares left, delete the ownership record
+            if ownership.percentage_owned <= 0:
+                ownership.delete()
+            else:
+                ownership.save()
+                
+            # Update app's remaining percentage
+            app.remaining_percentage += instance.percentage_bought
+        except ShareOwnership.DoesNotExist:
+            pass  # No ownership record found, nothing to update
         
-    except ShareOwnership.DoesNotExist:
-        pass  # No ownership record found, nothing to update
+        # Update denormalized funding counters in the database; full saves
+        # leave them alone. Progress is derived from them in AppListing.save()
+        investor_left = not sender.objects.filter(app=app, investor_id=instance.investor_id).exists()
+        AppListing.objects.filter(pk=app.pk).update(
+            raised_amount=Greatest(F('raised_amount') - instance.amount_paid, Value(Decimal('0.00'))),
+            investor_count=Greatest(F('investor_count') - (1 if investor_left else 0), Value(0))
+        )
+        app.save()
+
+@receiver(post_save, sender='core.AppListing')
+def create_engagement_counter(sender, instance, created, **kwargs):
+    """Create the engagement counter record for new app listings"""
+    if created:
+        AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+        AppEngagementCounter.objects.get_or_create(app=instance)
+
+@receiver(post_save, sender='core.AppListing')
+def reindex_app_listing(sender, instance, created, **kwargs):
+    """Keep the app search index, autocomplete suggestions and cached results in step with saved listings"""
+    from core.services.autocomplete import AutocompleteService
+    from core.services.search_cache import SearchResultCache
+    from core.services.search_index import AppSearchIndex, app_search_index
+    # Set by AppListing.save(); saves that change nothing searchable are skipped
+    changed = None if created else getattr(instance, '_changed_fields', None)
+    if changed is not None and not changed & AppSearchIndex.INDEXED_FIELDS:
+        return
+    transaction.on_commit(lambda: app_search_index.update(instance))
+    transaction.on_commit(SearchResultCache.invalidate)
+    if changed is None or changed & AutocompleteService.SOURCE_FIELDS:
+        transaction.on_commit(AutocompleteService.invalidate)
+
+@receiver(post_delete, sender='core.AppListing')
+def unindex_app_listing(sender, instance, **kwargs):
+    """Drop deleted listings from the app search index, autocomplete suggestions and cached results"""
+    from core.services.autocomplete import AutocompleteService
+    from core.services.search_cache import SearchResultCache
+    from core.services.search_index import app_search_index
+    app_id = instance.id
+    transaction.on_commit(lambda: app_search_index.delete(app_id))
+    transaction.on_commit(AutocompleteService.invalidate)
+    transaction.on_commit(SearchResultCache.invalidate)
+
+@receiver(post_save, sender='core.Investment')
+@receiver(post_delete, sender='core.Investment')
+def invalidate_search_results(sender, instance, **kwargs):
+    """Investment counts filter and sort search results"""
+    from core.services.search_cache import SearchResultCache
+    from core.services.search_index import app_search_index
+    app_id = instance.app_id
+    # The listing's investor_count changed without a listing save
+    transaction.on_commit(lambda: app_search_index.update_ids([app_id]))
+    transaction.on_commit(SearchResultCache.invalidate)
+
+@receiver(post_save, sender='core.CommunityVote')
+def increment_vote_counters(sender, instance, created, **kwargs):
+    """Count a new vote in the app's engagement counters"""
+    if created:
+        AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+        AppEngagementCounter.record_vote(instance, 1)
+
+@receiver(post_delete, sender='core.CommunityVote')
+def decrement_vote_counters(sender, instance, **kwargs):
+    """Remove a deleted vote from the app's engagement counters"""
+    AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+    AppEngagementCounter.record_vote(instance, -1)
+
+@receiver(post_save, sender='core.AppComment')
+def increment_comment_counters(sender, instance, created, **kwargs):
+    """Count a new comment in the app's engagement counters"""
+    if created:
+        AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+        AppEngagementCounter.record_comment(
+            instance.app_id,
+            AppEngagementCounter.comment_weight(instance)
+        )
+
+@receiver(pre_delete, sender='core.AppComment')
+def weigh_deleted_comment(sender, instance, **kwargs):
+    """Work out a comment's counter weight while its parent still exists"""
+    AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+    instance._engagement_weight = AppEngagementCounter.comment_weight(instance)
+
+@receiver(post_delete, sender='core.AppComment')
+def decrement_comment_counters(sender, instance, **kwargs):
+    """Remove a deleted comment from the app's engagement counters"""
+    AppEngagementCounter = apps.get_model('core', 'AppEngagementCounter')
+    AppEngagementCounter.record_comment(
+        instance.app_id,
+        -getattr(instance, '_engagement_weight', 0)
+    )
+
+@receiver(post_save, sender='core.Revenue')
+@receiver(post_delete, sender='core.Revenue')
+def refresh_revenue_rollup(sender, instance, **kwargs):
+    """Keep closed-month revenue rollups in step with edited or deleted revenue"""
+    from core.services.revenue.rollup import RevenueRollupService
+    RevenueRollupService.refresh_month(instance.app_id, instance.created_at)
+
+@receiver(post_save, sender='core.Subscription')
+@receiver(post_delete, sender='core.Subscription')
+def forget_metered_subscription(sender, instance, **kwargs):
+    """Usage metering caches each user's active subscription and tier"""
+    from core.services.usage_metering import UsageMeter
+    user_id = instance.user_id
+    UsageMeter.forget_subscription(user_id)
+    # Again after commit, in case another request cached the old row meanwhile
+    transaction.on_commit(lambda: UsageMeter.forget_subscription(user_id))
+
+@receiver(pre_save, sender='core.EscrowTransaction')
+def remember_escrow_state(sender, instance, **kwargs):
+    """Keep the stored type, status and amount for the ledger entry written after saving"""
+    instance._ledger_previous = None
+    if instance.pk:
+        previous = sender.objects.filter(pk=instance.pk).values_list('transaction_type', 'status', 'amount').first()
+        instance._ledger_previous = previous
+
+@receiver(post_save, sender='core.EscrowTransaction')
+def record_escrow_ledger_entry(sender, instance, **kwargs):
+    """Append any change in the transaction's contribution to its app's escrow totals"""
+    from core.services.escrow_ledger import EscrowLedger
+    EscrowLedger.record_change(
+        instance.app_id,
+        instance.pk,
+        before=getattr(instance, '_ledger_previous', None),
+        after=(instance.transaction_type, instance.status, instance.amount)
+    )
+
+@receiver(post_delete, sender='core.EscrowTransaction')
+def reverse_escrow_ledger_entry(sender, instance, **kwargs):
+    from core.services.escrow_ledger import EscrowLedger
+    EscrowLedger.record_change(
+        instance.app_id,
+        instance.pk,
+        before=(instance.transaction_type, instance.status, instance.amount)
+    )
+
+@receiver(post_save, sender='core.Notification')
+def publish_new_notification(sender, instance, created, **kwargs):
+    """Push new notifications to the user's open WebSocket and SSE streams"""
+    if created:
+        from core.services.notification_stream import publish_notification
+        transaction.on_commit(lambda: publish_notification(instance))
 
 @receiver(pre_save)
 def check_file_upload(sender, instance, **kwargs):
@@ -1,6 +1,6 @@
 from celery import shared_task
 from django.utils import timezone
-from datetime import timedelta
+from datetime import datetime, timedelta
 from .models import Notification
 from django.core.management import call_command
 import logging
@@ -44,6 +44,163 @@ def send_scheduled_notification(user_id, type, title, message, link=''):
     except User.DoesNotExist:
         pass
 
+@shared_task
+def dispatch_notification(filters, excludes, **kwargs):
+    """Fan a notification out to every user matching the given User lookups"""
+    from .models import User
+    from .services.notification_dispatcher import NotificationDispatcher
+
+    recipients = User.objects.filter(**filters).exclude(**excludes)
+    result = NotificationDispatcher.dispatch(recipients, **kwargs)
+    logger.info(f"Dispatched '{kwargs.get('title')}' to {result['recipients']} users")
+    return result
+
+@shared_task(ignore_result=True)
+def deliver_notification_emails(user_ids, subject, template, context, recipient_key='user'):
+    """Send one chunk of a dispatched notification's emails over a single connection"""
+    from django.core.mail import get_connection
+    from .models import User
+    from .services.notification_dispatcher import NotificationDispatcher, deserialize_email_context
+
+    context = deserialize_email_context(context)
+    recipients = User.objects.filter(id__in=user_ids).select_related('notification_preferences')
+    sent = failed = 0
+    with get_connection() as connection:
+        for user in recipients:
+            try:
+                if NotificationService.send_email_notification(
+                    user=user,
+                    subject=subject,
+                    template=template,
+                    context={**context, recipient_key: user},
+                    connection=connection
+                ):
+                    sent += 1
+            except Exception as e:
+                logger.warning(f"Error sending notification email to user {user.id}: {str(e)}")
+                failed += 1
+    NotificationDispatcher.record('email', 'sent', sent)
+    NotificationDispatcher.record('email', 'failed', failed)
+    NotificationDispatcher.record('email', 'skipped', len(user_ids) - sent - failed)
+
+@shared_task(ignore_result=True)
+def deliver_push_notifications(user_ids, title, message, data=None):
+    """Queue a multicast push task for each chunk of the users' device tokens"""
+    from .services.notification_dispatcher import NotificationDispatcher
+    from .services.push import PushDeliveryService
+
+    device_tokens = PushDeliveryService.tokens_for_users(user_ids)
+    reachable = {user_id for user_id, _ in device_tokens}
+    NotificationDispatcher.record('push', 'skipped', len(set(user_ids) - reachable))
+    tokens = [token for _, token in device_tokens]
+    for batch in PushDeliveryService.chunk(tokens):
+        send_push_batch.delay(batch, title, message, data)
+
+@shared_task(bind=True, ignore_result=True, max_retries=5)
+def send_push_batch(self, tokens, title, message, data=None):
+    """Send one multicast push; tokens with transient errors are retried with backoff"""
+    from .services.notification_dispatcher import NotificationDispatcher
+    from .services.push import PushDeliveryService
+
+    result = PushDeliveryService.send(tokens, title, message, data)
+    NotificationDispatcher.record('push', 'sent', result['sent'])
+    NotificationDispatcher.record('push', 'failed', result['failed'])
+    if not result['retry']:
+        return
+    if self.request.retries >= self.max_retries:
+        logger.warning(f"Giving up on {len(result['retry'])} push tokens after {self.max_retries} retries")
+        NotificationDispatcher.record('push', 'failed', len(result['retry']))
+        return
+    raise self.retry(
+        args=(result['retry'], title, message, data),
+        countdown=30 * 2 ** self.request.retries
+    )
+
+@shared_task
+def send_notification_digest(frequency, window_end=None):
+    """Queue a chain with one digest task per pending batch of users"""
+    from celery import chain
+    from .services.notification_digest import NotificationDigestService
+
+    window_end = datetime.fromisoformat(window_end) if window_end else None
+    service = NotificationDigestService(frequency, window_end)
+    batches = service.pending_batches()
+    if not batches:
+        logger.info(f"No {frequency.lower()} digests to send")
+        return 0
+
+    chain(*[
+        send_digest_batch.si(frequency, service.window_end.isoformat(), user_ids)
+        for user_ids in batches
+    ]).apply_async()
+    logger.info(f"Queued {len(batches)} {frequency.lower()} digest batches")
+    return len(batches)
+
+@shared_task(bind=True, max_retries=3, default_retry_delay=60)
+def send_digest_batch(self, frequency, window_end, user_ids):
+    """Send one batch of digest emails; later batches wait until it succeeds"""
+    from .services.notification_digest import NotificationDigestService
+
+    try:
+        service = NotificationDigestService(frequency, datetime.fromisoformat(window_end))
+        return service.send_batch(user_ids)
+    except Exception as e:
+        logger.error(f"Error sending {frequency.lower()} digest batch: {str(e)}")
+        raise self.retry(exc=e)
+
+@shared_task
+def refresh_search_suggestions():
+    """Republish the autocomplete snapshot so it picks up trending searches"""
+    from .services.autocomplete import AutocompleteService
+
+    AutocompleteService.publish_snapshot()
+
+@shared_task
+def warm_search_cache(limit=20):
+    """Cache the first results page of the most searched queries"""
+    from .services.search import SearchService
+    from .services.search_trends import search_trends
+
+    trending = search_trends.trending(limit)
+    for query, _ in trending:
+        SearchService.search_apps(query=query)
+    return len(trending)
+
+@shared_task
+def flush_feature_usage():
+    """Copy metered feature usage from the cache to SubscriptionFeatureUsage"""
+    from .services.usage_metering import UsageMeter
+
+    return UsageMeter.flush()
+
+@shared_task
+def reset_usage_counters():
+    """Zero stored feature usage counters whose day or month has ended"""
+    from .services.subscription import SubscriptionService
+
+    return SubscriptionService.reset_usage_counters()
+
+@shared_task
+def renew_subscriptions():
+    """Renew or deactivate expired subscriptions"""
+    from .services.subscription import SubscriptionService
+
+    return SubscriptionService.check_subscription_status()
+
+@shared_task
+def snapshot_escrow_balances():
+    """Roll new escrow ledger entries into per-app balance snapshots"""
+    from .services.escrow_ledger import EscrowLedger
+
+    return EscrowLedger.snapshot()
+
+@shared_task
+def prune_api_rollups():
+    """Delete API request rollups past their retention period"""
+    from .services.monitoring.api_telemetry import api_telemetry
+
+    return api_telemetry.prune()
+
 @shared_task
 def check_platform_fees():
     """Run the platform fee check command"""
@@ -55,6 +212,46 @@ def check_platform_fees():
         logger.error(f'Error in platform fee check task: {str(e)}')
         raise 
 
+@shared_task
+def build_revenue_rollups():
+    """Roll up revenue for closed months"""
+    try:
+        logger.info('Starting revenue rollup task')
+        call_command('rollup_revenue')
+        logger.info('Completed revenue rollup task')
+    except Exception as e:
+        logger.error(f'Error in revenue rollup task: {str(e)}')
+        raise
+
+@shared_task
+def refresh_exchange_rates():
+    """Publish fresh exchange rates to the shared cache"""
+    from .services.exchange_rates import ExchangeRateService
+    try:
+        snapshot = ExchangeRateService.refresh_rates()
+        logger.info(f'Refreshed exchange rates from {snapshot.source}')
+    except Exception as e:
+        logger.error(f'Error refreshing exchange rates: {str(e)}')
+        raise
+
+@shared_task(ignore_result=True)
+def resolve_ip_currency(client_ip):
+    """Look up an IP's country with the geolocation provider and cache its currency"""
+    import requests
+    from django.core.cache import cache
+    from .middleware.currency import (
+        currency_for_country, IP_CURRENCY_CACHE_TIMEOUT
+    )
+    try:
+        response = requests.get(f'https://ipapi.co/{client_ip}/json/', timeout=5)
+        response.raise_for_status()
+        currency = currency_for_country(response.json().get('country_code'))
+        cache.set(f'currency_for_ip_{client_ip}', currency, IP_CURRENCY_CACHE_TIMEOUT)
+        return currency
+    except Exception as e:
+        logger.warning(f'Error resolving currency for {client_ip}: {str(e)}')
+        return None
+
 @shared_task
 def verify_backup_completion():
     """Verify that daily backups were completed successfully."""
@@ -1,30 +1,44 @@
 from django import template
-from ..utils import convert_currency, get_exchange_rate
+from ..services.exchange_rates import ExchangeRateService
 from django.utils.safestring import mark_safe
 from decimal import Decimal, InvalidOperation
 
 register = template.Library()
 
+def _snapshot(context):
+    """Get the exchange rate snapshot pinned to the rendering request"""
+    return ExchangeRateService.get_snapshot(context.get('request'))
+
 @register.filter
 def convert_to_ngn(value):
     """Convert amount to NGN"""
     if value is None:
         return None
-    return convert_currency(value, 'USD', 'NGN')
+    return ExchangeRateService.convert(value, 'USD', 'NGN')
 
-@register.simple_tag
-def get_ngn_rate():
+@register.simple_tag(takes_context=True)
+def get_ngn_rate(context):
     """Get NGN exchange rate"""
-    return get_exchange_rate('USD', 'NGN')
+    return _snapshot(context).get_rate('USD', 'NGN')
 
-@register.simple_tag
-def dual_currency(amount, primary_currency, secondary_currency, exchange_rate):
-    """Display amount in NGN with proper formatting"""
+@register.simple_tag(takes_context=True)
+def dual_currency(context, amount, primary_currency, secondary_currency, exchange_rate=None):
+    """Display amount in NGN with proper formatting
+    
+    Uses exchange_rate when one is given, otherwise converts from
+    primary_currency with the request's rate snapshot.
+    """
     try:
         # Convert exchange_rate to Decimal if it's a string
         rate = Decimal(str(exchange_rate))
+    except (TypeError, ValueError, InvalidOperation):
+        try:
+            rate = _snapshot(context).get_rate(primary_currency or 'NGN', 'NGN')
+        except ValueError:
+            rate = Decimal('1')
+    try:
         amount_ngn = amount * rate
         return mark_safe(f"₦{amount_ngn:,.2f}")
     except (TypeError, ValueError, InvalidOperation):
         # Fallback to just showing the amount
-        return mark_safe(f"₦{amount:,.2f}") 
\ No newline at end of file
+        return mark_safe(f"₦{amount:,.2f}")
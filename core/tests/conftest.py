@@ -6,6 +6,20 @@ from django.utils import timezone
 
 User = get_user_model()
 
+@pytest.fixture(autouse=True)
+def sync_audit_log(settings):
+    """Write request audit entries in the test thread.
+
+    The batching writer thread uses its own database connection, so its
+    writes would escape each test's transaction and outlive the test.
+    """
+    settings.AUDIT_LOG_ASYNC = False
+
+@pytest.fixture(autouse=True)
+def inline_search_index_build(settings):
+    """Build the app search index in the test thread, where the test's rows are visible"""
+    settings.SEARCH_INDEX_BACKGROUND_BUILD = False
+
 @pytest.fixture
 def client():
     return Client()
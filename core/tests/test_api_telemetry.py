@@ -0,0 +1,116 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.models import APIRequest, APIError, APIRequestRollup
+from core.services.monitoring.api_telemetry import APITelemetryCollector
+
+User = get_user_model()
+
+@override_settings(API_TELEMETRY_SAMPLE_RATE=0)
+class APITelemetryCollectorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.collector = APITelemetryCollector()
+
+    def _record(self, count, status_code=200, response_time_ms=20, endpoint='/api/v1/apps/'):
+        for _ in range(count):
+            self.collector.record(endpoint, 'GET', status_code, response_time_ms)
+
+    def test_flush_merges_into_minute_rollups(self):
+        self._record(8)
+        self._record(2, status_code=503, response_time_ms=400)
+        self.assertEqual(APIRequestRollup.objects.count(), 0)
+
+        self.collector.flush()
+        self._record(5)
+        self.collector.flush()
+
+        rollup = APIRequestRollup.objects.get()
+        self.assertEqual(rollup.request_count, 15)
+        self.assertEqual(rollup.error_count, 2)
+        self.assertEqual(rollup.status_counts, {'200': 13, '503': 2})
+        self.assertAlmostEqual(rollup.max_response_time, 400)
+        self.assertEqual(sum(rollup.latency_histogram.values()), 15)
+        self.assertEqual(APIRequest.objects.count(), 0)
+
+        summary = APITelemetryCollector.summarize(APIRequestRollup.objects.all())
+        self.assertEqual(summary['requests'], 15)
+        self.assertAlmostEqual(summary['p50_response_time'], 20, delta=1)
+        self.assertAlmostEqual(summary['p99_response_time'], 400, delta=20)
+
+    @override_settings(API_TELEMETRY_SAMPLE_RATE=1)
+    def test_sampled_requests_are_stored_raw(self):
+        self._record(3)
+        self.collector.flush()
+        self.assertEqual(APIRequest.objects.count(), 3)
+
+    def test_errors_are_always_stored(self):
+        self.collector.record(
+            '/api/v1/apps/', 'POST', 500, 12, error=(ValueError('boom'), 'Traceback ...')
+        )
+        self.collector.flush()
+
+        error = APIError.objects.get()
+        self.assertEqual(error.error_type, 'ValueError')
+        self.assertEqual(error.request.status_code, 500)
+        self.assertEqual(cache.get('api_error_stats')['types'], {'ValueError': 1})
+
+    def test_flush_runs_in_background_when_due(self):
+        self.collector._next_flush = 0
+        with patch('core.services.monitoring.api_telemetry.threading.Thread') as thread:
+            self._record(2)
+        thread.assert_called_once()
+        thread.return_value.start.assert_called_once()
+
+
+    @override_settings(API_TELEMETRY_RETENTION_DAYS=7)
+    def test_old_rollups_are_pruned(self):
+        now = timezone.now()
+        for days in (1, 8, 30):
+            APIRequestRollup.objects.create(
+                bucket=self.collector.bucket_for(now - timedelta(days=days)),
+                endpoint='/api/v1/apps/',
+                method='GET',
+                request_count=1
+            )
+        self.assertEqual(self.collector.prune(now=now, chunk_size=1), 2)
+        self.assertEqual(list(APIRequestRollup.objects.values_list('request_count', flat=True)), [1])
+        self.assertEqual(self.collector.prune(now=now), 0)
+
+    def test_buffered_telemetry_is_flushed_at_exit(self):
+        with patch('core.services.monitoring.api_telemetry.atexit.register') as register:
+            collector = APITelemetryCollector()
+        collector.record('/api/v1/apps/', 'GET', 500, 20, error=(RuntimeError('boom'), 'Traceback'))
+        with patch('core.services.monitoring.api_telemetry.connections.close_all'):
+            register.call_args[0][0]()
+        self.assertEqual(APIRequestRollup.objects.get().error_count, 1)
+        self.assertEqual(APIError.objects.get().error_type, 'RuntimeError')
+
+class APIMonitoringStatisticsTests(TestCase):
+    def setUp(self):
+        self.admin = User.objects.create_user(
+            username='admin',
+            email='admin@example.com',
+            password='testpass123',
+            is_staff=True
+        )
+        self.client = APIClient()
+        self.client.force_authenticate(self.admin)
+
+    @override_settings(API_TELEMETRY_SAMPLE_RATE=0)
+    def test_statistics_read_rollups(self):
+        collector = APITelemetryCollector()
+        for status_code in (200, 200, 200, 500):
+            collector.record('/api/v1/apps/', 'GET', status_code, 10)
+        collector.flush()
+
+        response = self.client.get('/api/v1/monitoring/statistics/', secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.data['total_requests'], 4)
+        self.assertEqual(response.data['recent_requests'], 4)
+        self.assertEqual(response.data['error_rate'], 25)
+        self.assertEqual(response.data['endpoint_usage'], [{'endpoint': '/api/v1/apps/', 'count': 4}])
@@ -0,0 +1,63 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.test import APIClient
+from core.api.serializers import AppListingSerializer
+from core.models import AppListing
+
+User = get_user_model()
+
+class AppListingAPIQueryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.client = APIClient()
+        self.viewer = User.objects.create_user(
+            username='viewer',
+            email='viewer@example.com',
+            password='testpass123'
+        )
+        self.client.force_authenticate(self.viewer)
+        for i in range(12):
+            developer = User.objects.create_user(
+                username=f'developer{i}',
+                email=f'developer{i}@example.com',
+                password='testpass123'
+            )
+            AppListing.objects.create(
+                name=f'App {i}',
+                description='An app',
+                ai_features='Computer vision',
+                developer=developer,
+                funding_goal=Decimal('1000.00'),
+                status='ACTIVE',
+                exchange_rate=Decimal('1.00'),
+                currency='NGN',
+                available_percentage=Decimal('20.00'),
+                equity_percentage=Decimal('20.00'),
+                funding_end_date=timezone.now() + timedelta(days=30)
+            )
+
+    def _list(self, page_size):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get('/api/v1/apps/', {'page_size': page_size}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(len(response.data['results']), page_size)
+        return len(queries)
+
+    def test_query_count_does_not_grow_with_page_size(self):
+        self._list(1)  # Warm the cached count
+        self.assertEqual(self._list(2), self._list(10))
+
+    def test_annotated_and_plain_listings_serialize_alike(self):
+        annotated = AppListing.objects.with_funding_summary().order_by('id')[0]
+        plain = AppListing.objects.order_by('id')[0]
+        data = AppListingSerializer(annotated).data
+        self.assertEqual(data, AppListingSerializer(plain).data)
+        self.assertEqual(Decimal(data['company_valuation']), Decimal('5000.00'))
+        self.assertEqual(Decimal(data['retained_shares']), Decimal('80.00'))
+        self.assertEqual(data['developer']['username'], 'developer0')
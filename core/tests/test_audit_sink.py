@@ -0,0 +1,82 @@
+from unittest.mock import patch
+from django.test import RequestFactory, TestCase, override_settings
+from django.http import HttpResponse
+from django.contrib.auth.models import AnonymousUser
+from django.contrib.sessions.backends.db import SessionStore
+from core.middleware.audit_logging import AuditLog, AuditLoggingMiddleware
+from core.services.audit import AuditLogSink
+
+def make_entry(event_type=AuditLog.EventType.ACCESS):
+    return AuditLog(
+        event_type=event_type,
+        ip_address='127.0.0.1',
+        endpoint='/apps/',
+        method='GET',
+        response_status=200,
+        user_agent='test'
+    )
+
+@override_settings(AUDIT_LOG_QUEUE_SIZE=3, AUDIT_LOG_BATCH_SIZE=2, AUDIT_LOG_ENQUEUE_TIMEOUT=0)
+class AuditLogSinkTests(TestCase):
+    def setUp(self):
+        # Test runs turn batching off for the shared sink (see conftest.py)
+        with self.settings(AUDIT_LOG_ASYNC=True):
+            self.sink = AuditLogSink()
+        # Entries stay queued until flush() drains them in the test thread
+        patcher = patch.object(self.sink, '_ensure_writer')
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def test_entries_are_written_in_batches(self):
+        for _ in range(3):
+            self.assertTrue(self.sink.submit(make_entry()))
+        self.assertEqual(AuditLog.objects.count(), 0)
+
+        with patch.object(AuditLog.objects, 'bulk_create', wraps=AuditLog.objects.bulk_create) as bulk_create:
+            self.sink.flush()
+        self.assertEqual(bulk_create.call_count, 2)
+        self.assertEqual(AuditLog.objects.count(), 3)
+        self.assertEqual(self.sink.stats()['written'], 3)
+
+    def test_full_queue_drops_and_counts(self):
+        results = [self.sink.submit(make_entry()) for _ in range(4)]
+        results.append(self.sink.submit(make_entry(AuditLog.EventType.MODIFY)))
+
+        self.assertEqual(results, [True, True, True, False, False])
+        stats = self.sink.stats()
+        self.assertEqual(stats['dropped'], 2)
+        self.assertEqual(stats['dropped_by_type'], {'ACCESS': 1, 'MODIFY': 1})
+        self.assertEqual(stats['queue_size'], 3)
+
+    def test_sync_entries_bypass_queue(self):
+        self.sink.submit(make_entry(AuditLog.EventType.SECURITY), sync=True)
+        self.assertEqual(AuditLog.objects.count(), 1)
+        self.assertEqual(self.sink.stats()['queue_size'], 0)
+
+    def test_write_failures_are_counted(self):
+        with patch.object(AuditLog.objects, 'bulk_create', side_effect=Exception('db down')):
+            self.sink.submit(make_entry(), sync=True)
+        self.assertEqual(self.sink.stats()['failed'], 1)
+
+
+class AuditLoggingMiddlewareTests(TestCase):
+    def _call(self, path, method='get', **extra):
+        request = getattr(RequestFactory(), method)(path, **extra)
+        request.user = AnonymousUser()
+        request.session = SessionStore()
+        AuditLoggingMiddleware(lambda request: HttpResponse('ok'))(request)
+
+    @patch('core.middleware.audit_logging.audit_sink')
+    def test_routes_events_and_redacts_credentials(self, sink):
+        self._call('/apps/', HTTP_AUTHORIZATION='Bearer secret', HTTP_COOKIE='sessionid=abc')
+        self._call('/accounts/login/', method='post')
+
+        (access_entry,), access_kwargs = sink.submit.call_args_list[0]
+        self.assertFalse(access_kwargs['sync'])
+        headers = access_entry.additional_data['headers']
+        self.assertEqual(headers['Authorization'], '[REDACTED]')
+        self.assertEqual(headers['Cookie'], '[REDACTED]')
+
+        (auth_entry,), auth_kwargs = sink.submit.call_args_list[1]
+        self.assertEqual(auth_entry.event_type, AuditLog.EventType.AUTH)
+        self.assertTrue(auth_kwargs['sync'])
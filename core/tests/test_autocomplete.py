@@ -0,0 +1,99 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from core.models import AppListing
+from core.services.autocomplete import AutocompleteService, SuggestionTrie
+
+User = get_user_model()
+
+class SuggestionTrieTests(SimpleTestCase):
+    def setUp(self):
+        self.trie = SuggestionTrie([
+            ('Robot Arm', 'app', 5),
+            ('Robo Advisor', 'app', 50),
+            ('ROBOTICS', 'category', 20),
+            ('Crop Planner', 'app', 1),
+        ])
+
+    def test_prefix_lookup_ranked_by_popularity(self):
+        self.assertEqual(
+            [s['text'] for s in self.trie.lookup('rob')],
+            ['Robo Advisor', 'ROBOTICS', 'Robot Arm']
+        )
+        self.assertEqual([s['text'] for s in self.trie.lookup('robot')], ['ROBOTICS', 'Robot Arm'])
+        self.assertEqual(self.trie.lookup('xyz'), [])
+
+    def test_later_words_are_matched(self):
+        self.assertEqual([s['text'] for s in self.trie.lookup('plan')], ['Crop Planner'])
+        self.assertEqual(self.trie.lookup('arm', limit=1), [{'text': 'Robot Arm', 'type': 'app', 'score': 5}])
+
+    def test_nodes_keep_top_k(self):
+        trie = SuggestionTrie([(f'app {i}', 'app', i) for i in range(SuggestionTrie.TOP_K + 5)])
+        results = trie.lookup('app', limit=20)
+        self.assertEqual(len(results), SuggestionTrie.TOP_K)
+        self.assertEqual(results[0]['text'], f'app {SuggestionTrie.TOP_K + 4}')
+
+
+class AutocompleteServiceTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        AutocompleteService.reset()
+        self.addCleanup(AutocompleteService.reset)
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.app = self._create_app('Robot Arm', investor_count=3)
+        self._create_app('Robot Sketch', status='PENDING')
+
+    def _create_app(self, name, status='ACTIVE', investor_count=0):
+        return AppListing.objects.create(
+            name=name,
+            description='An app',
+            ai_features='Computer vision',
+            developer=self.developer,
+            funding_goal=Decimal('1000.00'),
+            status=status,
+            exchange_rate=Decimal('1.00'),
+            currency='NGN',
+            available_percentage=Decimal('10.00'),
+            equity_percentage=Decimal('10.00'),
+            investor_count=investor_count,
+            funding_end_date=timezone.now() + timedelta(days=30)
+        )
+
+    def test_suggestions_come_from_the_shared_snapshot(self):
+        self.assertEqual(
+            [s['text'] for s in AutocompleteService.suggest('robot')],
+            ['Robot Arm']
+        )
+        self.assertIsNotNone(cache.get(AutocompleteService.SNAPSHOT_KEY))
+
+        # Served from memory without touching the database
+        with self.assertNumQueries(0):
+            AutocompleteService.suggest('rob')
+
+        # Another worker builds its trie from the snapshot
+        AutocompleteService.reset()
+        with self.assertNumQueries(0):
+            self.assertEqual(AutocompleteService.suggest('arm')[0]['text'], 'Robot Arm')
+
+    def test_listing_changes_refresh_suggestions(self):
+        AutocompleteService.suggest('robot')
+        with self.captureOnCommitCallbacks(execute=True):
+            self._create_app('Robot Vacuum', investor_count=10)
+
+        AutocompleteService._checked_at = 0
+        self.assertEqual(
+            [s['text'] for s in AutocompleteService.suggest('robot')],
+            ['Robot Vacuum', 'Robot Arm']
+        )
+
+    def test_suggestions_view(self):
+        response = self.client.get('/search/suggestions/', {'q': 'rob'}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.json()['suggestions'][0]['text'], 'Robot Arm')
@@ -0,0 +1,73 @@
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase
+from core.middleware.currency import CurrencyMiddleware
+from core.services.geoip import IPCountryTable
+
+class IPCountryTableTests(TestCase):
+    def setUp(self):
+        self.table = IPCountryTable([
+            ('102.88.0.0/16', 'ng'),
+            ('8.8.8.0/24', 'US'),
+            ('2c0f:f5c0::/32', 'NG'),
+            ('not-a-network', 'XX'),
+        ])
+
+    def test_lookup(self):
+        self.assertEqual(len(self.table), 3)
+        self.assertEqual(self.table.lookup('102.88.12.34'), 'NG')
+        self.assertEqual(self.table.lookup('8.8.8.8'), 'US')
+        self.assertEqual(self.table.lookup('2c0f:f5c0::1'), 'NG')
+
+    def test_unknown_addresses(self):
+        self.assertIsNone(self.table.lookup('8.8.9.1'))
+        self.assertIsNone(self.table.lookup('1.1.1.1'))
+        self.assertIsNone(self.table.lookup('garbage'))
+        self.assertIsNone(IPCountryTable().lookup('8.8.8.8'))
+
+
+class CurrencyMiddlewareTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.factory = RequestFactory()
+        self.middleware = CurrencyMiddleware(lambda request: None)
+        self.table = IPCountryTable([('102.88.0.0/16', 'NG'), ('8.8.8.0/24', 'US')])
+        patcher = patch('core.middleware.currency.get_ip_country_table', return_value=self.table)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+
+    def _request(self, ip):
+        return self.factory.get('/', REMOTE_ADDR=ip, SERVER_NAME='example.com')
+
+    @patch('core.tasks.resolve_ip_currency.delay')
+    def test_table_hit_does_not_queue_lookup(self, delay):
+        request = self._request('8.8.8.8')
+        self.middleware.process_request(request)
+        self.assertEqual(request.currency, 'USD')
+
+        request = self._request('102.88.1.1')
+        self.middleware.process_request(request)
+        self.assertEqual(request.currency, 'NGN')
+        delay.assert_not_called()
+
+    @patch('core.tasks.resolve_ip_currency.delay')
+    def test_unknown_ip_falls_back_and_queues_once(self, delay):
+        for _ in range(3):
+            request = self._request('1.2.3.4')
+            self.middleware.process_request(request)
+            self.assertEqual(request.currency, 'NGN')
+        delay.assert_called_once_with('1.2.3.4')
+
+    @patch('core.tasks.resolve_ip_currency.delay')
+    def test_resolved_currency_is_read_from_cache(self, delay):
+        cache.set('currency_for_ip_1.2.3.4', 'USD')
+        request = self._request('1.2.3.4')
+        self.middleware.process_request(request)
+        self.assertEqual(request.currency, 'USD')
+        delay.assert_not_called()
+
+    @patch('core.tasks.resolve_ip_currency.delay', side_effect=Exception('broker down'))
+    def test_queue_failure_does_not_break_request(self, delay):
+        request = self._request('1.2.3.4')
+        self.middleware.process_request(request)
+        self.assertEqual(request.currency, 'NGN')
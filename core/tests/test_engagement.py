@@ -0,0 +1,112 @@
+from decimal import Decimal
+from datetime import timedelta
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.models import AppListing, AppComment, CommunityVote, AppEngagementCounter
+
+User = get_user_model()
+
+class EngagementCounterTests(TestCase):
+    def setUp(self):
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.voters = [
+            User.objects.create_user(
+                username=f'voter{i}',
+                email=f'voter{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(3)
+        ]
+        self.app = AppListing.objects.create(
+            name='Engagement App',
+            description='Test Description',
+            developer=self.developer,
+            funding_goal=Decimal('1000.00'),
+            available_percentage=Decimal('10.00'),
+            equity_percentage=Decimal('10.00'),
+            status=AppListing.Status.ACTIVE,
+            exchange_rate=Decimal('1.00'),
+            ai_features='Test AI Features',
+            remaining_percentage=Decimal('10.00'),
+            price_per_percentage=Decimal('100.00'),
+            funding_end_date=timezone.now() + timedelta(days=30)
+        )
+
+    def _app(self):
+        return AppListing.objects.select_related('engagement_counter').get(pk=self.app.pk)
+
+    def test_counter_created_with_app(self):
+        """Test a counter record is created for new apps"""
+        self.assertTrue(AppEngagementCounter.objects.filter(app=self.app).exists())
+
+    def test_votes_update_counters(self):
+        """Test vote creation and deletion keep the counters in step"""
+        for voter in self.voters:
+            CommunityVote.objects.create(user=voter, app=self.app, vote_type='UPVOTE')
+        CommunityVote.objects.create(user=self.voters[0], app=self.app, vote_type='LIKE')
+        CommunityVote.objects.get(user=self.voters[1], vote_type='UPVOTE').delete()
+
+        app = self._app()
+        with self.assertNumQueries(0):
+            self.assertEqual(app.upvote_count, 2)
+            self.assertEqual(app.like_count, 1)
+            self.assertEqual(app.get_total_upvotes(), 2)
+            self.assertEqual(app.engagement.get_recent_vote_count(), 3)
+
+    def test_comments_update_counters(self):
+        """Test comments and replies are counted like get_total_comments()"""
+        comment = AppComment.objects.create(app=self.app, user=self.voters[0], content='Hi')
+        AppComment.objects.create(app=self.app, user=self.voters[1], content='Reply', parent=comment)
+        AppComment.objects.create(
+            app=self.app, user=self.voters[2], content='System', is_system_generated=True
+        )
+        self.assertEqual(self._app().get_total_comments(), 3)
+
+        # Deleting the parent cascades to its reply
+        comment.delete()
+        self.assertEqual(self._app().get_total_comments(), 0)
+
+    @override_settings(TRENDING_VOTE_THRESHOLD=2)
+    def test_trending_uses_rolling_window(self):
+        """Test only votes inside the 7-day window count towards trending"""
+        old_vote = CommunityVote.objects.create(user=self.voters[0], app=self.app, vote_type='UPVOTE')
+        CommunityVote.objects.filter(pk=old_vote.pk).update(
+            created_at=timezone.now() - timedelta(days=10)
+        )
+        CommunityVote.objects.create(user=self.voters[1], app=self.app, vote_type='UPVOTE')
+
+        counter = AppEngagementCounter.rebuild(self.app)
+        self.assertEqual(counter.get_recent_vote_count(), 1)
+        self.assertFalse(self._app().is_trending)
+
+        CommunityVote.objects.create(user=self.voters[2], app=self.app, vote_type='LIKE')
+        self.assertTrue(self._app().is_trending)
+
+    def test_rebuild_matches_signals(self):
+        """Test rebuilding from rows gives the same counts as the signals"""
+        CommunityVote.objects.create(user=self.voters[0], app=self.app, vote_type='LIKE')
+        CommunityVote.objects.create(
+            user=self.voters[1], app=self.app, vote_type='LIKE', is_system_generated=True
+        )
+        AppComment.objects.create(app=self.app, user=self.voters[0], content='Hi')
+        before = AppEngagementCounter.objects.get(app=self.app)
+
+        after = AppEngagementCounter.rebuild(self.app)
+
+        for field in ('likes', 'upvotes', 'system_likes', 'system_upvotes', 'comments'):
+            self.assertEqual(getattr(before, field), getattr(after, field))
+        self.assertEqual(before.recent_votes, after.recent_votes)
+
+    def test_deleting_app_removes_counter(self):
+        """Test cascading deletes do not recreate the counter"""
+        CommunityVote.objects.create(user=self.voters[0], app=self.app, vote_type='LIKE')
+        AppComment.objects.create(app=self.app, user=self.voters[0], content='Hi')
+
+        self.app.delete()
+
+        self.assertFalse(AppEngagementCounter.objects.exists())
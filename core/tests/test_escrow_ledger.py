@@ -0,0 +1,123 @@
+from datetime import timedelta
+from decimal import Decimal
+from io import StringIO
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.core.management.base import CommandError
+from django.test import TestCase
+from django.utils import timezone
+from core.models import AppListing, EscrowBalanceSnapshot, EscrowTransaction, ProjectMilestone
+from core.services.escrow_ledger import EscrowLedger
+
+User = get_user_model()
+
+class EscrowLedgerTests(TestCase):
+    def setUp(self):
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.investor = User.objects.create_user(
+            username='investor',
+            email='investor@example.com',
+            password='testpass123'
+        )
+        self.app = self._create_app('Test App')
+
+    def _create_app(self, name):
+        return AppListing.objects.create(
+            name=name,
+            description='An app',
+            ai_features='Computer vision',
+            developer=self.developer,
+            funding_goal=Decimal('100000.00'),
+            status='ACTIVE',
+            exchange_rate=Decimal('1.00'),
+            currency='NGN',
+            available_percentage=Decimal('10.00'),
+            equity_percentage=Decimal('10.00'),
+            funding_end_date=timezone.now() + timedelta(days=30)
+        )
+
+    def _deposit(self, reference, amount=Decimal('1000.00'), status=EscrowTransaction.Status.COMPLETED, app=None):
+        return EscrowTransaction.objects.create(
+            app=AppListing.objects.get(pk=(app or self.app).pk),
+            investor=self.investor,
+            transaction_type=EscrowTransaction.Type.DEPOSIT,
+            amount=amount,
+            currency='NGN',
+            payment_gateway='PAYSTACK',
+            gateway_reference=reference,
+            status=status
+        )
+
+    def _release(self):
+        milestone = ProjectMilestone.objects.create(
+            app=self.app,
+            title='Beta launch',
+            description='Ship the beta',
+            target_date=timezone.now().date() + timedelta(days=30),
+            release_percentage=Decimal('25.00'),
+            status=ProjectMilestone.Status.COMPLETED
+        )
+        return milestone.process_batch_release()
+
+    def _snapshot(self):
+        return EscrowLedger.snapshot(now=timezone.now() + EscrowLedger.SNAPSHOT_LAG)
+
+    def test_ledger_follows_transaction_changes(self):
+        self._deposit('deposit_1')
+        pending = self._deposit('deposit_2', status=EscrowTransaction.Status.PENDING)
+        self.assertEqual(self.app.total_received, Decimal('1000.00'))
+
+        pending.status = EscrowTransaction.Status.COMPLETED
+        pending.save()
+        self._release()
+        self.assertEqual(self.app.total_received, Decimal('2000.00'))
+        self.assertEqual(self.app.total_released, Decimal('500.00'))
+
+        pending.delete()
+        self.assertEqual(
+            (self.app.total_received, self.app.total_released),
+            EscrowLedger.transaction_totals(self.app.id)
+        )
+
+    def test_balances_read_snapshot_plus_recent_entries(self):
+        other = self._create_app('Other App')
+        for i in range(5):
+            self._deposit(f'deposit_{i}')
+            self._deposit(f'other_{i}', app=other)
+        self._release()
+        self.assertEqual(self._snapshot(), 2)
+        self.assertEqual(self._snapshot(), 0)
+        self._deposit('deposit_late')
+
+        # One query for every app, however long their histories
+        with self.assertNumQueries(1):
+            apps = {app.id: app for app in AppListing.objects.with_escrow_totals()}
+            totals = {app_id: (app.total_received, app.total_released) for app_id, app in apps.items()}
+        self.assertEqual(totals[self.app.id], (Decimal('6000.00'), Decimal('1250.00')))
+        self.assertEqual(totals[other.id], (Decimal('5000.00'), Decimal('0.00')))
+        self.assertEqual(EscrowLedger.verify(), [])
+
+    def test_verify_finds_and_repairs_drift(self):
+        for i in range(3):
+            self._deposit(f'deposit_{i}')
+        self._snapshot()
+        self.assertEqual(EscrowLedger.verify(), [])
+
+        EscrowBalanceSnapshot.objects.filter(app=self.app).update(total_received=Decimal('1.00'))
+        # Changes that bypass signals leave the ledger behind
+        EscrowTransaction.objects.filter(gateway_reference='deposit_0').update(amount=Decimal('1500.00'))
+
+        with self.assertRaises(CommandError):
+            call_command('verify_escrow_ledger', stdout=StringIO())
+        self.assertEqual(
+            sorted(problem['kind'] for problem in EscrowLedger.verify()),
+            ['ledger', 'snapshot']
+        )
+
+        call_command('verify_escrow_ledger', repair=True, stdout=StringIO())
+        self.assertEqual(EscrowLedger.verify(), [])
+        self.assertEqual(self.app.total_received, Decimal('3500.00'))
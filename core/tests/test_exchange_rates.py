@@ -0,0 +1,63 @@
+from decimal import Decimal
+from unittest.mock import patch
+from django.core.cache import cache
+from django.test import RequestFactory, TestCase, override_settings
+from core.services.exchange_rates import ExchangeRateService
+from core.utils import get_exchange_rate, convert_currency
+
+@override_settings(
+    USD_TO_NGN_RATE=1000,
+    EXCHANGE_RATES={'EUR': '0.5'},
+    EXCHANGE_RATE_API_URL=None
+)
+class ExchangeRateServiceTests(TestCase):
+    def setUp(self):
+        ExchangeRateService.clear()
+
+    def tearDown(self):
+        ExchangeRateService.clear()
+
+    def test_settings_rates_and_cross_rates(self):
+        self.assertEqual(get_exchange_rate('USD', 'NGN'), Decimal('1000'))
+        self.assertEqual(get_exchange_rate('NGN', 'USD'), Decimal('0.001'))
+        self.assertEqual(get_exchange_rate('EUR', 'NGN'), Decimal('2000'))
+        self.assertEqual(convert_currency(Decimal('2.50'), 'usd', 'ngn'), Decimal('2500'))
+        with self.assertRaises(ValueError):
+            get_exchange_rate('USD', 'JPY')
+
+    def test_convert_many_uses_one_rate(self):
+        converted = ExchangeRateService.convert_many(
+            [Decimal('1'), None, '3.5'], 'USD', 'EUR'
+        )
+        self.assertEqual(converted, [Decimal('0.5'), None, Decimal('1.75')])
+
+    def test_refresh_publishes_provider_rates(self):
+        with patch.object(
+            ExchangeRateService, 'fetch_rates',
+            return_value={'NGN': 1600, 'JPY': '150', 'BAD': 'n/a'}
+        ):
+            snapshot = ExchangeRateService.refresh_rates()
+
+        self.assertEqual(snapshot.source, 'provider')
+        self.assertEqual(cache.get(ExchangeRateService.CACHE_KEY)['rates']['JPY'], '150')
+        self.assertEqual(ExchangeRateService.get_rate('USD', 'NGN'), Decimal('1600'))
+        self.assertEqual(ExchangeRateService.get_rate('USD', 'JPY'), Decimal('150'))
+        # Currencies the provider skipped keep their settings rate
+        self.assertEqual(ExchangeRateService.get_rate('USD', 'EUR'), Decimal('0.5'))
+
+    def test_failed_fetch_keeps_settings_rates(self):
+        with patch.object(ExchangeRateService, 'fetch_rates', side_effect=Exception('down')):
+            snapshot = ExchangeRateService.refresh_rates()
+        self.assertEqual(snapshot.source, 'settings')
+        self.assertEqual(ExchangeRateService.get_rate('USD', 'NGN'), Decimal('1000'))
+
+    def test_snapshot_is_pinned_per_request(self):
+        request = RequestFactory().get('/')
+        snapshot = ExchangeRateService.get_snapshot(request)
+
+        with patch.object(ExchangeRateService, 'fetch_rates', return_value={'NGN': 1600}):
+            ExchangeRateService.refresh_rates()
+
+        self.assertIs(ExchangeRateService.get_snapshot(request), snapshot)
+        self.assertEqual(ExchangeRateService.get_rate('USD', 'NGN', request), Decimal('1000'))
+        self.assertEqual(ExchangeRateService.get_rate('USD', 'NGN'), Decimal('1600'))
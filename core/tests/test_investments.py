@@ -1,5 +1,7 @@
 from decimal import Decimal
+from io import StringIO
 from django.test import TestCase
+from django.core.management import call_command
 from django.contrib.auth import get_user_model
 from core.models import AppListing, Investment, Transaction, ShareOwnership
 from django.db.models import Sum
@@ -149,3 +151,122 @@ class InvestmentTests(TestCase):
         # Verify app is fully funded
         self.assertEqual(self.app.remaining_percentage, Decimal('0.00'))
         self.assertEqual(self.app.status, AppListing.Status.FUNDED) 
+
+
+class FundingCounterTests(TestCase):
+    def setUp(self):
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.investors = [
+            User.objects.create_user(
+                username=f'investor{i}',
+                email=f'investor{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(2)
+        ]
+        self.app = AppListing.objects.create(
+            name='Counter App',
+            description='Test Description',
+            developer=self.developer,
+            funding_goal=Decimal('10000.00'),
+            available_percentage=Decimal('10.00'),
+            equity_percentage=Decimal('10.00'),
+            status=AppListing.Status.ACTIVE,
+            exchange_rate=Decimal('1.00'),
+            ai_features='Test AI Features',
+            remaining_percentage=Decimal('10.00'),
+            price_per_percentage=Decimal('1000.00'),
+            funding_end_date=timezone.now() + timezone.timedelta(days=30)
+        )
+
+    def _bulk_invest(self, *rows):
+        # bulk_create skips Investment.save(), leaving the counters stale
+        Investment.objects.bulk_create([
+            Investment(
+                investor=investor,
+                app=self.app,
+                percentage_bought=Decimal('1.00'),
+                amount_paid=amount,
+                transaction_id=f'bulk_{i}'
+            )
+            for i, (investor, amount) in enumerate(rows)
+        ])
+
+    def test_investments_increment_counters(self):
+        """Test Investment.save updates the counters and stale copies cannot revert them"""
+        stale = AppListing.objects.get(pk=self.app.pk)
+        for investor, amount in ((self.investors[0], '1000.00'), (self.investors[0], '500.00'), (self.investors[1], '1000.00')):
+            Investment.objects.create(
+                investor=investor,
+                app=self.app,
+                amount_paid=Decimal(amount),
+                transaction_id=f'txn_{investor.pk}_{amount}'
+            )
+
+        # A full save of a copy loaded before the investments
+        stale.view_count += 1
+        stale.save()
+        self.app.refresh_from_db()
+
+        self.assertEqual(self.app.raised_amount, Decimal('2500.00'))
+        self.assertEqual(self.app.investor_count, 2)
+        self.assertEqual(self.app.funding_progress, Decimal('25.00'))
+        self.assertEqual(self.app.view_count, 1)
+        self.assertFalse(self.app.refresh_funding_counters())
+
+    def test_refresh_funding_counters(self):
+        """Test counters are recalculated from investments"""
+        self._bulk_invest(
+            (self.investors[0], Decimal('1000.00')),
+            (self.investors[0], Decimal('500.00')),
+            (self.investors[1], Decimal('1000.00')),
+        )
+
+        self.assertTrue(self.app.refresh_funding_counters())
+        self.app.refresh_from_db()
+
+        self.assertEqual(self.app.get_raised_amount(), Decimal('2500.00'))
+        self.assertEqual(self.app.get_investor_count(), 2)
+        self.assertEqual(self.app.get_funding_progress(), Decimal('25.00'))
+        self.assertFalse(self.app.refresh_funding_counters())
+
+    def test_funding_progress_follows_goal(self):
+        """Test progress is recalculated when the funding goal changes"""
+        self._bulk_invest((self.investors[0], Decimal('1000.00')))
+        self.app.refresh_funding_counters()
+
+        self.app.funding_goal = Decimal('4000.00')
+        self.app.save()
+        self.app.refresh_from_db()
+
+        self.assertEqual(self.app.funding_progress, Decimal('25.00'))
+
+    def test_delete_updates_counters(self):
+        """Test deleting an investment decrements the counters"""
+        self._bulk_invest(
+            (self.investors[0], Decimal('1000.00')),
+            (self.investors[1], Decimal('1000.00')),
+        )
+        self.app.refresh_funding_counters()
+
+        Investment.objects.get(investor=self.investors[1]).delete()
+        self.app.refresh_from_db()
+
+        self.assertEqual(self.app.raised_amount, Decimal('1000.00'))
+        self.assertEqual(self.app.investor_count, 1)
+        self.assertEqual(self.app.funding_progress, Decimal('10.00'))
+
+    def test_reconcile_command_repairs_drift(self):
+        """Test the reconcile command repairs stale counters"""
+        self._bulk_invest((self.investors[0], Decimal('2000.00')))
+
+        call_command('reconcile_funding_counters', stdout=StringIO())
+        self.app.refresh_from_db()
+
+        self.assertEqual(self.app.raised_amount, Decimal('2000.00'))
+        self.assertEqual(self.app.investor_count, 1)
+        self.assertEqual(self.app.funding_progress, Decimal('20.00'))
@@ -0,0 +1,92 @@
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase
+from unittest.mock import patch
+from core.middleware.monitoring import PerformanceMonitoringMiddleware
+from core.services.monitoring.histogram import LatencyHistogram, MetricsAggregator
+from core.services.monitoring.metrics import SystemMetricsService
+
+class LatencyHistogramTests(TestCase):
+    def test_percentiles_within_bucket_error(self):
+        histogram = LatencyHistogram()
+        for ms in range(1, 1001):
+            histogram.record(ms / 1000)
+
+        summary = histogram.summary()
+        self.assertEqual(summary['count'], 1000)
+        self.assertAlmostEqual(summary['avg'], 0.5005)
+        self.assertEqual((summary['min'], summary['max']), (0.001, 1.0))
+        for percent, expected in ((50, 0.5), (95, 0.95), (99, 0.99)):
+            self.assertAlmostEqual(summary[f'p{percent}'], expected, delta=expected * 0.05)
+
+    def test_merge_and_round_trip(self):
+        first, second = LatencyHistogram(), LatencyHistogram()
+        for value in (0.01, 0.02):
+            first.record(value)
+        second.record(2.0)
+
+        merged = LatencyHistogram.from_dict(first.to_dict()).merge(second)
+        self.assertEqual(merged.count, 3)
+        self.assertEqual((merged.min, merged.max), (0.01, 2.0))
+        self.assertEqual(merged.percentile(99), 2.0)
+        self.assertEqual(LatencyHistogram().percentile(50), 0)
+
+
+class MetricsAggregatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_processes_publish_to_separate_slots(self):
+        workers = [MetricsAggregator(), MetricsAggregator()]
+        for worker, value in zip(workers, (0.1, 0.3)):
+            for _ in range(10):
+                worker.record_hit()
+                worker.record_request('GET /apps/', value)
+            worker.flush()
+
+        merged = MetricsAggregator.read_merged()
+        self.assertEqual(merged.overall.count, 20)
+        self.assertEqual(merged.endpoints['GET /apps/'].max, 0.3)
+        self.assertEqual(cache.get('request_count'), 20)
+
+        # A second flush replaces the slot instead of adding to it
+        workers[0].flush()
+        self.assertEqual(MetricsAggregator.read_merged().overall.count, 20)
+
+    def test_errors_are_batched(self):
+        worker = MetricsAggregator()
+        for _ in range(2):
+            worker.record_error({'type': 'ValueError', 'message': 'bad'})
+        self.assertIsNone(cache.get('error_count'))
+
+        worker.flush()
+        self.assertEqual(cache.get('error_count'), 2)
+        self.assertEqual(cache.get('error_types'), {'ValueError': 2})
+        self.assertEqual(len(cache.get('recent_errors')), 2)
+
+    def test_requests_do_not_touch_cache_until_flush_interval(self):
+        worker = MetricsAggregator()
+        with patch('core.services.monitoring.histogram.cache') as mocked_cache:
+            for _ in range(100):
+                worker.record_request('GET /', 0.01)
+        mocked_cache.set.assert_not_called()
+        mocked_cache.add.assert_not_called()
+
+
+class ResponseMetricsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+
+    def test_middleware_feeds_response_metrics(self):
+        aggregator = MetricsAggregator()
+        middleware = PerformanceMonitoringMiddleware(lambda request: HttpResponse('ok'))
+        with patch('core.middleware.monitoring.metrics_aggregator', aggregator), \
+                patch('core.services.monitoring.metrics.metrics_aggregator', aggregator):
+            for _ in range(5):
+                middleware(RequestFactory().get('/apps/'))
+            metrics = SystemMetricsService.get_response_metrics()
+
+        self.assertEqual(metrics['total_requests'], 5)
+        self.assertIn('GET /apps/', metrics['endpoint_metrics'])
+        self.assertLessEqual(metrics['p50_response_time'], metrics['p99_response_time'])
+        self.assertLessEqual(metrics['p99_response_time'], metrics['max_response_time'])
@@ -0,0 +1,124 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.test import TestCase
+from django.utils import timezone
+from core.models import AppListing, EscrowTransaction, ProjectMilestone
+
+User = get_user_model()
+
+class MilestoneReleaseTests(TestCase):
+    def setUp(self):
+        developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.app = AppListing.objects.create(
+            name='Test App',
+            description='An app',
+            ai_features='Computer vision',
+            developer=developer,
+            funding_goal=Decimal('100000.00'),
+            status='ACTIVE',
+            exchange_rate=Decimal('1.00'),
+            currency='NGN',
+            available_percentage=Decimal('10.00'),
+            equity_percentage=Decimal('10.00'),
+            funding_end_date=timezone.now() + timedelta(days=30)
+        )
+        self.milestone = ProjectMilestone.objects.create(
+            app=self.app,
+            title='Beta launch',
+            description='Ship the beta',
+            target_date=timezone.now().date() + timedelta(days=30),
+            release_percentage=Decimal('25.00'),
+            status=ProjectMilestone.Status.COMPLETED
+        )
+
+    def _deposit(self, i, amount=Decimal('1000.00')):
+        investor = User.objects.create_user(
+            username=f'investor{i}',
+            email=f'investor{i}@example.com',
+            password='testpass123'
+        )
+        return EscrowTransaction.objects.create(
+            app=AppListing.objects.get(pk=self.app.pk),
+            investor=investor,
+            transaction_type=EscrowTransaction.Type.DEPOSIT,
+            amount=amount,
+            currency='NGN',
+            payment_gateway='PAYSTACK',
+            gateway_reference=f'deposit_{i}',
+            status=EscrowTransaction.Status.COMPLETED
+        )
+
+    def _releases(self):
+        return EscrowTransaction.objects.filter(
+            milestone=self.milestone,
+            transaction_type=EscrowTransaction.Type.MILESTONE_RELEASE
+        )
+
+    def test_batch_release_is_set_based(self):
+        for i in range(3):
+            self._deposit(i)
+        self._deposit(3, Decimal('333.33'))
+
+        # Release checks, then one chunk (lock, read, bulk insert, balance
+        # update, ledger entry), an empty chunk and a refresh, whatever the
+        # deposit count
+        with self.assertNumQueries(14):
+            result = self.milestone.process_batch_release()
+
+        self.assertEqual(result['success_count'], 4)
+        self.assertEqual(result['total_released'], Decimal('833.33'))
+        self.app.refresh_from_db()
+        self.assertEqual(self.app.funds_in_escrow, Decimal('3333.33') - Decimal('833.33'))
+        self.assertEqual(self.app.escrow_status, 'PARTIALLY_RELEASED')
+        self.assertEqual(
+            sorted(self._releases().values_list('amount', flat=True)),
+            [Decimal('83.33'), Decimal('250.00'), Decimal('250.00'), Decimal('250.00')]
+        )
+        self.assertFalse(self._releases().exclude(status=EscrowTransaction.Status.COMPLETED).exists())
+
+        # Already released deposits are not released again
+        self.assertEqual(self.milestone.process_batch_release()['success_count'], 0)
+        self.assertEqual(self._releases().count(), 4)
+
+    def test_interrupted_release_resumes_from_committed_chunks(self):
+        deposits = [self._deposit(i) for i in range(5)]
+        bulk_create = EscrowTransaction.objects.bulk_create
+        calls = []
+
+        def fail_second_chunk(objs, *args, **kwargs):
+            calls.append(len(objs))
+            if len(calls) == 2:
+                raise RuntimeError('Connection lost')
+            return bulk_create(objs, *args, **kwargs)
+
+        with patch.object(EscrowTransaction.objects, 'bulk_create', side_effect=fail_second_chunk):
+            with self.assertRaises(RuntimeError):
+                self.milestone.release_escrow(chunk_size=2)
+
+        self.assertEqual(
+            list(self._releases().order_by('original_transaction_id').values_list('original_transaction_id', flat=True)),
+            [deposits[0].id, deposits[1].id]
+        )
+        self.app.refresh_from_db()
+        self.assertEqual(self.app.funds_in_escrow, Decimal('4500.00'))
+
+        result = self.milestone.release_escrow(chunk_size=2)
+        self.assertEqual(result['success_count'], 3)
+        self.assertEqual(result['last_transaction_id'], deposits[-1].id)
+        self.assertEqual(self._releases().count(), 5)
+        self.app.refresh_from_db()
+        self.assertEqual(self.app.funds_in_escrow, Decimal('3750.00'))
+
+    def test_release_cannot_exceed_escrow_balance(self):
+        self._deposit(0)
+        AppListing.objects.filter(pk=self.app.pk).update(funds_in_escrow=Decimal('100.00'))
+
+        with self.assertRaises(ValueError):
+            self.milestone.process_batch_release()
+        self.assertFalse(self._releases().exists())
@@ -0,0 +1,94 @@
+from datetime import timedelta
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from django.utils import timezone
+from core.models import Notification
+from core.services.notification_digest import NotificationDigestService
+from core.tasks import send_notification_digest
+
+User = get_user_model()
+
+@override_settings(NOTIFICATION_DIGEST_BATCH_SIZE=2)
+class NotificationDigestTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.window_end = timezone.now().replace(minute=0, second=0, microsecond=0) + timedelta(hours=1)
+        self.users = [self._create_user(f'daily{i}', 'DAILY') for i in range(3)]
+        self.immediate = self._create_user('immediate', 'IMMEDIATE')
+
+        for user in self.users + [self.immediate]:
+            for i in range(2):
+                Notification.objects.create(
+                    user=user,
+                    type=Notification.Type.INVESTMENT,
+                    title=f'Update {i} for {user.username}',
+                    message='Your investment was confirmed'
+                )
+        # Outside the window
+        old = Notification.objects.create(
+            user=self.users[0],
+            type=Notification.Type.NEWS,
+            title='Old news',
+            message='Last week'
+        )
+        Notification.objects.filter(pk=old.pk).update(created_at=self.window_end - timedelta(days=3))
+
+    def _create_user(self, username, frequency):
+        user = User.objects.create_user(
+            username=username,
+            email=f'{username}@example.com',
+            password='testpass123'
+        )
+        preferences = user.notification_preferences
+        preferences.notification_frequency = frequency
+        preferences.save()
+        return user
+
+    def _service(self):
+        return NotificationDigestService('DAILY', self.window_end)
+
+    def test_run_sends_one_digest_per_user_in_batches(self):
+        service = self._service()
+        self.assertEqual(
+            service.pending_batches(),
+            [[self.users[0].id, self.users[1].id], [self.users[2].id]]
+        )
+
+        self.assertEqual(service.run(), 3)
+
+        self.assertEqual(len(mail.outbox), 3)
+        self.assertEqual(sorted(m.to[0] for m in mail.outbox), [f'daily{i}@example.com' for i in range(3)])
+        body = mail.outbox[0].alternatives[0][0]
+        self.assertIn('Update 1 for daily0', body)
+        self.assertNotIn('Old news', body)
+        self.assertEqual(service.pending_batches(), [])
+
+    def test_batch_queries_do_not_grow_with_users(self):
+        service = self._service()
+        service.template  # Compiled once per run
+        with self.assertNumQueries(2):
+            messages = service.build_messages([user.id for user in self.users])
+        self.assertEqual(len(messages), 3)
+
+    def test_resumes_after_checkpoint(self):
+        service = self._service()
+        first, second = service.pending_batches()
+        service.send_batch(first)
+
+        resumed = self._service()
+        self.assertEqual(resumed.pending_batches(), [second])
+        # A retried batch is not sent twice
+        self.assertEqual(resumed.send_batch(first), 0)
+        self.assertEqual(resumed.run(), 1)
+        self.assertEqual(len(mail.outbox), 3)
+
+    @patch('celery.chain')
+    def test_task_queues_a_chain_of_batches(self, chain):
+        self.assertEqual(send_notification_digest('DAILY', self.window_end.isoformat()), 2)
+        signatures = chain.call_args[0]
+        self.assertEqual(len(signatures), 2)
+        self.assertEqual(signatures[0].args, ('DAILY', self.window_end.isoformat(), [self.users[0].id, self.users[1].id]))
+        chain.return_value.apply_async.assert_called_once()
@@ -0,0 +1,115 @@
+from unittest.mock import patch
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.core import mail
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from core.models import Notification
+from core.services.notification_dispatcher import NotificationDispatcher
+from core.services.notification_stream import notification_group
+from core.tasks import deliver_notification_emails
+
+User = get_user_model()
+
+@override_settings(NOTIFICATION_DISPATCH_CHUNK_SIZE=2)
+class NotificationDispatcherTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.users = [
+            User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@example.com',
+                password='testpass123'
+            )
+            for i in range(5)
+        ]
+
+    def _dispatch(self, **kwargs):
+        with self.captureOnCommitCallbacks(execute=True):
+            return NotificationDispatcher.dispatch(
+                User.objects.all(),
+                type=Notification.Type.SYSTEM,
+                title='Platform announcement',
+                message='We are launching a new feature',
+                **kwargs
+            )
+
+    @patch('core.tasks.deliver_push_notifications.delay')
+    @patch('core.tasks.deliver_notification_emails.delay')
+    def test_dispatch_bulk_creates_and_queues_chunks(self, email_delay, push_delay):
+        with patch.object(Notification.objects, 'bulk_create', wraps=Notification.objects.bulk_create) as bulk_create:
+            result = self._dispatch(
+                email={'subject': 'News', 'template': 'core/emails/notification.html', 'context': {'title': 'News'}},
+                push=True
+            )
+
+        self.assertEqual(bulk_create.call_count, 3)
+        self.assertEqual(Notification.objects.filter(title='Platform announcement').count(), 5)
+        self.assertEqual(result, {'recipients': 5, 'in_app': 5, 'email_batches': 3, 'push_batches': 3})
+
+        self.assertEqual(email_delay.call_count, 3)
+        user_ids, kwargs = email_delay.call_args_list[0]
+        self.assertEqual(len(user_ids[0]), 2)
+        self.assertEqual(kwargs['recipient_key'], 'user')
+        self.assertEqual(push_delay.call_count, 3)
+
+        stats = NotificationDispatcher.stats()
+        self.assertEqual(stats['in_app']['created'], 5)
+        self.assertEqual(stats['realtime']['published'], 5)
+        self.assertEqual(stats['email']['queued'], 5)
+        self.assertEqual(stats['push']['queued'], 5)
+
+    def test_dispatch_publishes_to_user_groups(self):
+        channel_layer = get_channel_layer()
+        channel_name = async_to_sync(channel_layer.new_channel)()
+        async_to_sync(channel_layer.group_add)(notification_group(self.users[3].id), channel_name)
+
+        self._dispatch()
+
+        message = async_to_sync(channel_layer.receive)(channel_name)
+        notification = Notification.objects.get(user=self.users[3])
+        self.assertEqual(message['data']['id'], notification.id)
+        self.assertEqual(message['data']['title'], 'Platform announcement')
+
+    def test_backends_without_returning_ids_reload_only_their_own_rows(self):
+        bulk_create = Notification.objects.bulk_create
+
+        def without_ids(objs, *args, **kwargs):
+            bulk_create(objs, *args, **kwargs)
+            # An identical dispatch running at the same time
+            bulk_create([
+                Notification(user=user, type=Notification.Type.SYSTEM, title='Platform announcement', message='Again')
+                for user in self.users
+            ])
+            for obj in objs:
+                obj.pk = None
+            return objs
+
+        with patch.object(Notification.objects, 'bulk_create', side_effect=without_ids):
+            with patch('core.services.notification_dispatcher.publish_notifications', return_value=0) as publish:
+                result = self._dispatch()
+
+        self.assertEqual(result['in_app'], 5)
+        published = [notification for call in publish.call_args_list for notification in call[0][0]]
+        self.assertEqual(len(published), 5)
+        self.assertTrue(all(notification.pk and notification.message != 'Again' for notification in published))
+
+    def test_email_task_respects_preferences_and_renders_per_user(self):
+        opted_out = self.users[0].notification_preferences
+        opted_out.email_notifications = False
+        opted_out.save()
+
+        deliver_notification_emails(
+            [user.id for user in self.users],
+            subject='News',
+            template='core/emails/legal_update.html',
+            context={'document_type': 'Terms of Service', 'document_version': '2', 'site_url': ''}
+        )
+
+        self.assertEqual(len(mail.outbox), 4)
+        self.assertEqual(mail.outbox[0].to, ['user1@example.com'])
+        self.assertIn('user1', mail.outbox[0].alternatives[0][0])
+        stats = NotificationDispatcher.stats()
+        self.assertEqual(stats['email']['sent'], 4)
+        self.assertEqual(stats['email']['skipped'], 1)
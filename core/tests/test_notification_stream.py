@@ -0,0 +1,110 @@
+import asyncio
+import json
+from asgiref.sync import async_to_sync
+from channels.layers import get_channel_layer
+from django.contrib.auth import get_user_model
+from django.test import TestCase, RequestFactory, override_settings
+from core.models import Notification
+from core.services.notification_stream import (
+    format_sse_event, notification_group, StreamConnectionLimiter, stream_connections
+)
+from core.views.notifications import notification_stream
+
+User = get_user_model()
+
+class NotificationStreamTests(TestCase):
+    def setUp(self):
+        self.user = User.objects.create_user(
+            username='streamer',
+            email='streamer@example.com',
+            password='testpass123'
+        )
+        self.channel_layer = get_channel_layer()
+
+    def _create_notification(self, title='Funding update'):
+        return Notification.objects.create(
+            user=self.user,
+            type=Notification.Type.INVESTMENT,
+            title=title,
+            message='Your investment was confirmed'
+        )
+
+    def _open_stream(self, **headers):
+        request = RequestFactory().get('/notifications/stream/', secure=True, **headers)
+        request.user = self.user
+
+        async def auser():
+            return self.user
+        request.auser = auser
+        return async_to_sync(notification_stream)(request)
+
+    def test_format_sse_event(self):
+        self.assertEqual(
+            format_sse_event({'id': 7}, 7),
+            'id: 7\ndata: {"id": 7}\n\n'
+        )
+
+    @override_settings(NOTIFICATION_STREAM_MAX_CONNECTIONS=1)
+    def test_limiter_caps_open_streams(self):
+        limiter = StreamConnectionLimiter()
+        self.assertTrue(limiter.acquire())
+        self.assertFalse(limiter.acquire())
+        limiter.release()
+        self.assertTrue(limiter.acquire())
+
+    def test_new_notification_is_published_to_group(self):
+        channel_name = async_to_sync(self.channel_layer.new_channel)()
+        async_to_sync(self.channel_layer.group_add)(notification_group(self.user.id), channel_name)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            notification = self._create_notification()
+
+        message = async_to_sync(self.channel_layer.receive)(channel_name)
+        self.assertEqual(message['type'], 'notification_message')
+        self.assertEqual(message['data']['id'], notification.id)
+        self.assertEqual(message['data']['title'], 'Funding update')
+
+    def test_stream_replays_missed_and_pushes_published(self):
+        seen = self._create_notification('Seen')
+        missed = self._create_notification('Missed')
+        response = self._open_stream(HTTP_LAST_EVENT_ID=str(seen.id))
+        self.assertEqual(response['Content-Type'], 'text/event-stream')
+
+        async def read_events():
+            stream = response.streaming_content
+            events = [await stream.__anext__(), await stream.__anext__()]
+            await self.channel_layer.group_send(
+                notification_group(self.user.id),
+                {'type': 'notification_message', 'data': {'id': 99, 'title': 'Live'}}
+            )
+            events.append(await asyncio.wait_for(stream.__anext__(), timeout=5))
+            await stream.aclose()
+            return [event.decode() for event in events]
+
+        retry, replayed, pushed = async_to_sync(read_events)()
+        self.assertTrue(retry.startswith('retry:'))
+        self.assertTrue(replayed.startswith(f'id: {missed.id}\n'))
+        self.assertEqual(json.loads(replayed.split('data: ')[1])['title'], 'Missed')
+        self.assertEqual(pushed, format_sse_event({'id': 99, 'title': 'Live'}, 99))
+        self.assertEqual(stream_connections.active, 0)
+
+    @override_settings(NOTIFICATION_STREAM_MAX_CONNECTIONS=0)
+    def test_stream_rejected_when_process_is_full(self):
+        response = self._open_stream()
+
+        async def read_events():
+            return [event.decode() async for event in response.streaming_content]
+
+        retry, error = async_to_sync(read_events)()
+        self.assertTrue(retry.startswith('retry:'))
+        self.assertEqual(json.loads(error.split('data: ')[1]), {'error': 'Too many open notification streams'})
+
+    def test_unread_stream_holds_no_connection(self):
+        response = self._open_stream()
+        self.assertEqual(stream_connections.active, 0)
+
+        async def close():
+            await response.streaming_content.aclose()
+
+        async_to_sync(close)()
+        self.assertEqual(stream_connections.active, 0)
@@ -0,0 +1,146 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.http import QueryDict
+from django.test import TestCase
+from django.test.utils import CaptureQueriesContext
+from django.utils import timezone
+from rest_framework.exceptions import NotFound
+from rest_framework.request import Request
+from rest_framework.test import APIRequestFactory
+from core.models import AppListing, Notification
+from core.pagination import InvalidCursor, KeysetPagination, KeysetPaginator, estimated_count
+from core.services.search import SearchService
+
+User = get_user_model()
+
+class KeysetPaginatorTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='investor',
+            email='investor@example.com',
+            password='testpass123'
+        )
+        Notification.objects.bulk_create([
+            Notification(user=self.user, type='SYSTEM', title=f'Notice {i}', message='Hello')
+            for i in range(7)
+        ])
+        # Equal timestamps in pairs so the id tiebreak matters
+        now = timezone.now()
+        for i, notification in enumerate(Notification.objects.order_by('id')):
+            Notification.objects.filter(pk=notification.pk).update(created_at=now + timedelta(seconds=i // 2))
+        self.expected = list(Notification.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+
+    def _ids(self, page):
+        return [notification.id for notification in page]
+
+    def test_forward_and_backward_pages(self):
+        paginator = KeysetPaginator(Notification.objects.all(), 3)
+
+        first = paginator.page()
+        self.assertEqual(self._ids(first), self.expected[:3])
+        self.assertFalse(first.has_previous)
+
+        second = paginator.page(first.next_cursor)
+        self.assertEqual(self._ids(second), self.expected[3:6])
+
+        last = paginator.page(second.next_cursor)
+        self.assertEqual(self._ids(last), self.expected[6:])
+        self.assertFalse(last.has_next)
+
+        back = paginator.page(last.previous_cursor)
+        self.assertEqual(self._ids(back), self.expected[3:6])
+        self.assertEqual(self._ids(paginator.page(back.previous_cursor)), self.expected[:3])
+        self.assertFalse(paginator.page(back.previous_cursor).has_previous)
+
+    def test_deep_pages_cost_one_query(self):
+        paginator = KeysetPaginator(Notification.objects.all(), 2)
+        page = paginator.page()
+        while page.has_next:
+            with CaptureQueriesContext(connection) as queries:
+                page = paginator.page(page.next_cursor)
+            self.assertEqual(len(queries), 1)
+            self.assertNotIn('OFFSET', queries[0]['sql'].upper())
+
+    def test_tampered_cursor_is_rejected(self):
+        paginator = KeysetPaginator(Notification.objects.all(), 3)
+        cursor = paginator.page().next_cursor
+        with self.assertRaises(InvalidCursor):
+            paginator.page(cursor[:-4] + 'abcd')
+
+    def test_estimated_count_is_cached(self):
+        queryset = Notification.objects.filter(user=self.user)
+        self.assertEqual(estimated_count(queryset), 7)
+        Notification.objects.filter(pk=self.expected[0]).delete()
+        with self.assertNumQueries(0):
+            self.assertEqual(estimated_count(queryset), 7)
+
+
+class SearchPaginationTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        for i in range(5):
+            AppListing.objects.create(
+                name=f'App {i}',
+                description='An app',
+                ai_features='Computer vision',
+                developer=developer,
+                funding_goal=Decimal('1000.00'),
+                status='ACTIVE',
+                exchange_rate=Decimal('1.00'),
+                currency='NGN',
+                available_percentage=Decimal('10.00'),
+                equity_percentage=Decimal('10.00'),
+                investor_count=i % 2,
+                funding_end_date=timezone.now() + timedelta(days=30)
+            )
+
+    def test_browse_pages_by_cursor(self):
+        expected = list(AppListing.objects.order_by('-investor_count', '-id').values_list('id', flat=True))
+        seen = []
+        cursor = None
+        while True:
+            results = SearchService.search_apps(sort_by='popular', per_page=2, cursor=cursor)
+            self.assertEqual(results['total_results'], 5)
+            seen += [app.id for app in results['results']]
+            cursor = results['next_cursor']
+            if not cursor:
+                break
+        self.assertEqual(seen, expected)
+
+    def test_page_links_keep_every_filter(self):
+        params = {'q': '', 'sort': 'popular', 'status': 'ACTIVE', 'min_price': '0', 'max_price': '10000'}
+        response = self.client.get('/search/', {**params, 'cursor': 'bogus'}, secure=True)
+        self.assertEqual(response.status_code, 200)
+        filter_query = QueryDict(response.context['filter_query'])
+        self.assertEqual(filter_query.dict(), params)
+
+    def test_drf_pagination_uses_cursor_links(self):
+        expected = list(AppListing.objects.order_by('-created_at', '-id').values_list('id', flat=True))
+        factory = APIRequestFactory()
+
+        def fetch(url, **params):
+            pagination = KeysetPagination()
+            request = Request(factory.get(url, params))
+            apps = pagination.paginate_queryset(AppListing.objects.all(), request)
+            return pagination.get_paginated_response([app.id for app in apps]).data
+
+        data = fetch('/api/v1/apps/', page_size=3)
+        self.assertEqual(data['count'], 5)
+        self.assertEqual(data['results'], expected[:3])
+        self.assertIsNone(data['previous'])
+
+        data = fetch(data['next'])
+        self.assertEqual(data['results'], expected[3:])
+        self.assertIsNone(data['next'])
+
+        with self.assertRaises(NotFound):
+            fetch('/api/v1/apps/', cursor='bogus')
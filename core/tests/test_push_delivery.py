@@ -0,0 +1,111 @@
+import json
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase, override_settings
+from core.models import DeviceToken
+from core.services.notification_dispatcher import NotificationDispatcher
+from core.services.notifications import NotificationService
+from core.services.push import PushDeliveryService, get_push_client
+from core.tasks import deliver_push_notifications, send_push_batch
+
+User = get_user_model()
+
+@override_settings(PUSH_NOTIFICATION_CLIENT='core.services.push.FakePushClient')
+class PushDeliveryTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.user = User.objects.create_user(
+            username='pusher',
+            email='pusher@example.com',
+            password='testpass123'
+        )
+        self.client_fake = get_push_client()
+        self.client_fake.reset()
+
+    def test_tokens_are_sent_in_multicast_chunks(self):
+        tokens = [f'token-{i}' for i in range(501)]
+        result = PushDeliveryService.send(tokens, 'Hello', 'World', {'app_id': 1})
+
+        self.assertEqual(result['sent'], 501)
+        self.assertEqual([len(call['tokens']) for call in self.client_fake.calls], [500, 1])
+
+    @patch('core.tasks.send_push_batch.delay')
+    def test_invalid_tokens_are_pruned_and_transient_failures_retried(self, delay):
+        for token in ('phone', 'invalid-laptop', 'unavailable-tablet'):
+            DeviceToken.register(self.user, token)
+
+        result = NotificationService.send_push_notification(self.user, 'Hello', 'World')
+
+        self.assertEqual(result['sent'], 1)
+        self.assertEqual(result['pruned'], 1)
+        self.assertEqual(result['retry'], ['unavailable-tablet'])
+        self.assertEqual(
+            sorted(self.user.device_tokens.values_list('token', flat=True)),
+            ['phone', 'unavailable-tablet']
+        )
+        delay.assert_called_once_with(['unavailable-tablet'], 'Hello', 'World', None)
+
+    def test_opted_out_users_are_skipped(self):
+        DeviceToken.register(self.user, 'phone')
+        preferences = self.user.notification_preferences
+        preferences.push_notifications = False
+        preferences.save()
+
+        self.assertIsNone(NotificationService.send_push_notification(self.user, 'Hello', 'World'))
+        self.assertEqual(self.client_fake.calls, [])
+        self.assertEqual(PushDeliveryService.tokens_for_users([self.user.id]), [])
+
+    @patch('core.tasks.send_push_batch.delay')
+    def test_dispatch_task_queues_token_batches(self, delay):
+        other = User.objects.create_user(username='other', email='other@example.com', password='testpass123')
+        DeviceToken.register(self.user, 'phone')
+        DeviceToken.register(self.user, 'laptop', DeviceToken.Platform.ANDROID)
+
+        deliver_push_notifications([self.user.id, other.id], 'Hello', 'World')
+
+        delay.assert_called_once()
+        self.assertEqual(sorted(delay.call_args[0][0]), ['laptop', 'phone'])
+        self.assertEqual(NotificationDispatcher.stats()['push']['skipped'], 1)
+
+    def test_batch_task_retries_transient_failures_then_gives_up(self):
+        send_push_batch.apply(args=(['phone', 'unavailable-tablet'], 'Hello', 'World'))
+
+        retried = [call['tokens'] for call in self.client_fake.calls]
+        self.assertEqual(retried[0], ['phone', 'unavailable-tablet'])
+        self.assertEqual(retried[1:], [['unavailable-tablet']] * send_push_batch.max_retries)
+        stats = NotificationDispatcher.stats()['push']
+        self.assertEqual(stats['sent'], 1)
+        self.assertEqual(stats['failed'], 1)
+
+    def test_register_and_remove_device_token(self):
+        self.client.force_login(self.user)
+        response = self.client.post(
+            '/notifications/devices/',
+            json.dumps({'token': 'phone', 'platform': 'IOS'}),
+            content_type='application/json',
+            secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(self.user.device_tokens.get().platform, DeviceToken.Platform.IOS)
+
+        response = self.client.delete(
+            '/notifications/devices/',
+            json.dumps({'token': 'phone'}),
+            content_type='application/json',
+            secure=True
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertFalse(self.user.device_tokens.exists())
+
+    def test_device_token_body_must_be_an_object(self):
+        self.client.force_login(self.user)
+        for body in (['phone'], 'phone', {'token': ['phone']}):
+            response = self.client.post(
+                '/notifications/devices/',
+                json.dumps(body),
+                content_type='application/json',
+                secure=True
+            )
+            self.assertEqual(response.status_code, 400)
+        self.assertFalse(self.user.device_tokens.exists())
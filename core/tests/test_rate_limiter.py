@@ -0,0 +1,107 @@
+from unittest.mock import patch
+from django.http import HttpResponse
+from django.test import RequestFactory, TestCase, override_settings
+from redis.exceptions import ConnectionError as RedisConnectionError
+from core.middleware.rate_limit import RateLimitMiddleware
+from core.services.rate_limiter import (
+    LocalRateLimitBackend, RateLimiter, RateLimitPolicy, NotificationRateLimiter,
+    SLIDING_WINDOW_LOG, SLIDING_WINDOW_COUNTER, TOKEN_BUCKET, rate_limiter
+)
+
+class LocalRateLimitBackendTests(TestCase):
+    def setUp(self):
+        self.backend = LocalRateLimitBackend()
+
+    def _hits(self, policy, times):
+        return [self.backend.hit('key', policy, now).allowed for now in times]
+
+    def test_sliding_window_log(self):
+        policy = RateLimitPolicy(3, 10, algorithm=SLIDING_WINDOW_LOG)
+        self.assertEqual(
+            self._hits(policy, [0, 1000, 2000, 3000]),
+            [True, True, True, False]
+        )
+        result = self.backend.hit('key', policy, 9000)
+        self.assertFalse(result.allowed)
+        self.assertEqual(result.retry_after, 1)
+        # The first call leaves the window at 10s
+        self.assertTrue(self.backend.hit('key', policy, 10001).allowed)
+
+    def test_sliding_window_counter_weights_previous_window(self):
+        policy = RateLimitPolicy(4, 10, algorithm=SLIDING_WINDOW_COUNTER)
+        self.assertEqual(self._hits(policy, [1000] * 5), [True] * 4 + [False])
+        # Halfway into the next window half of the previous calls still count
+        self.assertEqual(self._hits(policy, [15000] * 3), [True, True, False])
+        self.assertEqual(self._hits(policy, [30000] * 4), [True] * 4)
+
+    def test_token_bucket_allows_burst_then_refills(self):
+        policy = RateLimitPolicy(1, 1, algorithm=TOKEN_BUCKET, burst=3)
+        self.assertEqual(self._hits(policy, [0, 0, 0, 0]), [True, True, True, False])
+        self.assertEqual(self._hits(policy, [1000, 1000]), [True, False])
+        result = self.backend.hit('key', policy, 1500)
+        self.assertEqual((result.limit, result.retry_after), (3, 1))
+
+    def test_unknown_algorithm(self):
+        with self.assertRaises(ValueError):
+            RateLimitPolicy(1, 1, algorithm='fixed_window')
+
+
+class RateLimiterTests(TestCase):
+    @override_settings(CACHES={'default': {'BACKEND': 'django_redis.cache.RedisCache'}})
+    def test_falls_back_to_local_backend_when_redis_is_down(self):
+        limiter = RateLimiter()
+        policy = RateLimitPolicy(1, 60)
+        with patch.object(limiter, '_redis_hit', side_effect=RedisConnectionError('down')) as redis_hit, \
+                patch.object(limiter, '_get_redis', return_value=object()):
+            self.assertTrue(limiter.hit('key', policy).allowed)
+            self.assertFalse(limiter.hit('key', policy).allowed)
+        self.assertEqual(redis_hit.call_count, 2)
+
+    def test_notification_rate_limiter(self):
+        results = [
+            NotificationRateLimiter.can_send(1, 'ALERT', limit=2, period=60)
+            for _ in range(3)
+        ]
+        self.assertEqual(results, [True, True, False])
+
+
+@override_settings(
+    RATE_LIMITS={
+        'DEFAULT': {'calls': 100, 'period': 60},
+        'API': {'calls': 2, 'period': 60},
+        'SEARCH': {'calls': 1, 'period': 60, 'algorithm': 'sliding_window_log'},
+    },
+    RATE_LIMIT_ROUTES=[('/api/', 'API'), ('/api/v1/search/', 'SEARCH')]
+)
+class RateLimitMiddlewareTests(TestCase):
+    def setUp(self):
+        rate_limiter.local = LocalRateLimitBackend()
+        self.factory = RequestFactory()
+        self.middleware = RateLimitMiddleware(lambda request: HttpResponse('ok'))
+
+    def _get(self, path):
+        request = self.factory.get(path, REMOTE_ADDR='10.0.0.1')
+        return self.middleware(request)
+
+    def test_headers_and_limit(self):
+        response = self._get('/api/v1/apps/')
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response['X-RateLimit-Limit'], '2')
+        self.assertEqual(response['X-RateLimit-Remaining'], '1')
+        self.assertIn('X-RateLimit-Reset', response)
+
+        self._get('/api/v1/apps/')
+        response = self._get('/api/v1/apps/')
+        self.assertEqual(response.status_code, 429)
+        self.assertEqual(response['X-RateLimit-Remaining'], '0')
+        self.assertIn('Retry-After', response)
+
+    def test_longest_route_prefix_wins(self):
+        self.assertEqual(self._get('/api/v1/search/?q=ai').status_code, 200)
+        self.assertEqual(self._get('/api/v1/search/?q=ai').status_code, 429)
+        self.assertEqual(self._get('/api/v1/apps/').status_code, 200)
+
+    def test_unmatched_paths_are_not_limited(self):
+        response = self._get('/apps/')
+        self.assertEqual(response.status_code, 200)
+        self.assertNotIn('X-RateLimit-Limit', response)
@@ -0,0 +1,87 @@
+from decimal import Decimal
+from io import StringIO
+from django.test import TestCase
+from django.core.management import call_command
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.models import AppListing, Revenue, Distribution, ShareOwnership
+from core.services.revenue.distribution import RevenueDistributionService
+
+User = get_user_model()
+
+class BatchedDistributionTests(TestCase):
+    def setUp(self):
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.app = AppListing.objects.create(
+            name='Revenue App',
+            description='Test Description',
+            developer=self.developer,
+            funding_goal=Decimal('10000.00'),
+            available_percentage=Decimal('30.00'),
+            equity_percentage=Decimal('30.00'),
+            status=AppListing.Status.ACTIVE,
+            exchange_rate=Decimal('1.00'),
+            ai_features='Test AI Features',
+            remaining_percentage=Decimal('30.00'),
+            price_per_percentage=Decimal('333.33'),
+            funding_end_date=timezone.now() + timezone.timedelta(days=30)
+        )
+        self.investors = []
+        for i, percentage in enumerate(['10.00', '10.00', '10.00']):
+            investor = User.objects.create_user(
+                username=f'investor{i}',
+                email=f'investor{i}@example.com',
+                password='testpass123'
+            )
+            ShareOwnership.objects.create(
+                user=investor,
+                app=self.app,
+                percentage_owned=Decimal(percentage)
+            )
+            self.investors.append(investor)
+        self.revenue = Revenue.objects.create(
+            app=self.app,
+            amount=Decimal('1000.00'),
+            period_start=timezone.now() - timezone.timedelta(days=30),
+            period_end=timezone.now() - timezone.timedelta(days=1),
+            metadata={'source': 'test'},
+            exchange_rate=Decimal('1.00')
+        )
+        self.service = RevenueDistributionService()
+
+    def test_allocations_reconcile_rounding(self):
+        """Test allocations always add up to the revenue amount"""
+        allocations = self.service.calculate_share_distribution_batch(self.app, Decimal('1000.00'))
+
+        self.assertEqual(len(allocations), 3)
+        self.assertEqual(sum(a['amount'] for a in allocations), Decimal('1000.00'))
+        self.assertEqual(allocations[0]['amount'], Decimal('333.33'))
+        self.assertEqual(allocations[-1]['amount'], Decimal('333.34'))
+        self.assertEqual(allocations[0]['share_percentage'], Decimal('33.33'))
+
+    def test_process_distribution_batched(self):
+        """Test batched processing persists distributions in chunks"""
+        metrics = self.service.process_distribution_batched(self.revenue.id, chunk_size=2)
+
+        self.assertEqual(metrics['shareholders'], 3)
+        self.assertEqual(metrics['total_distributed'], Decimal('1000.00'))
+        self.assertGreater(metrics['shareholders_per_second'], 0)
+        self.assertEqual(Distribution.objects.filter(revenue=self.revenue).count(), 3)
+        self.revenue.refresh_from_db()
+        self.assertTrue(self.revenue.is_distributed)
+
+        # A distributed revenue is not processed twice
+        self.assertIsNone(self.service.process_distribution_batched(self.revenue.id))
+        self.assertEqual(Distribution.objects.filter(revenue=self.revenue).count(), 3)
+
+    def test_command_reports_throughput(self):
+        """Test the management command runs the batched mode"""
+        out = StringIO()
+        call_command('process_distributions', '--batched', '--chunk-size', '2', stdout=out)
+
+        self.assertIn('3 shareholders', out.getvalue())
+        self.assertEqual(Distribution.objects.filter(revenue=self.revenue).count(), 3)
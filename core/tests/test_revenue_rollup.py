@@ -0,0 +1,82 @@
+from decimal import Decimal
+from django.test import TestCase, override_settings
+from django.contrib.auth import get_user_model
+from django.utils import timezone
+from core.models import AppListing, Revenue, RevenueMonthlyRollup
+from core.services.revenue.distribution import RevenueDistributionService
+from core.services.revenue.rollup import RevenueRollupService
+
+User = get_user_model()
+
+@override_settings(USD_TO_NGN_RATE=1000)
+class RevenueRollupTests(TestCase):
+    def setUp(self):
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.app = AppListing.objects.create(
+            name='Revenue App',
+            description='Test Description',
+            developer=self.developer,
+            funding_goal=Decimal('10000.00'),
+            available_percentage=Decimal('30.00'),
+            equity_percentage=Decimal('30.00'),
+            status=AppListing.Status.ACTIVE,
+            exchange_rate=Decimal('1.00'),
+            ai_features='Test AI Features',
+            remaining_percentage=Decimal('30.00'),
+            price_per_percentage=Decimal('333.33'),
+            funding_end_date=timezone.now() + timezone.timedelta(days=30)
+        )
+        self.revenues = []
+        for months_ago, amount in [(0, '1000.00'), (1, '2000.00'), (3, '3000.00'), (3, '4000.00')]:
+            revenue = Revenue.objects.create(
+                app=self.app,
+                amount=Decimal(amount),
+                period_start=timezone.now() - timezone.timedelta(days=30),
+                period_end=timezone.now(),
+                metadata={'source': 'test'},
+                exchange_rate=Decimal('1.00')
+            )
+            if months_ago:
+                Revenue.objects.filter(pk=revenue.pk).update(created_at=self._months_ago(months_ago))
+            self.revenues.append(revenue)
+        self.service = RevenueDistributionService()
+
+    def _months_ago(self, months):
+        # Mid-month timestamp in the month that many months back
+        return RevenueRollupService.month_start() - timezone.timedelta(days=30 * months - 15)
+
+    def test_usd_total_converts_per_currency(self):
+        """Test revenue is summed in SQL and converted once to USD"""
+        self.assertEqual(self.service.get_total_revenue(self.developer), Decimal('10.00'))
+        self.assertEqual(self.service.get_monthly_revenue(None, self.app.id), Decimal('1.00'))
+
+    def test_rollups_match_live_totals(self):
+        """Test totals are unchanged once closed months are rolled up"""
+        live_total = self.service.get_total_revenue(None, self.app.id)
+
+        self.assertEqual(RevenueRollupService.build_rollups(), 2)
+        rollup = RevenueMonthlyRollup.objects.get(
+            month=RevenueRollupService.month_start(self._months_ago(3)).date()
+        )
+        self.assertEqual(rollup.revenue_count, 2)
+        self.assertEqual(rollup.total_amount, Decimal('7000.00'))
+        self.assertEqual(self.service.get_total_revenue(None, self.app.id), live_total)
+
+        # Rebuilding only adds months that are not yet covered
+        self.assertEqual(RevenueRollupService.build_rollups(), 0)
+
+    def test_rollup_refreshed_on_change(self):
+        """Test editing or deleting revenue in a rolled-up month refreshes it"""
+        RevenueRollupService.build_rollups()
+
+        old_revenue = Revenue.objects.get(pk=self.revenues[1].pk)
+        old_revenue.amount = Decimal('5000.00')
+        old_revenue.save()
+        self.assertEqual(self.service.get_total_revenue(None, self.app.id), Decimal('13.00'))
+
+        Revenue.objects.get(pk=self.revenues[2].pk).delete()
+        self.assertEqual(self.service.get_total_revenue(None, self.app.id), Decimal('10.00'))
@@ -0,0 +1,99 @@
+from datetime import timedelta
+from decimal import Decimal
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from core.models import AppListing
+from core.services.autocomplete import AutocompleteService
+from core.services.monitoring.metrics import SystemMetricsService
+from core.services.search import SearchService
+from core.services.search_cache import SearchResultCache
+from core.services.search_index import AppSearchIndex, app_search_index
+
+User = get_user_model()
+
+class SearchResultCacheTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        app_search_index.rebuild()
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.robot = self._create_app('Robot Arm', 'ROBOTICS')
+        self.planner = self._create_app('Crop Planner', 'AGRICULTURE')
+
+    def _create_app(self, name, category):
+        with self.captureOnCommitCallbacks(execute=True):
+            return AppListing.objects.create(
+                name=name,
+                description='An app',
+                ai_features='Computer vision',
+                developer=self.developer,
+                funding_goal=Decimal('1000.00'),
+                status='ACTIVE',
+                category=category,
+                exchange_rate=Decimal('1.00'),
+                currency='NGN',
+                available_percentage=Decimal('10.00'),
+                equity_percentage=Decimal('10.00'),
+                funding_end_date=timezone.now() + timedelta(days=30)
+            )
+
+    def test_repeated_searches_are_served_from_cache(self):
+        first = SearchService.search_apps('Robot', filters={'category': 'ROBOTICS'})
+        self.assertEqual([app.id for app in first['results']], [self.robot.id])
+
+        # Normalized query, one in_bulk query to hydrate the cached ids
+        with self.assertNumQueries(1):
+            second = SearchService.search_apps('  robot ', filters={'category': 'ROBOTICS'})
+        self.assertEqual([app.id for app in second['results']], [self.robot.id])
+        self.assertEqual(second['total_results'], 1)
+        self.assertEqual(second['results'][0].rank, first['results'][0].rank)
+
+        metrics = SystemMetricsService.get_cache_metrics()
+        self.assertEqual(metrics['search_cache_hits'], 1)
+        self.assertEqual(metrics['search_cache_misses'], 1)
+        self.assertEqual(metrics['search_cache_hit_rate'], 50)
+
+    def test_listing_changes_invalidate_cached_results(self):
+        self.assertEqual(SearchService.search_apps(sort_by='newest')['total_results'], 2)
+
+        self._create_app('Chat Helper', 'NLP')
+        results = SearchService.search_apps(sort_by='newest')
+        self.assertEqual(results['total_results'], 3)
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.planner.delete()
+        results = SearchService.search_apps('planner')
+        self.assertEqual(results['results'], [])
+
+    def test_unsearchable_saves_keep_cached_results(self):
+        AutocompleteService.publish_snapshot(popular_queries=[])
+        generations = (SearchResultCache.generation(), cache.get(AppSearchIndex.GENERATION_KEY))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.robot.view_count += 1
+            self.robot.save()
+            self.robot.refresh_from_db()
+            self.robot.funding_goal = Decimal('2000.00')
+            self.robot.save()
+        self.assertEqual((SearchResultCache.generation(), cache.get(AppSearchIndex.GENERATION_KEY)), generations)
+        self.assertIsNotNone(cache.get(AutocompleteService.SNAPSHOT_KEY))
+
+        self.client.get(f'/apps/{self.robot.pk}/', secure=True)
+        self.assertEqual(SearchResultCache.generation(), generations[0])
+
+        # A description change reaches search, not autocomplete
+        with self.captureOnCommitCallbacks(execute=True):
+            self.robot.description = 'A robotic arm'
+            self.robot.save()
+        self.assertEqual(SearchResultCache.generation(), generations[0] + 1)
+        self.assertIsNotNone(cache.get(AutocompleteService.SNAPSHOT_KEY))
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.robot.name = 'Robotic Arm'
+            self.robot.save()
+        self.assertIsNone(cache.get(AutocompleteService.SNAPSHOT_KEY))
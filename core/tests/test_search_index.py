@@ -0,0 +1,144 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase, override_settings
+from django.utils import timezone
+from core.models import AppListing
+from core.services.search import SearchService
+from core.services.search_cache import SearchResultCache
+from core.services.search_index import AppSearchIndex, InvertedIndex, app_search_index
+
+User = get_user_model()
+
+class InvertedIndexTests(SimpleTestCase):
+    def setUp(self):
+        self.index = InvertedIndex({'name': 3.0, 'description': 1.0}, facets=('category',))
+        self.index.add(1, {'name': 'Robot Arm', 'description': 'Precise assembly'}, {'category': 'ROBOTICS'})
+        self.index.add(2, {'name': 'Crop Planner', 'description': 'A robot free farming planner'}, {'category': 'AGRI'})
+        self.index.add(3, {'name': 'Chat Helper', 'description': 'Customer support'}, {'category': 'NLP'})
+
+    def test_name_matches_rank_above_description_matches(self):
+        self.assertEqual([doc_id for doc_id, _ in self.index.search('robot')], [1, 2])
+
+    def test_prefix_matching(self):
+        self.assertEqual([doc_id for doc_id, _ in self.index.search('plan')], [2])
+        self.assertEqual(self.index.search('zzz'), [])
+
+    def test_filters_are_applied_before_scoring(self):
+        hits = self.index.search('robot', facets={'category': 'AGRI'})
+        self.assertEqual([doc_id for doc_id, _ in hits], [2])
+        hits = self.index.search('robot', predicate=lambda attributes: attributes['category'] == 'NLP')
+        self.assertEqual(hits, [])
+
+    def test_updates_replace_and_remove_documents(self):
+        self.index.add(3, {'name': 'Robot Chat', 'description': ''}, {'category': 'NLP'})
+        self.assertIn(3, [doc_id for doc_id, _ in self.index.search('robot')])
+        self.index.remove(3)
+        self.assertNotIn(3, self.index)
+        self.assertEqual(self.index.search('chat'), [])
+        self.assertEqual(self.index.search('robot', facets={'category': 'NLP'}), [])
+
+
+class AppSearchIndexTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        app_search_index.rebuild()
+        self.developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.robot = self._create_app('Robot Arm', 'Industrial robotics platform', Decimal('100.00'))
+        self.planner = self._create_app('Crop Planner', 'Plans farms with a robot assistant', Decimal('500.00'))
+        self.hidden = self._create_app('Robot Prototype', 'Not approved yet', Decimal('100.00'), status='PENDING')
+
+    def _create_app(self, name, description, price, status='ACTIVE'):
+        with self.captureOnCommitCallbacks(execute=True):
+            return AppListing.objects.create(
+                name=name,
+                description=description,
+                ai_features='Computer vision',
+                developer=self.developer,
+                funding_goal=price * 10,
+                status=status,
+                exchange_rate=Decimal('1.00'),
+                currency='NGN',
+                available_percentage=Decimal('10.00'),
+                equity_percentage=Decimal('10.00'),
+                funding_end_date=timezone.now() + timedelta(days=30)
+            )
+
+    def test_search_apps_uses_index_with_filters(self):
+        results = SearchService.search_apps('robot', sort_by='relevance')
+        self.assertEqual([app.id for app in results['results']], [self.robot.id, self.planner.id])
+        self.assertEqual(results['total_results'], 2)
+
+        results = SearchService.search_apps('robot', filters={'price_range': (200, 1000)})
+        self.assertEqual([app.id for app in results['results']], [self.planner.id])
+
+        results = SearchService.search_apps('robot', filters={'status': 'PENDING'})
+        self.assertEqual(results['total_results'], 0)
+
+    def test_saved_listings_are_reindexed(self):
+        with self.captureOnCommitCallbacks(execute=True):
+            self.planner.name = 'Drone Planner'
+            self.planner.description = 'Plans farms'
+            self.planner.save()
+
+        hits = app_search_index.search('drone', statuses=['ACTIVE'])
+        self.assertEqual([app_id for app_id, _ in hits], [self.planner.id])
+        self.assertEqual(
+            [app_id for app_id, _ in app_search_index.search('robot', statuses=['ACTIVE'])],
+            [self.robot.id]
+        )
+
+        with self.captureOnCommitCallbacks(execute=True):
+            self.robot.delete()
+        self.assertEqual(app_search_index.search('robot', statuses=['ACTIVE']), [])
+
+    def test_other_processes_sync_changed_listings(self):
+        other_process = AppSearchIndex()
+        other_process.rebuild()
+
+        AppListing.objects.filter(pk=self.planner.pk).update(name='Drone Planner')
+        AppListing.objects.filter(pk=self.robot.pk).delete()
+        app_search_index.update_ids([self.planner.id, self.robot.id])
+
+        # Only the logged listings are read back
+        with self.assertNumQueries(1):
+            self.assertEqual(other_process.sync(), 2)
+        self.assertEqual([app_id for app_id, _ in other_process.search('drone')], [self.planner.id])
+        self.assertNotIn(self.robot.id, other_process.index)
+
+    def test_expired_change_log_triggers_rebuild(self):
+        other_process = AppSearchIndex()
+        other_process.rebuild()
+
+        AppListing.objects.filter(pk=self.planner.pk).update(name='Drone Planner')
+        app_search_index.update_ids([self.planner.id])
+        cache.delete(AppSearchIndex.CHANGE_KEY.format(generation=cache.get(AppSearchIndex.GENERATION_KEY)))
+
+        # Rebuilds instead (inline under tests, see conftest.py)
+        self.assertEqual(other_process.sync(), 0)
+        self.assertEqual([app_id for app_id, _ in other_process.search('drone')], [self.planner.id])
+
+    @override_settings(SEARCH_INDEX_BACKGROUND_BUILD=True)
+    def test_cold_index_builds_in_background(self):
+        cold = AppSearchIndex()
+        with patch('core.services.search_index.threading.Thread') as thread:
+            self.assertFalse(cold.ensure_fresh())
+            self.assertFalse(cold.ensure_fresh())
+        thread.assert_called_once()
+
+        # Searches meanwhile read the database, and are not cached
+        with patch('core.services.search.app_search_index', cold):
+            results = SearchService.search_apps('planner')
+            self.assertEqual([app.id for app in results['results']], [self.planner.id])
+            self.assertIsNone(SearchResultCache.get(SearchResultCache.key('planner', None, None, 1, 10, None)))
+
+            with patch('core.services.search_index.connections.close_all'):
+                thread.call_args.kwargs['target']()
+            self.assertTrue(cold.ensure_fresh())
+            self.assertEqual(len(cold.index), 3)
@@ -0,0 +1,139 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import SimpleTestCase, TestCase
+from django.utils import timezone
+from core.models import AppListing
+from core.services.autocomplete import AutocompleteService
+from core.services.search import SearchService
+from core.services.search_trends import CountMinSketch, SearchTrends, TopK, search_trends
+
+User = get_user_model()
+
+class SketchTests(SimpleTestCase):
+    def test_count_min_sketch_never_undercounts(self):
+        sketch = CountMinSketch(width=64, depth=4)
+        for i in range(500):
+            sketch.add(f'query {i}')
+        sketch.add('robot', 40)
+        self.assertGreaterEqual(sketch.estimate('robot'), 40)
+        self.assertEqual(CountMinSketch.from_dict(sketch.to_dict()).estimate('robot'), sketch.estimate('robot'))
+
+    def test_top_k_keeps_highest_estimates(self):
+        top = TopK(2)
+        top.offer('a', 1)
+        top.offer('b', 5)
+        top.offer('c', 3)
+        self.assertEqual(top.items(), [('b', 5), ('c', 3)])
+        top.offer('c', 9)
+        top.offer('a', 4)
+        self.assertEqual(top.items(), [('c', 9), ('b', 5)])
+
+
+class SearchTrendsTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.trends = SearchTrends()
+
+    def test_buffered_queries_are_flushed_to_the_shared_bucket(self):
+        self.trends.record('Robot  Arm')
+        self.trends.record('robot arm')
+        self.trends.record('x')
+        self.assertEqual(self.trends.trending(), [])
+
+        self.assertEqual(self.trends.flush(), 2)
+        self.assertEqual(self.trends.trending(), [('robot arm', 2)])
+        self.assertGreaterEqual(self.trends.estimate('ROBOT ARM'), 2)
+
+        # A second process adds to the same bucket
+        other_process = SearchTrends()
+        other_process.record('crop planner')
+        other_process.flush()
+        self.assertEqual(self.trends.trending(), [('robot arm', 2), ('crop planner', 1)])
+
+    def test_flush_size_triggers_flush(self):
+        with patch.object(SearchTrends, 'FLUSH_SIZE', 3):
+            for _ in range(3):
+                self.trends.record('robot')
+        self.assertEqual(self.trends.trending(), [('robot', 3)])
+
+    def test_recent_buckets_weigh_more(self):
+        now = 1_000_000 * SearchTrends.BUCKET_SECONDS
+        with patch('core.services.search_trends.time.time', return_value=now - SearchTrends.BUCKET_SECONDS):
+            for _ in range(3):
+                self.trends.record('old news')
+            self.trends.flush()
+        with patch('core.services.search_trends.time.time', return_value=now):
+            for _ in range(3):
+                self.trends.record('fresh news')
+            self.trends.flush()
+            self.assertEqual(
+                [query for query, _ in self.trends.trending()],
+                ['fresh news', 'old news']
+            )
+
+
+    def test_unflushed_counts_stay_in_their_bucket(self):
+        now = 1_000_000 * SearchTrends.BUCKET_SECONDS
+        previous = now - SearchTrends.BUCKET_SECONDS
+        with patch('core.services.search_trends.time.time', return_value=previous):
+            self.trends.record('old news')
+        # Another process is flushing the previous bucket when the hour turns
+        cache.add(f'{SearchTrends.bucket_key(previous)}:lock', True, None)
+        with patch('core.services.search_trends.time.time', return_value=now):
+            # The new hour flushes straight away; the old one waits for its lock
+            self.trends.record('fresh news')
+            self.assertEqual(self.trends.estimate('fresh news'), 1)
+            self.assertEqual(self.trends.flush(), 0)
+            cache.delete(f'{SearchTrends.bucket_key(previous)}:lock')
+            self.assertEqual(self.trends.flush(), 1)
+
+        self.assertEqual(self.trends.estimate('old news', timestamp=previous), 1)
+        self.assertEqual(self.trends.estimate('old news', timestamp=now), 0)
+        self.assertEqual(self.trends.estimate('fresh news', timestamp=now), 1)
+
+class TrendingSearchesTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        search_trends.reset()
+        AutocompleteService.reset()
+        self.addCleanup(search_trends.reset)
+        self.addCleanup(AutocompleteService.reset)
+        developer = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        AppListing.objects.create(
+            name='Robot Arm',
+            description='An app',
+            ai_features='Computer vision',
+            developer=developer,
+            funding_goal=Decimal('1000.00'),
+            status='ACTIVE',
+            exchange_rate=Decimal('1.00'),
+            currency='NGN',
+            available_percentage=Decimal('10.00'),
+            equity_percentage=Decimal('10.00'),
+            funding_end_date=timezone.now() + timedelta(days=30)
+        )
+
+    def test_searches_feed_trending_and_suggestions(self):
+        for query in ('robot vision', 'Robot Vision', 'robotics'):
+            self.client.get('/search/', {'q': query}, secure=True)
+        self.client.get('/search/', {'q': 'robotics', 'page': 2}, secure=True)
+        search_trends.flush()
+
+        self.assertEqual(
+            SearchService.get_trending_searches(),
+            [{'query': 'robot vision', 'score': 2}, {'query': 'robotics', 'score': 1}]
+        )
+
+        AutocompleteService.publish_snapshot()
+        suggestions = SearchService.get_search_suggestions('robot v')
+        self.assertEqual(suggestions, [{'text': 'robot vision', 'type': 'query', 'score': 2}])
+
+        response = self.client.get('/search/suggestions/', {'q': 'rob'}, secure=True)
+        self.assertEqual(response.json()['trending'][0]['query'], 'robot vision')
@@ -0,0 +1,158 @@
+from datetime import timedelta
+from decimal import Decimal
+from unittest.mock import patch
+import time
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from django.utils import timezone
+from core.models.subscription import Subscription, SubscriptionPlan
+from core.services.subscription import SubscriptionService
+from core.services.subscription_renewal import RenewalJob, StubPaymentGateway, SubscriptionRenewalRunner
+from core.services.usage_metering import UsageMeter
+
+User = get_user_model()
+
+class FlakyGateway:
+    """Fails a set number of calls per reference before succeeding"""
+
+    def __init__(self, failures):
+        self.failures = failures
+        self.references = []
+
+    def create_subscription_payment(self, user, plan, amount, currency='NGN', reference=None):
+        self.references.append(reference)
+        if self.references.count(reference) <= self.failures:
+            raise ConnectionError('Gateway timeout')
+        return {'success': True, 'reference': reference}
+
+    def lookup_transaction(self, reference):
+        # Failed calls never reached the gateway
+        return {'success': True, 'found': False}
+
+
+class LostResponseGateway(StubPaymentGateway):
+    """Creates the first transaction but times out before answering"""
+
+    def create_subscription_payment(self, *args, **kwargs):
+        result = super().create_subscription_payment(*args, **kwargs)
+        if self.calls == 1:
+            raise ConnectionError('Read timed out')
+        return result
+
+
+class SubscriptionRenewalTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.now = timezone.now()
+        SubscriptionPlan.objects.create(tier=Subscription.Tier.DEV_PRO, name='Developer Pro', price=Decimal('5000.00'))
+
+    def _subscription(self, name, auto_renew=True, days_left=-1):
+        user = User.objects.create_user(username=name, email=f'{name}@example.com', password='testpass123')
+        return Subscription.objects.create(
+            user=user,
+            tier=Subscription.Tier.DEV_PRO,
+            is_active=True,
+            auto_renew=auto_renew,
+            end_date=self.now + timedelta(days=days_left)
+        )
+
+    def test_renewals_are_paid_concurrently_and_recorded(self):
+        renewing = [self._subscription(f'renewing{i}') for i in range(6)]
+        lapsed = self._subscription('lapsed', auto_renew=False)
+        current = self._subscription('current', days_left=10)
+        UsageMeter.get_subscription(lapsed.user)
+
+        gateway = StubPaymentGateway(latency=0.01)
+        stats = SubscriptionRenewalRunner(gateway=gateway, max_workers=4).run(now=self.now)
+
+        self.assertEqual((stats['renewed'], stats['failed'], stats['deactivated']), (6, 0, 1))
+        self.assertEqual(gateway.calls, 6)
+        for subscription in renewing:
+            subscription.refresh_from_db()
+            self.assertTrue(subscription.is_active)
+            self.assertEqual(subscription.end_date, self.now + timedelta(days=30))
+            self.assertEqual(subscription.last_payment_date, self.now)
+        lapsed.refresh_from_db()
+        self.assertFalse(lapsed.is_active)
+        self.assertIsNone(UsageMeter.get_subscription(lapsed.user))
+        current.refresh_from_db()
+        self.assertEqual(current.end_date, self.now + timedelta(days=10))
+
+    def test_failed_payments_are_retried_with_backoff(self):
+        subscription = self._subscription('flaky')
+        gateway = FlakyGateway(failures=2)
+        delays = []
+        runner = SubscriptionRenewalRunner(gateway=gateway, max_attempts=3, backoff=0.5, sleep=delays.append)
+
+        self.assertEqual(runner.run(now=self.now)['renewed'], 1)
+        self.assertEqual(delays, [0.5, 1.0])
+        # Every attempt reuses the period's reference
+        self.assertEqual(len(set(gateway.references)), 1)
+
+        subscription = self._subscription('broken')
+        delays.clear()
+        runner.gateway = FlakyGateway(failures=3)
+        self.assertEqual(runner.run(now=self.now)['failed'], 1)
+        subscription.refresh_from_db()
+        self.assertFalse(subscription.is_active)
+
+    def test_retries_look_up_the_reference_first(self):
+        subscription = self._subscription('timeout')
+        gateway = LostResponseGateway()
+        delays = []
+        runner = SubscriptionRenewalRunner(gateway=gateway, max_attempts=3, backoff=0.5, sleep=delays.append)
+
+        self.assertEqual(runner.run(now=self.now)['renewed'], 1)
+        # The created transaction is found instead of being sent again
+        self.assertEqual((gateway.calls, delays), (1, [0.5]))
+        reference = runner.reference(subscription.id, subscription.end_date)
+        self.assertEqual(
+            gateway.create_subscription_payment(subscription.user, subscription.tier, 5000, reference=reference),
+            {'success': False, 'error': 'Duplicate Transaction Reference'}
+        )
+
+    def test_a_period_is_never_paid_twice(self):
+        subscription = self._subscription('renewing')
+        gateway = StubPaymentGateway()
+        runner = SubscriptionRenewalRunner(gateway=gateway)
+        reference = runner.reference(subscription.id, subscription.end_date)
+        job = RenewalJob(subscription.id, subscription.user, subscription.tier, Decimal('5000.00'), reference)
+
+        # Paid by a run that stopped before recording the renewal
+        self.assertTrue(runner.charge(job)['success'])
+        self.assertEqual(runner.run(now=self.now)['renewed'], 1)
+        self.assertEqual(gateway.calls, 1)
+
+        # Another runner is still working on this period
+        other = self._subscription('other')
+        cache.add(runner.CLAIM_KEY.format(reference=runner.reference(other.id, other.end_date)), runner.IN_PROGRESS)
+        self.assertEqual(runner.run(now=self.now)['skipped'], 1)
+        self.assertEqual(gateway.calls, 1)
+        other.refresh_from_db()
+        self.assertTrue(other.is_active)
+
+    def test_abandoned_claims_expire_after_one_charge(self):
+        subscription = self._subscription('abandoned')
+        gateway = StubPaymentGateway()
+        runner = SubscriptionRenewalRunner(gateway=gateway, max_attempts=3, backoff=0.5)
+        reference = runner.reference(subscription.id, subscription.end_date)
+        job = RenewalJob(subscription.id, subscription.user, subscription.tier, Decimal('5000.00'), reference)
+
+        # The run dies after claiming the period
+        with patch.object(runner, '_pay', side_effect=KeyboardInterrupt):
+            with self.assertRaises(KeyboardInterrupt):
+                runner.charge(job)
+        self.assertEqual(runner.run(now=self.now)['skipped'], 1)
+
+        later = time.time() + runner.in_progress_timeout + 1
+        with patch('django.core.cache.backends.locmem.time.time', return_value=later):
+            self.assertEqual(runner.run(now=self.now)['renewed'], 1)
+        self.assertEqual(gateway.calls, 1)
+
+    def test_check_subscription_status_uses_the_runner(self):
+        self._subscription('lapsed', auto_renew=False)
+        stats = SubscriptionService.check_subscription_status()
+        self.assertEqual(stats['deactivated'], 1)
+        self.assertFalse(Subscription.objects.filter(is_active=True).exists())
@@ -0,0 +1,145 @@
+from datetime import datetime, timedelta, timezone as dt_timezone
+from unittest.mock import patch
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import TestCase
+from core.models.subscription import Subscription, SubscriptionFeatureUsage
+from core.services.subscription import SubscriptionService
+from core.services.usage_metering import UsageMeter
+
+User = get_user_model()
+
+class UsageMeterTests(TestCase):
+    def setUp(self):
+        cache.clear()
+        self.addCleanup(cache.clear)
+        self.user = User.objects.create_user(
+            username='developer',
+            email='developer@example.com',
+            password='testpass123'
+        )
+        self.subscription = Subscription.objects.create(
+            user=self.user,
+            tier=Subscription.Tier.FREE,
+            is_active=True
+        )
+
+    def test_metered_calls_skip_the_database(self):
+        result = SubscriptionService.track_feature_usage(self.user, 'api_access')
+        self.assertTrue(result['success'])
+        self.assertEqual(result['usage_stats']['daily_usage'], 1)
+
+        with self.assertNumQueries(0):
+            result = SubscriptionService.track_feature_usage(self.user, 'api_access')
+            self.assertTrue(SubscriptionService.check_usage_allowed(self.user, 'api_access'))
+        self.assertEqual(result['usage_stats']['monthly_usage'], 2)
+
+    def test_limit_is_enforced_and_rolled_back(self):
+        with patch.dict('core.models.subscription.TIER_USAGE_LIMITS', {'FREE': {'daily': 3, 'monthly': 10}}):
+            results = [UsageMeter.record(self.user, 'api_access') for _ in range(5)]
+            self.assertEqual([result['success'] for result in results], [True, True, True, False, False])
+            self.assertIn('warning', results[2])
+            self.assertEqual(results[4]['usage_stats']['daily_usage'], 3)
+            self.assertFalse(UsageMeter.check_usage_allowed(self.user, 'api_access'))
+
+    def test_new_day_starts_a_new_window(self):
+        today = datetime(2026, 3, 14, 23, 59, tzinfo=dt_timezone.utc)
+        with patch('core.services.usage_metering.timezone.now', return_value=today):
+            UsageMeter.record(self.user, 'api_access')
+            UsageMeter.record(self.user, 'api_access')
+        with patch('core.services.usage_metering.timezone.now', return_value=today + timedelta(minutes=2)):
+            stats = UsageMeter.record(self.user, 'api_access')['usage_stats']
+        self.assertEqual((stats['daily_usage'], stats['monthly_usage']), (1, 3))
+
+    def test_flush_writes_counters_and_seeds_after_cache_loss(self):
+        for _ in range(4):
+            UsageMeter.record(self.user, 'api_access')
+        self.assertEqual(UsageMeter.flush(), 1)
+
+        usage = SubscriptionFeatureUsage.objects.get(subscription=self.subscription, feature_name='api_access')
+        self.assertEqual((usage.daily_usage, usage.monthly_usage), (4, 4))
+
+        cache.clear()
+        stats = UsageMeter.record(self.user, 'api_access')['usage_stats']
+        self.assertEqual((stats['daily_usage'], stats['monthly_usage']), (5, 5))
+
+    def test_subscription_changes_reach_the_meter(self):
+        UsageMeter.record(self.user, 'api_access')
+        with self.captureOnCommitCallbacks(execute=True):
+            self.subscription.is_active = False
+            self.subscription.save()
+        result = SubscriptionService.track_feature_usage(self.user, 'api_access')
+        self.assertEqual(result, {'success': False, 'error': 'No active subscription found'})
+
+
+class UsageCounterResetTests(TestCase):
+    def setUp(self):
+        self.subscriptions = []
+        for i in range(3):
+            user = User.objects.create_user(
+                username=f'user{i}',
+                email=f'user{i}@example.com',
+                password='testpass123'
+            )
+            self.subscriptions.append(Subscription.objects.create(user=user, is_active=True))
+        self.rows = [
+            SubscriptionFeatureUsage.objects.create(
+                subscription=subscription,
+                feature_name=feature,
+                daily_usage=5,
+                monthly_usage=50
+            )
+            for subscription in self.subscriptions
+            for feature in ('api_access', 'market_analysis')
+        ]
+
+    def test_ended_windows_are_reset_in_chunks(self):
+        day_start, month_start = UsageMeter.windows()
+        stale_day = self.rows[:4]
+        SubscriptionFeatureUsage.objects.filter(pk__in=[row.pk for row in stale_day]).update(
+            daily_reset_at=day_start - timedelta(hours=1)
+        )
+        SubscriptionFeatureUsage.objects.filter(pk=self.rows[0].pk).update(
+            monthly_reset_at=month_start - timedelta(days=1)
+        )
+
+        with self.assertNumQueries(1 + 2 * 3):
+            result = SubscriptionService.reset_usage_counters(chunk_size=2)
+
+        self.assertTrue(result['success'])
+        self.assertEqual((result['daily_reset'], result['monthly_reset'], result['reset_count']), (4, 1, 5))
+        self.assertIn('elapsed_ms', result)
+        counters = dict(
+            (row.pk, (row.daily_usage, row.monthly_usage))
+            for row in SubscriptionFeatureUsage.objects.all()
+        )
+        self.assertEqual(counters[self.rows[0].pk], (0, 0))
+        self.assertEqual(counters[self.rows[3].pk], (0, 50))
+        self.assertEqual(counters[self.rows[5].pk], (5, 50))
+        self.assertEqual(
+            SubscriptionFeatureUsage.objects.get(pk=self.rows[0].pk).daily_reset_at,
+            day_start - timedelta(hours=1)
+        )
+
+    def test_flush_after_reset_only_reads_rows_used_today(self):
+        day_start, _ = UsageMeter.windows()
+        SubscriptionFeatureUsage.objects.update(daily_reset_at=day_start - timedelta(hours=1))
+        SubscriptionService.reset_usage_counters()
+        self.assertFalse(SubscriptionFeatureUsage.objects.filter(daily_reset_at__gte=day_start).exists())
+
+        cache.clear()
+        self.addCleanup(cache.clear)
+        UsageMeter.record(self.subscriptions[0].user, 'api_access')
+        read = []
+        filter_rows = SubscriptionFeatureUsage.objects.filter
+
+        def record_reads(*args, **kwargs):
+            rows = filter_rows(*args, **kwargs)
+            read.extend(rows.values_list('pk', flat=True))
+            return rows
+
+        with patch.object(SubscriptionFeatureUsage.objects, 'filter', side_effect=record_reads):
+            self.assertEqual(UsageMeter.flush(), 1)
+        self.assertEqual(read, [self.rows[0].pk])
+        usage = SubscriptionFeatureUsage.objects.get(pk=self.rows[0].pk)
+        self.assertEqual((usage.daily_usage, usage.monthly_usage), (1, 51))
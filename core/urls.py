@@ -169,6 +169,7 @@ urlpatterns = [
     path('notifications/mark-all-read/', views.notifications.mark_all_as_read, name='mark_all_read'),
     path('notifications/unread-count/', views.notifications.get_unread_count, name='unread_count'),
     path('notifications/preferences/', views.notifications.notification_preferences, name='notification_preferences'),
+    path('notifications/devices/', views.notifications.device_tokens, name='notification_device_tokens'),
     path('notifications/test-all/', views.notifications.test_all_notifications, name='test_all_notifications'),
     path('notifications/templates/', views.notifications.manage_templates, name='manage_templates'),
     path('notifications/templates/<int:pk>/', views.notifications.template_detail, name='template_detail'),
@@ -103,7 +103,8 @@ class PaystackTransactionAPI:
 def get_exchange_rate(from_currency, to_currency):
     """Get exchange rate between two currencies
     
-    Currently only supports USD to NGN conversion using rate from settings
+    Rates come from the cached ExchangeRateService snapshot, so this never
+    waits on the rate provider.
     
     Args:
         from_currency (str): Source currency code (e.g. 'USD')
@@ -112,11 +113,8 @@ def get_exchange_rate(from_currency, to_currency):
     Returns:
         Decimal: Exchange rate from source to target currency
     """
-    if from_currency == 'USD' and to_currency == 'NGN':
-        return Decimal(str(settings.USD_TO_NGN_RATE))
-    elif from_currency == 'NGN' and to_currency == 'USD':
-        return Decimal('1') / Decimal(str(settings.USD_TO_NGN_RATE))
-    raise ValueError(f"Conversion from {from_currency} to {to_currency} not supported")
+    from .services.exchange_rates import ExchangeRateService
+    return ExchangeRateService.get_rate(from_currency, to_currency)
 
 def convert_currency(amount, from_currency, to_currency):
     """Convert an amount between currencies
@@ -129,8 +127,5 @@ def convert_currency(amount, from_currency, to_currency):
     Returns:
         Decimal: Converted amount in target currency
     """
-    if amount is None:
-        return None
-        
-    rate = get_exchange_rate(from_currency, to_currency)
-    return Decimal(str(amount)) * rate 
\ No newline at end of file
+    from .services.exchange_rates import ExchangeRateService
+    return ExchangeRateService.convert(amount, from_currency, to_currency) 
\ No newline at end of file
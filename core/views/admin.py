@@ -96,10 +96,10 @@ def pending_apps(request):
     # Get pending apps
     apps = AppListing.objects.filter(
         status=AppListing.Status.PENDING
-    ).order_by('-created_at')
+    ).select_related('engagement_counter').order_by('-created_at')
     
     # Get all apps with filters
-    all_apps_query = AppListing.objects.all()
+    all_apps_query = AppListing.objects.select_related('engagement_counter')
     
     # Apply filters if provided
     status_filter = request.GET.get('status')
@@ -118,7 +118,7 @@ def pending_apps(request):
     elif sort_by == 'most_viewed':
         all_apps_query = all_apps_query.order_by('-view_count')
     elif sort_by == 'most_liked':
-        all_apps_query = all_apps_query.order_by('-like_count')
+        all_apps_query = all_apps_query.order_by('-engagement_counter__likes')
     else:  # newest first by default
         all_apps_query = all_apps_query.order_by('-created_at')
     
@@ -233,21 +233,12 @@ def verify_milestone(request, milestone_id):
         if action == 'approve':
             can_complete, message = milestone.verify_completion()
             if can_complete:
-                # Mark milestone as completed
-                milestone.mark_completed()
-                
-                # Process fund release
-                escrow_transactions = milestone.app.escrowtransaction_set.filter(
-                    transaction_type='DEPOSIT',
-                    status='COMPLETED'
-                )
-                
-                for transaction in escrow_transactions:
-                    try:
-                        transaction.process_milestone_release(milestone)
-                    except Exception as e:
-                        messages.error(request, f'Error processing release: {str(e)}')
-                        return redirect('admin:verify_milestone', milestone_id=milestone_id)
+                # Mark milestone as completed, which releases its escrow share
+                try:
+                    milestone.mark_completed()
+                except Exception as e:
+                    messages.error(request, f'Error processing release: {str(e)}')
+                    return redirect('admin:verify_milestone', milestone_id=milestone_id)
                 
                 messages.success(request, 'Milestone verified and funds released successfully')
             else:
@@ -67,7 +67,7 @@ def app_list(request):
             # Only show listed apps
             apps = apps.filter(listing_type=AppListing.ListingType.LISTED)
     
-    apps = apps.order_by('-created_at')
+    apps = apps.select_related('engagement_counter').order_by('-created_at')
     
     # Pagination
     paginator = Paginator(apps, 9)  # Show 9 apps per page
@@ -166,9 +166,10 @@ def app_detail(request, pk):
     """Display app details."""
     app = get_object_or_404(AppListing, pk=pk)
     
-    # Increment view count
+    # Increment view count without a full save, which would overwrite
+    # concurrent changes and reindex the listing
+    AppListing.objects.filter(pk=app.pk).update(view_count=F('view_count') + 1)
     app.view_count += 1
-    app.save()
     
     # Get user's share ownership if any
     user_ownership = None
@@ -741,7 +742,8 @@ def test_fee_collection(request, app_id):
                 transaction_id=f'TEST-{timezone.now().strftime("%Y%m%d%H%M%S")}'
             )
             
-            # Update app status
+            # Update app status on the post-investment row
+            app.refresh_from_db()
             app.status = AppListing.Status.FUNDED
             app.save()
             
@@ -5,7 +5,7 @@ from django.http import JsonResponse
 from django.views.decorators.http import require_POST, require_GET
 from django.conf import settings
 from django.utils import timezone
-from django.db.models import Count, Q
+from django.db.models import Count, Q, F
 from ..models import AppListing, CommunityVote, AppComment
 from ..forms import AppListingForm
 from ..services.notifications import NotificationService
@@ -94,6 +94,8 @@ def vote_app(request, pk):
             'message': 'Invalid vote type'
         }, status=400)
     
+    was_trending = app.is_trending
+    
     # Check for existing vote of the same type
     existing_vote = CommunityVote.objects.filter(
         user=request.user,
@@ -122,21 +124,15 @@ def vote_app(request, pk):
         app=app
     ).values_list('vote_type', flat=True)
     
-    # Update vote counts
-    upvote_count = CommunityVote.objects.filter(app=app, vote_type='UPVOTE').count()
-    like_count = CommunityVote.objects.filter(app=app, vote_type='LIKE').count()
+    # Read updated vote counts from the engagement counters
+    app.engagement_counter.refresh_from_db()
+    upvote_count = app.upvote_count
+    like_count = app.like_count
     
     # Check if app has become trending
-    vote_threshold = getattr(settings, 'TRENDING_VOTE_THRESHOLD', 30)
-    is_trending = upvote_count >= vote_threshold
-    
-    if is_trending and not app.is_trending:
-        app.is_trending = True
-        app.save()
+    is_trending = app.is_trending
+    if is_trending and not was_trending:
         NotificationService.notify_suggestion_trending(app)
-    elif not is_trending and app.is_trending:
-        app.is_trending = False
-        app.save()
     
     return JsonResponse({
         'success': True,
@@ -176,14 +172,14 @@ def community_leaderboard(request):
     ).filter(
         # Ensure either manual trending OR meets vote threshold
         Q(manual_trending=True) | Q(recent_votes__gte=vote_threshold)
-    ).order_by('-manual_trending', '-recent_votes').distinct()[:6]
+    ).select_related('engagement_counter').order_by('-manual_trending', '-recent_votes').distinct()[:6]
     
     # Get all-time most voted apps (only community and nominated)
     top_voted_apps = AppListing.objects.filter(
         listing_type__in=[AppListing.ListingType.COMMUNITY, AppListing.ListingType.NOMINATED],
         status=AppListing.Status.ACTIVE
-    ).annotate(
-        vote_count=Count('community_votes', filter=Q(community_votes__vote_type='UPVOTE'))
+    ).select_related('engagement_counter').annotate(
+        vote_count=F('engagement_counter__upvotes')
     ).order_by('-vote_count')[:9]
     
     return render(request, 'core/apps/leaderboard.html', {
@@ -6,7 +6,7 @@ from django.views.decorators.http import require_POST, require_http_methods
 from django.core.exceptions import PermissionDenied
 from django.urls import reverse
 from django.contrib import messages
-from django.core.mail import send_mass_mail, send_mail
+from django.core.mail import send_mail
 from django.conf import settings
 from django.template.loader import render_to_string
 from django.contrib.auth import get_user_model
@@ -14,6 +14,7 @@ from django.utils.html import strip_tags
 
 from ..models.base import Notification
 from ..models.legal import LegalDocument, UserAgreement, LegalAgreement
+from ..services.notification_dispatcher import NotificationDispatcher
 from core.forms import LegalAgreementForm
 
 User = get_user_model()
@@ -105,47 +106,29 @@ def notify_legal_update(request, document_id):
     """Send notifications to users about legal document updates."""
     document = get_object_or_404(LegalDocument, id=document_id)
     
-    # Get all users who haven't accepted this version
-    users_to_notify = User.objects.exclude(
-        useragreement__document=document
-    ).distinct()
+    document_type = document.get_document_type_display()
     
-    # Prepare email notifications
-    emails = []
-    for user in users_to_notify:
-        # Create in-app notification
-        Notification.objects.create(
-            user=user,
-            title=f'New {document.get_document_type_display()} Available',
-            message=f'Please review and accept the updated {document.get_document_type_display()}.',
-            link=reverse('core:terms_of_service' if document.document_type == 'TOS' else 'core:privacy_policy')
+    # Fan out to every user who hasn't accepted this version in a worker
+    try:
+        NotificationDispatcher.dispatch_async(
+            excludes={'useragreement__document': document.id},
+            type=Notification.Type.SYSTEM,
+            title=f'New {document_type} Available',
+            message=f'Please review and accept the updated {document_type}.',
+            link=reverse('core:terms_of_service' if document.document_type == 'TOS' else 'core:privacy_policy'),
+            email={
+                'subject': f'New {document_type} Available',
+                'template': 'core/emails/legal_update.html',
+                'context': {
+                    'document_type': document_type,
+                    'document_version': document.version,
+                    'site_url': settings.SITE_URL
+                }
+            }
         )
-        
-        # Prepare email content
-        context = {
-            'user': user,
-            'document_type': document.get_document_type_display(),
-            'document_version': document.version,
-            'site_url': settings.SITE_URL
-        }
-        
-        email_body = render_to_string('core/email/legal_update.html', context)
-        emails.append((
-            f'New {document.get_document_type_display()} Available',
-            email_body,
-            settings.DEFAULT_FROM_EMAIL,
-            [user.email]
-        ))
-    
-    # Send emails in bulk
-    if emails:
-        try:
-            send_mass_mail(emails)
-            messages.success(request, f'Notifications sent to {len(emails)} users.')
-        except Exception as e:
-            messages.error(request, f'Error sending emails: {str(e)}')
-    else:
-        messages.info(request, 'No users need to be notified.')
+        messages.success(request, 'Notifications are being sent to users who have not accepted this version.')
+    except Exception as e:
+        messages.error(request, f'Error sending notifications: {str(e)}')
     
     return redirect('admin:core_legaldocument_changelist')
 
@@ -19,11 +19,11 @@ def format_naira(amount):
 def home(request):
     featured_apps = AppListing.objects.filter(
         status=AppListing.Status.ACTIVE
-    )[:6]
+    ).select_related('engagement_counter')[:6]
     funded_apps = AppListing.objects.filter(
         Q(status=AppListing.Status.FUNDED) |
         Q(status=AppListing.Status.COMPLETED)
-    )[:6]
+    ).select_related('engagement_counter')[:6]
     return render(request, 'core/home.html', {
         'featured_apps': featured_apps,
         'funded_apps': funded_apps
@@ -34,7 +34,7 @@ def investor_dashboard(request):
     """Enhanced dashboard with advanced analytics"""
     if request.user.is_developer():
         # Get developer's apps and their statistics
-        apps = AppListing.objects.filter(developer=request.user)
+        apps = AppListing.objects.filter(developer=request.user).with_escrow_totals()
         
         # Annotate each app with total_released_percentage
         for app in apps:
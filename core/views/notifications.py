@@ -1,20 +1,30 @@
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.http import JsonResponse, StreamingHttpResponse
-from ..models import Notification, NotificationPreference, NotificationTemplate
+from ..models import Notification, NotificationPreference, NotificationTemplate, DeviceToken
 from decimal import Decimal, InvalidOperation
 from django.contrib import messages
 from ..services.notifications import NotificationService
+from ..services.notification_stream import (
+    notification_group, serialize_notification, format_sse_event, stream_connections
+)
 from django.contrib.auth.decorators import user_passes_test
 from channels.layers import get_channel_layer
 from asgiref.sync import async_to_sync
 from django.utils import timezone
 import json
 import asyncio
-import time
 from django.views.decorators.http import require_POST
 from django.views.decorators.csrf import csrf_exempt
 from django.views.decorators.http import require_http_methods
+import logging
+
+logger = logging.getLogger(__name__)
+
+STREAM_HEARTBEAT_SECONDS = 15
+STREAM_GROUP_REFRESH_HEARTBEATS = 240  # About once an hour
+STREAM_REPLAY_LIMIT = 50
+STREAM_RETRY_MS = 5000
 
 @login_required
 def notification_list(request):
@@ -65,6 +75,33 @@ def get_unread_count(request):
     count = request.user.notifications.filter(is_read=False).count()
     return JsonResponse({'count': count})
 
+@login_required
+@require_http_methods(["POST", "DELETE"])
+def device_tokens(request):
+    """Register or remove the push notification token of one of the user's devices"""
+    try:
+        data = json.loads(request.body)
+    except json.JSONDecodeError:
+        return JsonResponse({'status': 'error', 'message': 'Invalid JSON'}, status=400)
+    if not isinstance(data, dict):
+        return JsonResponse({'status': 'error', 'message': 'Expected a JSON object'}, status=400)
+    
+    token = data.get('token') or ''
+    token = token.strip() if isinstance(token, str) else ''
+    if not token:
+        return JsonResponse({'status': 'error', 'message': 'Token is required'}, status=400)
+    
+    if request.method == 'DELETE':
+        DeviceToken.objects.filter(user=request.user, token=token).delete()
+        return JsonResponse({'status': 'success'})
+    
+    platform = data.get('platform', DeviceToken.Platform.WEB)
+    if platform not in DeviceToken.Platform.values:
+        return JsonResponse({'status': 'error', 'message': 'Invalid platform'}, status=400)
+    
+    DeviceToken.register(request.user, token, platform)
+    return JsonResponse({'status': 'success'})
+
 @login_required
 def notification_preferences(request):
     preferences, created = NotificationPreference.objects.get_or_create(user=request.user)
@@ -285,58 +322,79 @@ def recent_notifications(request):
 @login_required
 @csrf_exempt  # SSE connections don't need CSRF
 @require_http_methods(["GET"])  # Only allow GET requests
-def notification_stream(request):
-    """Server-Sent Events endpoint for real-time notifications"""
-    # Check if user is authenticated
-    if not request.user.is_authenticated:
+async def notification_stream(request):
+    """Server-Sent Events endpoint for real-time notifications
+    
+    Listens on the user's notification channel-layer group, so an idle
+    connection costs no queries. The database is only read once, to replay
+    notifications missed since the client's Last-Event-ID.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
         response = StreamingHttpResponse(
             'data: {"error": "Authentication required"}\n\n',
-            content_type='text/event-stream'
+            content_type='text/event-stream',
+            status=401
         )
         response['Cache-Control'] = 'no-cache'
         return response
 
-    def event_stream():
-        last_check = None
-        
-        while True:
-            try:
-                # Verify user is still authenticated
-                if not request.user.is_authenticated:
-                    yield 'data: {"error": "Session expired"}\n\n'
-                    break
+    try:
+        last_event_id = int(request.headers.get('Last-Event-ID', ''))
+    except ValueError:
+        last_event_id = None
 
-                # Get new notifications
-                notifications = Notification.objects.filter(
-                    user=request.user,
-                    is_read=False
-                )
-                if last_check:
-                    notifications = notifications.filter(created_at__gt=last_check)
-                
-                if notifications.exists():
-                    # Convert notifications to list of dicts
-                    data = [{
-                        'id': n.id,
-                        'message': n.message,
-                        'type': n.type,
-                        'created_at': n.created_at.isoformat()
-                    } for n in notifications]
-                    
-                    # Send notifications as SSE
-                    yield f"data: {json.dumps(data)}\n\n"
-                
-                # Send heartbeat to keep connection alive
-                else:
+    async def event_stream():
+        # Taken once the response is iterated, so one that is never sent
+        # does not hold a slot
+        if not stream_connections.acquire():
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+            yield format_sse_event({'error': 'Too many open notification streams'})
+            return
+
+        channel_layer = get_channel_layer()
+        group = notification_group(user.id)
+        channel_name = None
+        try:
+            channel_name = await channel_layer.new_channel()
+            await channel_layer.group_add(group, channel_name)
+            yield f"retry: {STREAM_RETRY_MS}\n\n"
+
+            if last_event_id is not None:
+                missed = Notification.objects.filter(
+                    user_id=user.id,
+                    id__gt=last_event_id
+                ).order_by('id')[:STREAM_REPLAY_LIMIT]
+                async for notification in missed:
+                    yield format_sse_event(serialize_notification(notification), notification.id)
+
+            heartbeats = 0
+            while True:
+                try:
+                    message = await asyncio.wait_for(
+                        channel_layer.receive(channel_name),
+                        timeout=STREAM_HEARTBEAT_SECONDS
+                    )
+                except asyncio.TimeoutError:
+                    # Send heartbeat to keep connection alive
                     yield ': heartbeat\n\n'
-                
-                last_check = timezone.now()
-                time.sleep(1)  # Check every second
-            except Exception as e:
-                print(f"Error in event stream: {e}")
-                yield f"data: {json.dumps({'error': str(e)})}\n\n"
-                break
-    
+                    heartbeats += 1
+                    if heartbeats % STREAM_GROUP_REFRESH_HEARTBEATS == 0:
+                        # Renew membership before the channel layer's group expiry
+                        await channel_layer.group_add(group, channel_name)
+                    continue
+
+                if message.get('type') == 'notification_message':
+                    data = message['data']
+                    yield format_sse_event(data, data.get('id'))
+        except Exception as e:
+            logger.error(f"Error in event stream: {e}")
+            yield format_sse_event({'error': 'Stream interrupted'})
+        finally:
+            stream_connections.release()
+            if channel_name is not None:
+                await channel_layer.group_discard(group, channel_name)
+
     response = StreamingHttpResponse(
         event_stream(),
         content_type='text/event-stream'
@@ -10,6 +10,7 @@ def search_apps(request):
     category = request.GET.get('category')
     sort_by = request.GET.get('sort')
     page = int(request.GET.get('page', 1))
+    cursor = request.GET.get('cursor')
     
     filters = {}
     if category:
@@ -26,13 +27,22 @@ def search_apps(request):
     if status:
         filters['status'] = status
     
+    if query and page == 1 and not cursor:
+        SearchService.record_search(query)
+    
     search_results = SearchService.search_apps(
         query=query,
         filters=filters,
         sort_by=sort_by,
-        page=page
+        page=page,
+        cursor=cursor
     )
     
+    # Page links keep every filter of the current search
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
+    query_params.pop('page', None)
+    
     context = {
         'query': query,
         'results': search_results['results'],
@@ -41,6 +51,9 @@ def search_apps(request):
         'current_page': search_results['current_page'],
         'has_next': search_results['has_next'],
         'has_previous': search_results['has_previous'],
+        'next_cursor': search_results['next_cursor'],
+        'previous_cursor': search_results['previous_cursor'],
+        'filter_query': query_params.urlencode(),
         'filters': filters,
         'sort_by': sort_by,
         'categories': AppListing.Category.choices,
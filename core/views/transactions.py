@@ -3,14 +3,17 @@ from django.contrib.auth.decorators import login_required
 from django.db.models import Sum, Count, F, ExpressionWrapper, DecimalField, Value, Q
 from django.db.models.functions import TruncMonth, Coalesce
 from django.utils import timezone
-from decimal import Decimal
+from decimal import Decimal, InvalidOperation
 from ..models import Transaction, Investment, ShareOwnership
+from ..pagination import KeysetPaginator, InvalidCursor
 from django.http import HttpResponse
 import csv
 from datetime import datetime, timedelta
 import numpy as np
 from dateutil.relativedelta import relativedelta
 
+TRANSACTION_HISTORY_PAGE_SIZE = 25
+
 @login_required
 def transaction_history(request):
     transactions = Transaction.objects.filter(
@@ -24,13 +27,6 @@ def transaction_history(request):
     max_amount = request.GET.get('max_amount')
     search = request.GET.get('search', '')  # Default to empty string instead of None
     
-    print(f"Filter values received:")
-    print(f"date_range: {date_range}")
-    print(f"transaction_type: {transaction_type}")
-    print(f"min_amount: {min_amount}")
-    print(f"max_amount: {max_amount}")
-    print(f"search: {search}")
-    
     # Store filters for template
     filters = {
         'date_range': date_range,
@@ -52,39 +48,32 @@ def transaction_history(request):
         elif date_range == '1y':
             start_date = today - timedelta(days=365)
         transactions = transactions.filter(created_at__gte=start_date)
-        print(f"After date filter: {transactions.count()} transactions")
     
     if transaction_type:
         transactions = transactions.filter(transaction_type=transaction_type)
-        print(f"After type filter: {transactions.count()} transactions")
     
     if min_amount:
         try:
             min_amount_decimal = Decimal(min_amount)
             transactions = transactions.filter(amount__gte=min_amount_decimal)
-            print(f"After min amount filter: {transactions.count()} transactions")
-        except (ValueError, decimal.InvalidOperation) as e:
-            print(f"Error converting min_amount: {e}")
+        except (ValueError, InvalidOperation):
+            pass
     
     if max_amount:
         try:
             max_amount_decimal = Decimal(max_amount)
             transactions = transactions.filter(amount__lte=max_amount_decimal)
-            print(f"After max amount filter: {transactions.count()} transactions")
-        except (ValueError, decimal.InvalidOperation) as e:
-            print(f"Error converting max_amount: {e}")
+        except (ValueError, InvalidOperation):
+            pass
     
     if search and search != 'None':  # Only apply search if it's not empty or 'None'
         transactions = transactions.filter(
             Q(app__name__icontains=search) |
             Q(transaction_type__icontains=search)
         )
-        print(f"After search filter: {transactions.count()} transactions")
-    
-    print(f"Final transaction count: {transactions.count()}")
     
     # Order by date
-    transactions = transactions.order_by('-created_at')
+    transactions = transactions.order_by('-created_at', '-id')
     
     # Calculate statistics based on filtered data
     monthly_stats = transactions.annotate(
@@ -109,7 +98,7 @@ def transaction_history(request):
         writer = csv.writer(response)
         writer.writerow(['Date', 'App', 'Type', 'Amount'])
         
-        for transaction in transactions:
+        for transaction in transactions.iterator(chunk_size=1000):
             writer.writerow([
                 transaction.created_at.strftime('%Y-%m-%d %H:%M:%S'),
                 transaction.app.name,
@@ -119,8 +108,19 @@ def transaction_history(request):
         
         return response
     
+    # Keyset pagination: every page is one seek on (created_at, id)
+    paginator = KeysetPaginator(transactions, TRANSACTION_HISTORY_PAGE_SIZE)
+    try:
+        page = paginator.page(request.GET.get('cursor'))
+    except InvalidCursor:
+        page = paginator.page()
+    query_params = request.GET.copy()
+    query_params.pop('cursor', None)
+    
     context = {
-        'transactions': transactions,
+        'transactions': page.object_list,
+        'page': page,
+        'filter_query': query_params.urlencode(),
         'monthly_stats': monthly_stats,
         'type_totals': {
             item['transaction_type']: {
@@ -420,12 +420,20 @@ CSRF_COOKIE_NAME = 'csrftoken'
 CSRF_HEADER_NAME = 'HTTP_X_CSRFTOKEN'
 
 # Rate Limiting Settings
+# Each policy may also set 'algorithm' (sliding_window_counter,
+# sliding_window_log or token_bucket) and, for token_bucket, 'burst'
 RATE_LIMITS = {
     'DEFAULT': {'calls': 100, 'period': 60},  # 100 calls per minute
     'API': {'calls': 60, 'period': 60},       # 60 calls per minute
     'MONITORING': {'calls': 30, 'period': 60}  # 30 calls per minute
 }
 
+# Path prefixes mapped to RATE_LIMITS policies; the longest match wins
+RATE_LIMIT_ROUTES = [
+    ('/api/', 'API'),
+    ('/monitoring/', 'MONITORING'),
+]
+
 # Cache Settings
 if DEBUG:
     CACHES = {
@@ -564,6 +572,28 @@ PAYSTACK_PUBLIC_KEY = os.environ.get('PAYSTACK_PUBLIC_KEY')
 PAYSTACK_SECRET_KEY = os.environ.get('PAYSTACK_SECRET_KEY')
 PAYSTACK_BASE_URL = 'https://api.paystack.co'
 
+# Subscription renewals: concurrent payment calls per run, and attempts per
+# renewal with exponential backoff starting at SUBSCRIPTION_RENEWAL_BACKOFF seconds
+SUBSCRIPTION_RENEWAL_WORKERS = 8
+SUBSCRIPTION_RENEWAL_MAX_ATTEMPTS = 3
+SUBSCRIPTION_RENEWAL_BACKOFF = 0.5
+
+# Exchange Rates
+# Fallback rates (units per USD) used until the refresh task has published
+# provider rates to the cache
+USD_TO_NGN_RATE = os.environ.get('USD_TO_NGN_RATE', '1500')
+EXCHANGE_RATES = {
+    'USD': '1',
+    'EUR': os.environ.get('USD_TO_EUR_RATE', '0.92'),
+    'GBP': os.environ.get('USD_TO_GBP_RATE', '0.79'),
+}
+# Provider returning {"rates": {...}} quoted against USD
+EXCHANGE_RATE_API_URL = os.environ.get('EXCHANGE_RATE_API_URL')
+
+# Offline IP-to-country table for CurrencyMiddleware: a CSV of
+# "network,country_code" rows (e.g. "102.88.0.0/16,NG")
+GEOIP_CIDR_TABLE = os.environ.get('GEOIP_CIDR_TABLE')
+
 # Payment Gateway Mode (test/live)
 PAYMENT_GATEWAY_MODE = 'test' if DEBUG else 'live'
 
@@ -587,9 +617,48 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.cleanup_read_notifications',
         'schedule': crontab(hour=0, minute=30),  # Run daily at 00:30
     },
+    'send-hourly-notification-digest': {
+        'task': 'core.tasks.send_notification_digest',
+        'schedule': crontab(minute=5),  # Run every hour
+        'args': ('HOURLY',),
+    },
     'send-daily-notification-digest': {
-        'task': 'core.tasks.send_daily_digest',
+        'task': 'core.tasks.send_notification_digest',
         'schedule': crontab(hour=8, minute=0),  # Run daily at 8 AM
+        'args': ('DAILY',),
+    },
+    'send-weekly-notification-digest': {
+        'task': 'core.tasks.send_notification_digest',
+        'schedule': crontab(hour=8, minute=0, day_of_week=1),  # Run Mondays at 8 AM
+        'args': ('WEEKLY',),
+    },
+    'refresh-search-suggestions': {
+        'task': 'core.tasks.refresh_search_suggestions',
+        'schedule': crontab(minute='*/10'),  # Run every 10 minutes
+    },
+    'warm-search-cache': {
+        'task': 'core.tasks.warm_search_cache',
+        'schedule': crontab(minute='*/5'),  # Run every 5 minutes
+    },
+    'flush-feature-usage': {
+        'task': 'core.tasks.flush_feature_usage',
+        'schedule': crontab(minute='*/5'),  # Run every 5 minutes
+    },
+    'reset-usage-counters': {
+        'task': 'core.tasks.reset_usage_counters',
+        'schedule': crontab(hour=0, minute=10),  # Run daily at 00:10
+    },
+    'renew-subscriptions': {
+        'task': 'core.tasks.renew_subscriptions',
+        'schedule': crontab(minute=20),  # Run every hour
+    },
+    'snapshot-escrow-balances': {
+        'task': 'core.tasks.snapshot_escrow_balances',
+        'schedule': crontab(minute='*/15'),  # Run every 15 minutes
+    },
+    'prune-api-rollups': {
+        'task': 'core.tasks.prune_api_rollups',
+        'schedule': crontab(hour=0, minute=40),  # Run daily at 00:40
     },
     'verify-backup-completion': {
         'task': 'core.tasks.verify_backup_completion',
@@ -599,6 +668,14 @@ CELERY_BEAT_SCHEDULE = {
         'task': 'core.tasks.check_backup_integrity',
         'schedule': crontab(hour=2, minute=0),  # Run daily at 2 AM
     },
+    'build-revenue-rollups': {
+        'task': 'core.tasks.build_revenue_rollups',
+        'schedule': crontab(hour=3, minute=0),  # Run daily at 3 AM
+    },
+    'refresh-exchange-rates': {
+        'task': 'core.tasks.refresh_exchange_rates',
+        'schedule': crontab(minute=0),  # Run every hour
+    },
 }
 
 # Input Sanitization Settings
@@ -671,6 +748,35 @@ JWT_EXPIRATION_DELTA = datetime.timedelta(days=1)
 # Audit logging settings
 AUDIT_LOG_RETENTION_DAYS = 90  # Keep audit logs for 90 days
 AUDIT_LOG_ENABLED = True
+# Request audit entries are written in batches by a background thread;
+# these event types are written synchronously instead
+AUDIT_LOG_ASYNC = True
+AUDIT_LOG_SYNC_EVENT_TYPES = ['AUTH', 'ADMIN', 'SECURITY']
+AUDIT_LOG_QUEUE_SIZE = 10000  # Entries beyond this are dropped and counted
+AUDIT_LOG_BATCH_SIZE = 500
+AUDIT_LOG_FLUSH_INTERVAL = 2  # Seconds
+AUDIT_LOG_ENQUEUE_TIMEOUT = 0.01  # Seconds a request waits on a full queue
+
+# API telemetry: every call is counted in per-minute APIRequestRollup rows;
+# this share of successful calls is also stored as raw APIRequest rows
+API_TELEMETRY_SAMPLE_RATE = 0.01
+API_TELEMETRY_RETENTION_DAYS = 30  # Older rollups are pruned daily
+
+# Build each process's in-memory app search index in a background thread;
+# searches use plain database matching until it is ready
+SEARCH_INDEX_BACKGROUND_BUILD = True
+
+# Open SSE notification streams allowed per server process
+NOTIFICATION_STREAM_MAX_CONNECTIONS = int(os.environ.get('NOTIFICATION_STREAM_MAX_CONNECTIONS', 1000))
+
+# Recipients per bulk insert and per queued email/push delivery task
+NOTIFICATION_DISPATCH_CHUNK_SIZE = 500
+
+# Users per digest email batch; each batch is one task and one SMTP connection
+NOTIFICATION_DIGEST_BATCH_SIZE = 200
+
+# Push delivery client; core.services.push.FakePushClient sends nothing, for offline load tests
+PUSH_NOTIFICATION_CLIENT = os.environ.get('PUSH_NOTIFICATION_CLIENT', 'core.services.push.FirebasePushClient')
 
 # OpenAI Settings
 OPENAI_API_KEY = os.environ.get('OPENAI_API_KEY')